@@ -1,4 +1,12 @@
+import collections
 import json
+import struct
+import zlib
+from collections.abc import Sequence
+
+import requests_mock as req_mock
+
+from up42 import bandwidth, cog
 
 
 def match_request_body(data: dict):
@@ -6,3 +14,257 @@ def match_request_body(data: dict):
         return request.text == json.dumps(data)
 
     return matcher
+
+
+def ranged_content(content: bytes):
+    def respond(request, context) -> bytes:
+        if byte_range := request.headers.get("Range"):
+            start, end = map(int, byte_range.split("=")[1].split("-"))
+            context.status_code = 206
+            context.headers[
+                "Content-Range"
+            ] = f"bytes {start}-{end}/{len(content)}"
+            return content[start:][: end - start + 1]
+        return content
+
+    return respond
+
+
+class RecordingLimiter(bandwidth.Limiter):
+    """Unlimited limiter recording its flows and the bytes paid by them."""
+
+    def __init__(self):
+        super().__init__()
+        self.flows: list[bandwidth.Flow] = []
+        self.consumed: collections.Counter[int] = collections.Counter()
+
+    def flow(self, priority: float = 1.0) -> bandwidth.Flow:
+        flow = super().flow(priority)
+        self.flows.append(flow)
+        return flow
+
+    def consume(self, size: int, flow: bandwidth.Flow) -> None:
+        self.consumed[id(flow)] += size
+        super().consume(size, flow)
+
+
+def mock_ranged_content(
+    requests_mock: req_mock.Mocker, url: str, content: bytes
+) -> None:
+    requests_mock.head(
+        url,
+        headers={
+            "Accept-Ranges": "bytes",
+            "Content-Length": str(len(content)),
+        },
+    )
+    requests_mock.get(url, content=ranged_content(content))
+
+
+# A tiled TIFF with generated pixels, see `make_tiff`
+WIDTH = 40
+HEIGHT = 24
+TILE_SIZE = 16
+ORIGIN = (500_000.0, 10.0, 5_000_000.0)
+
+
+def lzw_encode(data: bytes) -> bytes:
+    table = {bytes([value]): value for value in range(256)}
+    codes = []
+    word = b""
+    for value in data:
+        candidate = word + bytes([value])
+        if candidate in table:
+            word = candidate
+        else:
+            codes.append(table[word])
+            table[candidate] = len(table) + 2
+            word = bytes([value])
+    codes.append(table[word])
+    packed, size = 256, 9
+    bits, entries = 9, 258
+    for index, code in enumerate(codes):
+        packed = packed << bits | code
+        size += bits
+        if index:
+            entries += 1
+            if entries + 1 >= 1 << bits:
+                bits += 1
+    packed = packed << bits | 257
+    size += bits
+    padding = -size % 8
+    return (packed << padding).to_bytes((size + padding) // 8, "big")
+
+
+def pixels(
+    width: int, height: int, samples: int = 1, bits: int = 8
+) -> list[list[int]]:
+    mask = (1 << bits) - 1
+    return [
+        [
+            (row * 31 + column * 7 + sample * 3) & mask
+            for sample in range(samples)
+        ]
+        for row in range(height)
+        for column in range(width)
+    ]
+
+
+def encode_tile(
+    values: list[list[int]],
+    samples: int,
+    bits: int,
+    byte_order: str,
+    compression: int,
+    predictor: int,
+) -> bytes:
+    if predictor == 2:
+        mask = (1 << bits) - 1
+        values = [
+            [
+                (sample - values[index - 1][number]) & mask
+                if index % TILE_SIZE
+                else sample
+                for number, sample in enumerate(pixel)
+            ]
+            for index, pixel in enumerate(values)
+        ]
+    code = {8: "B", 16: "H"}[bits]
+    data = struct.pack(
+        f"{byte_order}{len(values) * samples}{code}",
+        *[sample for pixel in values for sample in pixel],
+    )
+    if compression in cog.DEFLATE:
+        return zlib.compress(data)
+    if compression == cog.LZW:
+        return lzw_encode(data)
+    return data
+
+
+def make_tiff(
+    levels: Sequence[tuple[int, int]] = ((WIDTH, HEIGHT),),
+    samples: int = 1,
+    bits: int = 8,
+    byte_order: str = "<",
+    big: bool = False,
+    compression: int = cog.NO_COMPRESSION,
+    predictor: int = 1,
+    georeferenced: bool = True,
+    tiled: bool = True,
+) -> bytes:
+    offset_format = "Q" if big else "L"
+    offset_type = 16 if big else 4
+    output = bytearray(16 if big else 8)
+    tile_data = []
+    for width, height in levels:
+        image = pixels(width, height, samples, bits)
+        offsets, counts = [], []
+        for tile_row in range(0, height, TILE_SIZE):
+            for tile_column in range(0, width, TILE_SIZE):
+                values = [
+                    (
+                        image[row * width + column]
+                        if row < height and column < width
+                        else [0] * samples
+                    )
+                    for row in range(tile_row, tile_row + TILE_SIZE)
+                    for column in range(tile_column, tile_column + TILE_SIZE)
+                ]
+                data = encode_tile(
+                    values, samples, bits, byte_order, compression, predictor
+                )
+                offsets.append(len(output))
+                counts.append(len(data))
+                output += data
+        tile_data.append((offsets, counts))
+    next_offset_position = 4 if not big else 8
+    for level, ((width, height), (offsets, counts)) in enumerate(
+        zip(levels, tile_data)
+    ):
+        entries: list[tuple[int, int, list]] = [
+            (cog.NEW_SUBFILE_TYPE, 4, [1 if level else 0]),
+            (cog.IMAGE_WIDTH, 3, [width]),
+            (cog.IMAGE_LENGTH, 3, [height]),
+            (cog.BITS_PER_SAMPLE, 3, [bits] * samples),
+            (cog.COMPRESSION, 3, [compression]),
+            (cog.SAMPLES_PER_PIXEL, 3, [samples]),
+            (cog.PREDICTOR, 3, [predictor]),
+        ]
+        if tiled:
+            entries += [
+                (cog.TILE_WIDTH, 3, [TILE_SIZE]),
+                (cog.TILE_LENGTH, 3, [TILE_SIZE]),
+                (cog.TILE_OFFSETS, offset_type, offsets),
+                (cog.TILE_BYTE_COUNTS, offset_type, counts),
+            ]
+        if georeferenced and not level:
+            entries += [
+                (cog.MODEL_PIXEL_SCALE, 12, [ORIGIN[1], ORIGIN[1], 0.0]),
+                (
+                    cog.MODEL_TIEPOINT,
+                    12,
+                    [0.0, 0.0, 0.0, ORIGIN[0], ORIGIN[2], 0.0],
+                ),
+            ]
+        formats = {3: "H", 4: "L", 12: "d", 16: "Q"}
+        field_size = struct.calcsize(f"={offset_format}")
+        ifd_offset = len(output)
+        struct.pack_into(
+            f"{byte_order}{offset_format}",
+            output,
+            next_offset_position,
+            ifd_offset,
+        )
+        count_format = "Q" if big else "H"
+        ifd_size = (
+            struct.calcsize(f"={count_format}")
+            + len(entries) * (4 + 2 * field_size)
+            + field_size
+        )
+        values_area = bytearray()
+        ifd = bytearray(
+            struct.pack(f"{byte_order}{count_format}", len(entries))
+        )
+        for tag, tag_type, values in entries:
+            data = struct.pack(
+                f"{byte_order}{len(values)}{formats[tag_type]}", *values
+            )
+            ifd += struct.pack(
+                f"{byte_order}HH{offset_format}", tag, tag_type, len(values)
+            )
+            if len(data) <= field_size:
+                ifd += data.ljust(field_size, b"\0")
+            else:
+                ifd += struct.pack(
+                    f"{byte_order}{offset_format}",
+                    ifd_offset + ifd_size + len(values_area),
+                )
+                values_area += data
+        next_offset_position = ifd_offset + len(ifd)
+        ifd += bytes(field_size)
+        output += ifd + values_area
+    marker = b"II" if byte_order == "<" else b"MM"
+    if big:
+        output[:8] = marker + struct.pack(f"{byte_order}HHH", 43, 8, 0)
+    else:
+        output[:4] = marker + struct.pack(f"{byte_order}H", 42)
+    return bytes(output)
+
+
+def window_bytes(
+    window: cog.Window,
+    width: int = WIDTH,
+    height: int = HEIGHT,
+    samples: int = 1,
+    bits: int = 8,
+    byte_order: str = "<",
+) -> bytes:
+    image = pixels(width, height, samples, bits)
+    values = [
+        sample
+        for row in range(window.row, window.row + window.height)
+        for column in range(window.column, window.column + window.width)
+        for sample in image[row * width + column]
+    ]
+    code = {8: "B", 16: "H"}[bits]
+    return struct.pack(f"{byte_order}{len(values)}{code}", *values)
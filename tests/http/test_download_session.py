@@ -0,0 +1,39 @@
+from concurrent import futures
+
+import requests
+import requests_mock as req_mock
+
+from up42 import utils
+from up42.http import config, download_session
+
+SOME_URL = "https://storage.com/some-file"
+
+
+def test_should_apply_default_timeout(requests_mock: req_mock.Mocker):
+    requests_mock.get(SOME_URL)
+    settings = config.DownloadSettings(connect_timeout=1, read_timeout=2)
+    session = download_session.create(settings)
+    session.get(SOME_URL)
+    session.get(SOME_URL, timeout=3)
+    assert [request.timeout for request in requests_mock.request_history] == [
+        (1, 2),
+        3,
+    ]
+
+
+def test_should_mount_download_adapter():
+    session = download_session.create(config.DownloadSettings(pool_size=7))
+    for schema in download_session.SCHEMAS:
+        adapter = session.get_adapter(f"{schema}://storage.com")
+        assert isinstance(adapter, requests.adapters.HTTPAdapter)
+        assert adapter.poolmanager.connection_pool_kw["maxsize"] == 7
+    assert "Authorization" not in session.headers
+
+
+def test_should_share_session_between_threads():
+    with futures.ThreadPoolExecutor(4) as pool:
+        sessions = set(
+            map(id, pool.map(lambda _: download_session.shared(), range(8)))
+        )
+    assert len(sessions) == 1
+    assert utils.ImageFile("url").session is download_session.shared()
@@ -24,3 +24,12 @@ def test_should_create_adapter(include_post):
         assert "POST" in allowed_methods
     else:
         assert "POST" not in allowed_methods
+
+
+def test_should_create_download_adapter():
+    settings = config.DownloadSettings(pool_size=7, total=3)
+    adapter = http_adapter.create_download(settings)
+    assert adapter.max_retries.total == 3
+    assert adapter.max_retries.status_forcelist == settings.statuses
+    assert not adapter.max_retries.raise_on_status
+    assert adapter.poolmanager.connection_pool_kw["maxsize"] == 7
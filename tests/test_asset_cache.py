@@ -0,0 +1,128 @@
+import hashlib
+import os
+import pathlib
+import threading
+from concurrent import futures
+from unittest import mock
+
+import pytest
+import requests
+import requests_mock as req_mock
+
+from up42 import asset_cache, utils
+
+KEY = "asset-id#checksum"
+CONTENT = b"content"
+
+
+@pytest.fixture(name="cache")
+def _cache(tmp_path) -> asset_cache.AssetCache:
+    return asset_cache.AssetCache(tmp_path / "cache", max_size=100)
+
+
+@pytest.fixture(name="output_directory")
+def _output_directory(tmp_path) -> pathlib.Path:
+    path = tmp_path / "output"
+    path.mkdir()
+    return path
+
+
+def download(content: bytes = CONTENT):
+    def write(directory: pathlib.Path) -> pathlib.Path:
+        path = directory / "file"
+        path.write_bytes(content)
+        return path
+
+    return mock.Mock(side_effect=write)
+
+
+def entry(cache: asset_cache.AssetCache, key: str) -> pathlib.Path:
+    digest = hashlib.sha256(key.encode()).hexdigest()
+    return cache.directory / "objects" / digest
+
+
+class TestAssetCache:
+    def test_should_download_once_and_link(
+        self, cache: asset_cache.AssetCache, output_directory: pathlib.Path
+    ):
+        first, second = output_directory / "first", output_directory / "second"
+        download_file = download()
+
+        assert cache.fetch(KEY, first, download_file) == first
+        assert cache.fetch(KEY, second, download_file) == second
+
+        download_file.assert_called_once()
+        assert first.read_bytes() == second.read_bytes() == CONTENT
+        assert os.path.samefile(first, second)
+
+    def test_should_download_once_for_concurrent_fetches(
+        self, cache: asset_cache.AssetCache, output_directory: pathlib.Path
+    ):
+        barrier = threading.Barrier(4)
+        download_file = download()
+
+        def fetch(index: int) -> pathlib.Path:
+            barrier.wait()
+            return cache.fetch(
+                KEY, output_directory / str(index), download_file
+            )
+
+        with futures.ThreadPoolExecutor(4) as pool:
+            paths = list(pool.map(fetch, range(4)))
+
+        download_file.assert_called_once()
+        assert all(path.read_bytes() == CONTENT for path in paths)
+
+    def test_should_evict_least_recently_used_entries(
+        self, cache: asset_cache.AssetCache, output_directory: pathlib.Path
+    ):
+        content = b"0" * 40
+        for used_at, key in enumerate(["used", "unused"]):
+            cache.fetch(key, output_directory / key, download(content))
+            os.utime(entry(cache, key), (used_at, used_at))
+        cache.fetch("used", output_directory / "used", download())
+        cache.fetch("new", output_directory / "new", download(content))
+
+        assert not entry(cache, "unused").exists()
+        assert entry(cache, "used").exists()
+        assert entry(cache, "new").exists()
+        assert (output_directory / "unused").read_bytes() == content
+
+
+class TestImageFileCache:
+    url = "https://storage.com/image.tif"
+
+    def test_should_download_image_file_once(
+        self,
+        requests_mock: req_mock.Mocker,
+        cache: asset_cache.AssetCache,
+        tmp_path,
+    ):
+        requests_mock.head(self.url, headers={"ETag": '"etag"'})
+        requests_mock.get(self.url, content=CONTENT)
+        image_file = utils.ImageFile(url=self.url, session=requests.Session())
+        for directory in ["first", "second"]:
+            (tmp_path / directory).mkdir()
+            path = image_file.download(tmp_path / directory, cache=cache)
+            assert path.read_bytes() == CONTENT
+        assert [
+            request.method for request in requests_mock.request_history
+        ] == [
+            "HEAD",
+            "GET",
+            "HEAD",
+        ]
+
+    def test_should_key_image_file_by_cache_key(
+        self,
+        requests_mock: req_mock.Mocker,
+        cache: asset_cache.AssetCache,
+        output_directory: pathlib.Path,
+    ):
+        requests_mock.get(self.url, content=CONTENT)
+        image_file = utils.ImageFile(
+            url=self.url, session=requests.Session(), cache_key=KEY
+        )
+        image_file.download(output_directory, cache=cache)
+        image_file.download(output_directory, cache=cache)
+        assert requests_mock.call_count == 1
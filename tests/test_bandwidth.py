@@ -0,0 +1,71 @@
+import threading
+import time
+
+import pytest
+
+from up42 import bandwidth
+
+CHUNK_SIZE = 16 * 1024
+RATE = 1024 * 1024
+
+
+def consume(flow: bandwidth.Flow, size: int) -> float:
+    started_at = time.monotonic()
+    for _ in range(size // CHUNK_SIZE):
+        flow.consume(CHUNK_SIZE)
+    return time.monotonic() - started_at
+
+
+class TestLimiter:
+    def test_should_not_limit_by_default(self):
+        flow = bandwidth.Limiter().flow()
+        assert consume(flow, 100 * RATE) < 0.5
+        assert flow.read_size(10**6) == 10**6
+
+    def test_should_limit_rate(self):
+        flow = bandwidth.Limiter(RATE).flow()
+        assert 0.2 < consume(flow, RATE // 4) < 1
+
+    def test_should_read_in_slices(self):
+        limiter = bandwidth.Limiter(RATE * 10)
+        assert limiter.read_size(10**7) == RATE
+        limiter.configure(1)
+        assert limiter.read_size(10**7) == bandwidth.MIN_READ_SIZE
+        assert limiter.read_size(1000) == 1000
+
+    def test_should_share_rate_by_priority(self):
+        limiter = bandwidth.Limiter(RATE)
+        stop = threading.Event()
+        consumed = {1: 0, 3: 0}
+
+        def run(priority: int) -> None:
+            flow = limiter.flow(priority)
+            while not stop.is_set():
+                flow.consume(CHUNK_SIZE)
+                consumed[priority] += CHUNK_SIZE
+
+        threads = [threading.Thread(target=run, args=(p,)) for p in consumed]
+        for thread in threads:
+            thread.start()
+        time.sleep(1)
+        stop.set()
+        for thread in threads:
+            thread.join()
+        assert 2 < consumed[3] / consumed[1] < 4.5
+        assert sum(consumed.values()) < 1.5 * RATE
+
+    def test_should_apply_configured_rate_to_waiting_flows(self):
+        limiter = bandwidth.Limiter(1)
+        flow = limiter.flow()
+        thread = threading.Thread(target=consume, args=(flow, 2 * CHUNK_SIZE))
+        thread.start()
+        time.sleep(0.1)
+        assert thread.is_alive()
+        limiter.configure(None)
+        thread.join(timeout=1)
+        assert not thread.is_alive()
+        assert limiter.rate is None
+
+    def test_fails_to_start_flow_without_priority(self):
+        with pytest.raises(ValueError):
+            bandwidth.Limiter().flow(priority=0)
@@ -0,0 +1,53 @@
+import hashlib
+
+import pytest
+
+from up42 import checksums
+
+CONTENT = b"content"
+SHA256 = hashlib.sha256(CONTENT).hexdigest()
+MD5 = hashlib.md5(CONTENT).hexdigest()
+
+
+class TestChecksum:
+    @pytest.mark.parametrize(
+        "multihash, expected",
+        [
+            ("1220" + SHA256, checksums.Checksum("sha256", SHA256)),
+            ("d50110" + MD5, checksums.Checksum("md5", MD5)),
+        ],
+    )
+    def test_should_parse_multihash(
+        self, multihash: str, expected: checksums.Checksum
+    ):
+        assert checksums.Checksum.from_multihash(multihash) == expected
+
+    @pytest.mark.parametrize(
+        "multihash",
+        [
+            "1e20" + SHA256,
+            "1220" + SHA256[:-2],
+            "12",
+            "not-hex",
+        ],
+    )
+    def test_fails_to_parse_unsupported_multihash(self, multihash: str):
+        with pytest.raises(checksums.UnsupportedChecksum):
+            checksums.Checksum.from_multihash(multihash)
+
+    def test_should_verify_digest(self):
+        checksum = checksums.Checksum("sha256", SHA256.upper())
+        hasher = checksum.hasher()
+        hasher.update(CONTENT)
+        checksum.verify(hasher, "file")
+
+    def test_fails_to_verify_different_digest(self):
+        checksum = checksums.Checksum("md5", MD5)
+        hasher = checksum.hasher()
+        hasher.update(CONTENT[::-1])
+        with pytest.raises(checksums.ChecksumMismatch, match="file"):
+            checksum.verify(hasher, "file")
+
+    def test_fails_to_hash_with_unknown_function(self):
+        with pytest.raises(checksums.UnsupportedChecksum):
+            checksums.Checksum("blake3", SHA256).hasher()
@@ -0,0 +1,225 @@
+import io
+from collections.abc import Callable
+
+import pytest
+
+from tests import helpers
+from up42 import cog
+
+
+def open_reader(tiff: bytes) -> cog.Reader:
+    file = io.BytesIO(tiff)
+    return cog.Reader(file, cog.read_header(file))
+
+
+class CountingFile(io.BytesIO):
+    reads = 0
+
+    def read(self, size: int | None = -1) -> bytes:
+        self.reads += 1
+        return super().read(size)
+
+
+class TestReadHeader:
+    def test_should_parse_images_and_transform(self):
+        tiff = helpers.make_tiff(
+            [
+                (helpers.WIDTH, helpers.HEIGHT),
+                (helpers.WIDTH // 2, helpers.HEIGHT // 2),
+            ]
+        )
+        header = cog.read_header(io.BytesIO(tiff))
+        assert header.byte_order == "<"
+        assert header.size == len(tiff)
+        assert [(image.width, image.height) for image in header.images] == [
+            (helpers.WIDTH, helpers.HEIGHT),
+            (helpers.WIDTH // 2, helpers.HEIGHT // 2),
+        ]
+        assert header.images[0].tiles_across == 3
+        assert len(header.images[0].tile_offsets) == 6
+        assert header.transform == (
+            helpers.ORIGIN[0],
+            helpers.ORIGIN[1],
+            helpers.ORIGIN[2],
+            -helpers.ORIGIN[1],
+        )
+
+    def test_should_parse_big_tiff(self):
+        header = cog.read_header(
+            io.BytesIO(helpers.make_tiff(big=True, byte_order=">"))
+        )
+        assert header.byte_order == ">"
+        assert header.images[0].width == helpers.WIDTH
+
+    @pytest.mark.parametrize(
+        "tiff, message",
+        [
+            (b"PK\x03\x04" + bytes(12), "Not a TIFF file"),
+            (helpers.make_tiff(tiled=False), "Only tiled TIFF files"),
+        ],
+        ids=["zip", "stripped"],
+    )
+    def test_fails_to_parse_unsupported_files(self, tiff: bytes, message: str):
+        with pytest.raises(cog.UnsupportedTiff, match=message):
+            cog.read_header(io.BytesIO(tiff))
+
+
+class TestReader:
+    @pytest.mark.parametrize(
+        "options",
+        [
+            {},
+            {"compression": 8},
+            {"compression": 32946, "predictor": 2},
+            {"compression": cog.LZW},
+            {"compression": cog.LZW, "predictor": 2, "samples": 3},
+            {"bits": 16, "samples": 3, "byte_order": ">", "predictor": 2},
+            {"big": True, "compression": 8},
+        ],
+    )
+    def test_should_read_windows(self, options: dict):
+        reader = open_reader(helpers.make_tiff(**options))
+        window = cog.Window(column=10, row=5, width=27, height=19)
+        raster = reader.read(window)
+        layout = {
+            key: value
+            for key, value in options.items()
+            if key in ("samples", "bits", "byte_order")
+        }
+        assert raster.data == helpers.window_bytes(window, **layout)
+        assert raster.shape == (19, 27, options.get("samples", 1))
+        assert raster.dtype == (
+            f"{options.get('byte_order', '<')}u{options.get('bits', 8) // 8}"
+        )
+
+    def test_should_read_whole_image(self):
+        raster = open_reader(helpers.make_tiff()).read()
+        assert raster.data == helpers.window_bytes(
+            cog.Window(0, 0, helpers.WIDTH, helpers.HEIGHT)
+        )
+
+    def test_should_read_overviews(self):
+        reader = open_reader(
+            helpers.make_tiff([(helpers.WIDTH, helpers.HEIGHT), (20, 12)])
+        )
+        window = cog.Window(column=3, row=2, width=15, height=10)
+        raster = reader.read(window, overview=1)
+        assert raster.data == helpers.window_bytes(window, width=20, height=12)
+
+    def test_should_fetch_adjacent_tiles_at_once(self):
+        tiff = helpers.make_tiff()
+        file = CountingFile(tiff)
+        reader = cog.Reader(file, cog.read_header(io.BytesIO(tiff)))
+        reader.read(
+            cog.Window(
+                column=0, row=0, width=helpers.WIDTH, height=helpers.HEIGHT
+            )
+        )
+        assert file.reads == 1
+
+    @pytest.mark.parametrize(
+        "bounds, overview, window",
+        [
+            (
+                (500_100.0, 4_999_850.0, 500_250.0, 4_999_950.0),
+                0,
+                cog.Window(column=10, row=5, width=15, height=10),
+            ),
+            (
+                (500_105.0, 4_999_845.0, 500_245.0, 4_999_955.0),
+                0,
+                cog.Window(column=10, row=4, width=15, height=12),
+            ),
+            (
+                (499_000.0, 4_000_000.0, 600_000.0, 6_000_000.0),
+                0,
+                cog.Window(
+                    column=0, row=0, width=helpers.WIDTH, height=helpers.HEIGHT
+                ),
+            ),
+            (
+                (500_100.0, 4_999_850.0, 500_250.0, 4_999_950.0),
+                1,
+                cog.Window(column=5, row=2, width=8, height=6),
+            ),
+        ],
+    )
+    def test_should_compute_geographic_windows(
+        self,
+        bounds: tuple[float, float, float, float],
+        overview: int,
+        window: cog.Window,
+    ):
+        reader = open_reader(
+            helpers.make_tiff([(helpers.WIDTH, helpers.HEIGHT), (20, 12)])
+        )
+        assert reader.window(bounds, overview) == window
+
+    @pytest.mark.parametrize(
+        "read",
+        [
+            lambda reader: reader.read(cog.Window(30, 0, 11, 1)),
+            lambda reader: reader.read(cog.Window(-1, 0, 1, 1)),
+            lambda reader: reader.window((0.0, 0.0, 1.0, 1.0)),
+        ],
+    )
+    def test_fails_outside_of_image(
+        self, read: Callable[[cog.Reader], object]
+    ):
+        with pytest.raises(ValueError, match="outside of the image"):
+            read(open_reader(helpers.make_tiff()))
+
+    def test_fails_to_read_unsupported_compression(self):
+        reader = open_reader(helpers.make_tiff())
+        reader.header.images[0] = cog.Image(
+            **{**vars(reader.header.images[0]), "compression": 7}
+        )
+        with pytest.raises(cog.UnsupportedTiff, match="compression 7"):
+            reader.read()
+
+    def test_fails_to_locate_without_georeferencing(self):
+        reader = open_reader(helpers.make_tiff(georeferenced=False))
+        with pytest.raises(cog.UnsupportedTiff, match="not georeferenced"):
+            reader.window((0.0, 0.0, 1.0, 1.0))
+
+
+def test_should_decode_lzw_with_growing_codes():
+    data = bytes((index * index + index // 7) % 251 for index in range(3000))
+    header = cog.read_header(
+        io.BytesIO(helpers.make_tiff(compression=cog.LZW))
+    )
+    assert (
+        cog.decode_tile(helpers.lzw_encode(data), header.images[0], "<")
+        == data
+    )
+
+
+class TestHeaderCache:
+    def test_should_read_headers_once(self):
+        cache = cog.HeaderCache(size=2)
+        header = cog.read_header(io.BytesIO(helpers.make_tiff()))
+        reads = []
+
+        def read() -> cog.Header:
+            reads.append(1)
+            return header
+
+        assert cache.get("first", read) == header
+        assert cache.get("first", read) == header
+        assert len(reads) == 1
+
+    def test_should_evict_least_recently_used_headers(self):
+        cache = cog.HeaderCache(size=2)
+        header = cog.read_header(io.BytesIO(helpers.make_tiff()))
+        keys = []
+
+        def read(key: str) -> Callable[[], cog.Header]:
+            def read_header() -> cog.Header:
+                keys.append(key)
+                return header
+
+            return read_header
+
+        for key in ["first", "second", "first", "third", "second"]:
+            cache.get(key, read(key))
+        assert keys == ["first", "second", "third", "second"]
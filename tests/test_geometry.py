@@ -0,0 +1,282 @@
+import math
+from unittest import mock
+
+import pytest
+
+from up42 import geometry
+
+SQUARE = geometry.box((0.0, 0.0, 4.0, 4.0))
+# A square with a hole from 1 to 3
+FRAME = {
+    "type": "Polygon",
+    "coordinates": SQUARE["coordinates"]
+    + [[[1, 1], [1, 3], [3, 3], [3, 1], [1, 1]]],
+}
+# Concave polygon whose bounds contain (3, 3) but not the polygon
+L_SHAPE = {
+    "type": "Polygon",
+    "coordinates": [[[0, 0], [4, 0], [4, 1], [1, 1], [1, 4], [0, 4], [0, 0]]],
+}
+
+
+def test_should_compute_bounds():
+    multi_polygon = {
+        "type": "MultiPolygon",
+        "coordinates": [
+            SQUARE["coordinates"],
+            geometry.box((5.0, -1.0, 6.0, 1.0))["coordinates"],
+        ],
+    }
+    assert geometry.bounds(multi_polygon) == (0.0, -1.0, 6.0, 4.0)
+
+
+def test_should_compute_bounds_of_points():
+    assert geometry.bounds({"type": "Point", "coordinates": [1, 2]}) == (
+        1,
+        2,
+        1,
+        2,
+    )
+
+
+def test_fails_to_compute_bounds_of_lines():
+    with pytest.raises(ValueError, match="LineString"):
+        geometry.bounds(
+            {"type": "LineString", "coordinates": [[0, 0], [1, 1]]}
+        )
+
+
+def point(x: float, y: float) -> dict:
+    return {"type": "Point", "coordinates": [x, y]}
+
+
+@pytest.mark.parametrize(
+    "first, second, expected",
+    [
+        (point(2, 2), SQUARE, True),
+        (SQUARE, point(4, 1), True),
+        (FRAME, point(2, 2), False),
+        (L_SHAPE, point(3, 3), False),
+        (point(1, 1), point(1, 1), True),
+        (point(1, 1), point(1, 2), False),
+    ],
+)
+def test_should_intersect_points(first: dict, second: dict, expected: bool):
+    assert geometry.intersects(first, second) == expected
+
+
+def test_should_contain_points():
+    assert geometry.contains(SQUARE, point(4, 4))
+    assert not geometry.contains(FRAME, point(2, 2))
+    assert not geometry.contains(SQUARE, point(5, 4))
+
+
+@pytest.mark.parametrize(
+    "first, second, expected",
+    [
+        (SQUARE, point(2, 2), 0.0),
+        (SQUARE, point(7, 8), 5.0),
+        (FRAME, point(2, 2), 1.0),
+        (L_SHAPE, point(3, 3), 2.0),
+        (geometry.box((6.0, 1.0, 7.0, 2.0)), SQUARE, 2.0),
+        (point(0, 0), point(3, 4), 5.0),
+    ],
+)
+def test_should_measure_distance(first: dict, second: dict, expected: float):
+    assert geometry.distance(first, second) == pytest.approx(expected)
+
+
+def test_should_split_bounds_into_grid():
+    assert list(geometry.grid((0.0, 0.0, 2.5, 1.0), 1.0)) == [
+        (0.0, 0.0, 1.0, 1.0),
+        (1.0, 0.0, 2.0, 1.0),
+        (2.0, 0.0, 2.5, 1.0),
+    ]
+
+
+@pytest.mark.parametrize(
+    "shape, other, expected",
+    [
+        (SQUARE, geometry.box((3.0, 3.0, 5.0, 5.0)), True),
+        (SQUARE, geometry.box((4.0, 4.0, 5.0, 5.0)), True),
+        (SQUARE, geometry.box((1.0, 1.0, 2.0, 2.0)), True),
+        (geometry.box((1.0, 1.0, 2.0, 2.0)), SQUARE, True),
+        (SQUARE, geometry.box((4.5, 0.0, 5.0, 1.0)), False),
+        (L_SHAPE, geometry.box((2.0, 2.0, 3.0, 3.0)), False),
+        (L_SHAPE, geometry.box((0.5, 2.0, 3.0, 3.0)), True),
+        (FRAME, geometry.box((1.5, 1.5, 2.5, 2.5)), False),
+        (FRAME, geometry.box((0.5, 0.5, 2.5, 2.5)), True),
+        (
+            {
+                "type": "MultiPolygon",
+                "coordinates": [
+                    geometry.box((5.0, 5.0, 6.0, 6.0))["coordinates"],
+                    geometry.box((0.0, 0.0, 1.0, 1.0))["coordinates"],
+                ],
+            },
+            geometry.box((2.0, 2.0, 3.0, 3.0)),
+            False,
+        ),
+    ],
+)
+def test_should_compute_intersection(shape: dict, other: dict, expected: bool):
+    assert geometry.intersects(shape, other) == expected
+    assert geometry.intersects(other, shape) == expected
+
+
+def circle(center: tuple[float, float], radius: float, count: int) -> dict:
+    ring = [
+        [
+            center[0] + radius * math.cos(2 * math.pi * index / count),
+            center[1] + radius * math.sin(2 * math.pi * index / count),
+        ]
+        for index in range(count)
+    ]
+    return {"type": "Polygon", "coordinates": [ring + ring[:1]]}
+
+
+def test_should_intersect_large_areas_without_comparing_all_edges():
+    area = circle((0.0, 0.0), 10.0, 5000)
+    # Footprints crossing, outside and within the area
+    footprints = [
+        (geometry.box((9.9, -0.1, 10.1, 0.1)), True, False),
+        (geometry.box((10.1, -0.1, 10.3, 0.1)), False, False),
+        (geometry.box((-1.0, -1.0, 1.0, 1.0)), True, True),
+    ]
+    with mock.patch.object(
+        geometry,
+        "_segments_intersect",
+        wraps=geometry._segments_intersect,  # pylint: disable=protected-access
+    ) as segments_intersect:
+        for footprint, intersecting, contained in footprints:
+            assert geometry.intersects(area, footprint) == intersecting
+            assert geometry.intersects(footprint, area) == intersecting
+            assert geometry.contains(area, footprint) == contained
+    assert segments_intersect.call_count < 100
+
+
+def test_should_intersect_crossing_large_areas():
+    # A plus sign of densified rectangles, no vertex lies in the other one
+    horizontal = geometry.box((-10.0, -1.0, 10.0, 1.0))
+    vertical = geometry.box((-1.0, -10.0, 1.0, 10.0))
+    for shape in [horizontal, vertical]:
+        ring = shape["coordinates"][0]
+        shape["coordinates"] = [
+            [
+                [
+                    start[0] + (end[0] - start[0]) * step / 1000,
+                    start[1] + (end[1] - start[1]) * step / 1000,
+                ]
+                for start, end in zip(ring, ring[1:])
+                for step in range(1000)
+            ]
+            + [ring[0]]
+        ]
+    assert geometry.intersects(horizontal, vertical)
+    assert not geometry.contains(horizontal, vertical)
+
+
+@pytest.mark.parametrize(
+    "outer, inner, expected",
+    [
+        (SQUARE, geometry.box((1.0, 1.0, 2.0, 2.0)), True),
+        (SQUARE, SQUARE, True),
+        (SQUARE, geometry.box((3.0, 3.0, 5.0, 5.0)), False),
+        (geometry.box((1.0, 1.0, 2.0, 2.0)), SQUARE, False),
+        (L_SHAPE, geometry.box((0.0, 0.0, 1.0, 4.0)), True),
+        (L_SHAPE, geometry.box((0.5, 0.5, 2.0, 2.0)), False),
+        (FRAME, geometry.box((0.5, 0.5, 1.0, 3.0)), True),
+        (FRAME, geometry.box((0.5, 0.5, 3.5, 3.5)), False),
+        (
+            {
+                "type": "MultiPolygon",
+                "coordinates": [
+                    geometry.box((0.0, 0.0, 1.0, 1.0))["coordinates"],
+                    geometry.box((2.0, 2.0, 3.0, 3.0))["coordinates"],
+                ],
+            },
+            {
+                "type": "MultiPolygon",
+                "coordinates": [
+                    geometry.box((0.2, 0.2, 0.8, 0.8))["coordinates"],
+                    geometry.box((2.2, 2.2, 2.8, 2.8))["coordinates"],
+                ],
+            },
+            True,
+        ),
+    ],
+)
+def test_should_compute_containment(outer: dict, inner: dict, expected: bool):
+    assert geometry.contains(outer, inner) == expected
+
+
+class TestSTRTree:
+    def test_should_find_overlapping_bounds(self):
+        entries = [
+            ((x * 0.7, y * 0.3, x * 0.7 + 0.5, y * 0.3 + 0.5), (x, y))
+            for x in range(30)
+            for y in range(30)
+        ]
+        tree = geometry.STRTree(entries, node_capacity=4)
+        assert len(tree) == 900
+        for query in [
+            (0.0, 0.0, 0.1, 0.1),
+            (3.3, 2.0, 5.0, 2.1),
+            (-1.0, -1.0, 100.0, 100.0),
+            (50.0, 50.0, 60.0, 60.0),
+        ]:
+            assert sorted(tree.query(query)) == sorted(
+                item
+                for bounds, item in entries
+                if geometry.intersects(
+                    geometry.box(bounds), geometry.box(query)
+                )
+            )
+
+    def test_should_query_empty_tree(self):
+        assert not geometry.STRTree([]).query((0.0, 0.0, 1.0, 1.0))
+        assert not geometry.STRTree([]).nearest((0.0, 0.0, 1.0, 1.0))
+
+    def test_should_find_nearest_bounds(self):
+        entries = [
+            ((x, y, x + 0.5, y + 0.5), (x, y))
+            for x in range(20)
+            for y in range(20)
+        ]
+        tree = geometry.STRTree(entries, node_capacity=4)
+        assert tree.nearest((3.2, 4.2, 3.3, 4.3)) == [(3, 4)]
+        assert sorted(tree.nearest((30.0, 0.0, 30.0, 0.0), count=2)) == [
+            (19, 0),
+            (19, 1),
+        ]
+        assert len(tree.nearest((0.0, 0.0, 0.0, 0.0), count=1000)) == 400
+
+    def test_should_find_nearest_by_exact_distance(self):
+        # The bounds of the L shape are nearer but the square is
+        tree = geometry.STRTree(
+            [
+                (geometry.bounds(L_SHAPE), "L"),
+                ((3.5, 3.5, 4.0, 4.0), "square"),
+            ]
+        )
+        footprints = {"L": L_SHAPE, "square": geometry.box((3.5, 3.5, 4, 4))}
+        origin = point(3, 3)
+        assert tree.nearest((3.0, 3.0, 3.0, 3.0)) == ["L"]
+        assert tree.nearest(
+            (3.0, 3.0, 3.0, 3.0),
+            count=2,
+            distance_to=lambda key: geometry.distance(footprints[key], origin),
+        ) == ["square", "L"]
+
+    def test_fails_with_invalid_node_capacity(self):
+        with pytest.raises(ValueError, match="capacity"):
+            geometry.STRTree([], node_capacity=1)
+
+
+def test_should_unite_bounds():
+    assert geometry.union([(0.0, 1.0, 2.0, 3.0), (-1.0, 2.0, 1.0, 4.0)]) == (
+        -1.0,
+        1.0,
+        2.0,
+        4.0,
+    )
@@ -1,5 +1,5 @@
 import dataclasses
-from typing import Any
+from typing import Any, Literal
 
 import geojson  # type: ignore
 import pytest
@@ -7,7 +7,7 @@ import requests
 import requests_mock as req_mock
 
 from tests import constants, helpers
-from up42 import glossary, utils
+from up42 import glossary, search_cache, utils
 
 DATA_PRODUCT = glossary.DataProduct(
     name="data-product-name",
@@ -77,7 +77,7 @@ SCENE = glossary.Scene(
     ),
     provider_properties={"some": "properties"},
 )
-SCENE_FEATURE = {
+SCENE_FEATURE: dict[str, Any] = {
     "geometry": POLYGON,
     "bbox": BBOX,
     "properties": {
@@ -252,6 +252,77 @@ class TestProvider:
             == [SCENE] * 5
         )
 
+    def test_should_resolve_scene_fields_on_access(
+        self, requests_mock: req_mock.Mocker
+    ):
+        requests_mock.post(
+            url=self.search_url,
+            json={"features": [SCENE_FEATURE], "links": []},
+        )
+        scene = next(self.provider.search(bbox=BBOX))
+        assert not {"id", "quicklook"} & set(vars(scene))
+        assert scene.id == SCENE_ID
+        assert scene.quicklook == SCENE.quicklook
+        assert {"id", "quicklook"} <= set(vars(scene))
+        assert scene == SCENE
+        with pytest.raises(AttributeError, match="unknown"):
+            getattr(scene, "unknown")
+
+    def test_should_replay_cached_search(self, requests_mock: req_mock.Mocker):
+        next_page_url = f"{self.search_url}/next"
+        requests_mock.post(
+            url=self.search_url,
+            json={
+                "features": [SCENE_FEATURE],
+                "links": [{"rel": "next", "href": next_page_url}],
+            },
+        )
+        requests_mock.post(
+            url=next_page_url, json={"features": [SCENE_FEATURE], "links": []}
+        )
+        cache = search_cache.SearchCache()
+        scenes = list(self.provider.search(bbox=BBOX, cache=cache))
+        assert scenes == [SCENE] * 2
+        assert list(self.provider.search(bbox=BBOX, cache=cache)) == scenes
+        assert requests_mock.call_count == 2
+
+    def test_should_answer_covered_search_from_cache(
+        self, requests_mock: req_mock.Mocker
+    ):
+        requests_mock.post(
+            url=self.search_url,
+            json={
+                "features": [
+                    SCENE_FEATURE,
+                    {**scene_feature("outside"), "geometry": square(3, 3, 1)},
+                ],
+                "links": [],
+            },
+        )
+        cache = search_cache.SearchCache(answer_covered=True)
+        area = [0.0, 0.0, 4.0, 4.0]
+        assert len(list(self.provider.search(bbox=area, cache=cache))) == 2
+        assert list(self.provider.search(intersects=POLYGON, cache=cache)) == [
+            SCENE
+        ]
+        assert not list(
+            self.provider.search(
+                intersects=POLYGON, collections=["phr"], cache=cache
+            )
+        )
+        assert requests_mock.call_count == 1
+
+    def test_should_not_cache_partially_consumed_search(
+        self, requests_mock: req_mock.Mocker
+    ):
+        requests_mock.post(
+            url=self.search_url,
+            json={"features": [SCENE_FEATURE] * 2, "links": []},
+        )
+        cache = search_cache.SearchCache()
+        next(self.provider.search(bbox=BBOX, cache=cache))
+        assert cache.get(HOST_NAME, {"bbox": BBOX}) is None
+
 
 class TestProductGlossary:
     @pytest.mark.parametrize(
@@ -319,3 +390,238 @@ class TestProductGlossary:
             ]
             * 2
         )
+
+    def test_should_get_hosts(self, requests_mock: req_mock.Mocker):
+        producer = {"name": "producer", "roles": ["PRODUCER"]}
+        collections = [
+            {
+                "name": name,
+                "description": "description",
+                "title": "title",
+                "type": "ARCHIVE",
+                "integrations": [],
+                "providers": providers,
+                "dataProducts": [],
+            }
+            for name, providers in [
+                ("first", [producer, {"name": "host", "roles": ["HOST"]}]),
+                ("second", [{"name": "host", "roles": ["HOST"]}]),
+            ]
+        ]
+        requests_mock.get(
+            f"{constants.API_HOST}/v2/collections?page=0",
+            json={"content": collections, "totalPages": 1},
+        )
+        assert glossary.ProductGlossary.get_hosts() == [
+            glossary.Provider(name="host", roles=["HOST"])
+        ]
+
+
+def scene_feature(scene_id: str, datetime: str = "datetime") -> dict:
+    properties = {**SCENE_FEATURE["properties"], "id": scene_id}
+    return {
+        **SCENE_FEATURE,
+        "properties": {**properties, "datetime": datetime},
+    }
+
+
+class TestMultiHostSearch:
+    providers = [
+        glossary.Provider(name=name, roles=["HOST"])
+        for name in ["first", "second"]
+    ]
+
+    def mock_search(
+        self, requests_mock: req_mock.Mocker, name: str, features: list[dict]
+    ) -> None:
+        requests_mock.post(
+            f"{constants.API_HOST}/catalog/hosts/{name}/stac/search",
+            json={"features": features, "links": []},
+        )
+
+    def test_should_merge_scenes_of_all_hosts(
+        self, requests_mock: req_mock.Mocker
+    ):
+        self.mock_search(
+            requests_mock, "first", [scene_feature("a"), scene_feature("b")]
+        )
+        self.mock_search(
+            requests_mock, "second", [scene_feature("b"), scene_feature("c")]
+        )
+        search = glossary.MultiHostSearch(self.providers)
+        scenes = list(search.search(bbox=BBOX))
+        assert sorted(scene.id for scene in scenes) == ["a", "b", "c"]
+        assert {
+            name: report.scenes for name, report in search.reports.items()
+        } == {"first": 2, "second": 2}
+        assert not search.failed
+        assert not search.slow
+        assert all(
+            request.json() == {"bbox": BBOX}
+            for request in requests_mock.request_history
+        )
+
+    @pytest.mark.parametrize(
+        "order, expected_ids",
+        [("ascending", ["c", "a", "b"]), ("descending", ["b", "a", "c"])],
+    )
+    def test_should_order_scenes_by_datetime(
+        self,
+        requests_mock: req_mock.Mocker,
+        order: Literal["ascending", "descending"],
+        expected_ids: list[str],
+    ):
+        self.mock_search(
+            requests_mock,
+            "first",
+            [
+                scene_feature("a", "2024-02-01"),
+                scene_feature("b", "2024-03-01"),
+            ],
+        )
+        self.mock_search(
+            requests_mock, "second", [scene_feature("c", "2024-01-01")]
+        )
+        search = glossary.MultiHostSearch(self.providers)
+        scenes = search.search(order_by_datetime=order)
+        assert [scene.id for scene in scenes] == expected_ids
+
+    def test_should_report_failed_and_slow_hosts(
+        self, requests_mock: req_mock.Mocker
+    ):
+        self.mock_search(requests_mock, "first", [scene_feature("a")])
+        requests_mock.post(
+            f"{constants.API_HOST}/catalog/hosts/second/stac/search",
+            status_code=500,
+        )
+        clock = iter([0.0, 20.0, 20.0, 21.0])
+        search = glossary.MultiHostSearch(
+            self.providers,
+            max_workers=1,
+            slow_after=10.0,
+            clock=lambda: next(clock),
+        )
+        assert [scene.id for scene in search.search()] == ["a"]
+        assert list(search.failed) == ["second"]
+        assert isinstance(search.failed["second"], requests.HTTPError)
+        assert search.slow == ["first"]
+
+
+def square(west: float, south: float, size: float) -> dict:
+    return {
+        "type": "Polygon",
+        "coordinates": [
+            [
+                [west, south],
+                [west + size, south],
+                [west + size, south + size],
+                [west, south + size],
+                [west, south],
+            ]
+        ],
+    }
+
+
+class TestSearchTiled:
+    provider = glossary.Provider(name=HOST_NAME, roles=["HOST"])
+    search_url = f"{constants.API_HOST}/catalog/hosts/{HOST_NAME}/stac/search"
+    area = {
+        "type": "Polygon",
+        "coordinates": [[[0, 0], [2, 0], [0, 1.8], [0, 0]]],
+    }
+
+    def test_should_search_tiles_of_area(self, requests_mock: req_mock.Mocker):
+        inside = {**scene_feature("inside"), "geometry": square(0.2, 0.2, 0.1)}
+        straddling = {
+            **scene_feature("straddling"),
+            "geometry": square(0.9, 0.2, 0.2),
+        }
+        outside = {
+            **scene_feature("outside"),
+            "geometry": square(1.8, 0.8, 0.1),
+        }
+        features = {
+            (0.0, 0.0, 1.0, 1.0): [inside, straddling],
+            (1.0, 0.0, 2.0, 1.0): [straddling, outside],
+            (0.0, 1.0, 1.0, 1.8): [],
+        }
+        requests_mock.post(
+            self.search_url,
+            json=lambda request, _: {
+                "features": features[tuple(request.json()["bbox"])],
+                "links": [],
+            },
+        )
+        scenes = self.provider.search_tiled(
+            self.area, tile_size=1.0, collections=["phr"]
+        )
+        assert sorted(scene.id for scene in scenes) == ["inside", "straddling"]
+        assert sorted(
+            tuple(request.json()["bbox"])
+            for request in requests_mock.request_history
+        ) == sorted(features)
+        assert all(
+            request.json()["collections"] == ["phr"]
+            for request in requests_mock.request_history
+        )
+
+    def test_fails_to_search_if_search_request_is_invalid(
+        self, requests_mock: req_mock.Mocker
+    ):
+        requests_mock.post(
+            self.search_url,
+            status_code=422,
+            json={"error": {"message": "invalid request"}},
+        )
+        with pytest.raises(glossary.InvalidSearchRequest):
+            list(self.provider.search_tiled(self.area))
+
+    def test_fails_to_search_with_invalid_tile_size(self):
+        with pytest.raises(ValueError, match="Tile size"):
+            next(self.provider.search_tiled(self.area, tile_size=0))
+
+
+class TestSearchBatch:
+    provider = glossary.Provider(name=HOST_NAME, roles=["HOST"])
+    search_url = f"{constants.API_HOST}/catalog/hosts/{HOST_NAME}/stac/search"
+    areas = {
+        "north-a": square(10.1, 50.1, 0.01),
+        "north-b": square(10.5, 50.6, 0.01),
+        "south": square(-3.5, -20.5, 0.01),
+        "empty": square(10.9, 50.9, 0.01),
+    }
+
+    def test_should_search_groups_of_areas(
+        self, requests_mock: req_mock.Mocker
+    ):
+        north = {
+            **scene_feature("north"),
+            "geometry": square(10.0, 50.0, 0.55),
+        }
+        both = {**scene_feature("both"), "geometry": square(10.0, 50.0, 0.65)}
+        south = {**scene_feature("south"), "geometry": square(-4.0, -21.0, 1)}
+        features = {
+            (10.1, 50.1, 10.91, 50.91): [north, both],
+            (-3.5, -20.5, -3.49, -20.49): [south, both],
+        }
+
+        def respond(request, _) -> dict:
+            bbox = tuple(round(value, 6) for value in request.json()["bbox"])
+            return {"features": features[bbox], "links": []}
+
+        requests_mock.post(self.search_url, json=respond)
+        results = self.provider.search_batch(self.areas, group_size=1.0)
+        assert {
+            key: sorted(scene.id for scene in scenes)
+            for key, scenes in results.items()
+        } == {
+            "north-a": ["both", "north"],
+            "north-b": ["both"],
+            "south": ["south"],
+            "empty": [],
+        }
+        assert requests_mock.call_count == 2
+
+    def test_fails_to_search_with_invalid_group_size(self):
+        with pytest.raises(ValueError, match="Group size"):
+            self.provider.search_batch(self.areas, group_size=0)
@@ -0,0 +1,149 @@
+import datetime as dt
+import pathlib
+
+import requests_mock as req_mock
+
+from tests import constants
+from up42 import glossary, monitor
+
+HOST_NAME = "host-name"
+SEARCH_URL = f"{constants.API_HOST}/catalog/hosts/{HOST_NAME}/stac/search"
+PROVIDER = glossary.Provider(name=HOST_NAME, roles=["HOST"])
+BBOX = [0.0, 0.0, 1.0, 1.0]
+
+
+def feature(
+    scene_id: str,
+    datetime: str | None,
+    start_datetime: str | None = None,
+    end_datetime: str | None = None,
+) -> dict:
+    return {
+        "geometry": None,
+        "properties": {
+            "id": scene_id,
+            "datetime": datetime,
+            "start_datetime": start_datetime,
+            "end_datetime": end_datetime,
+            "constellation": "constellation",
+            "collection": "collection",
+            "producer": "producer",
+            "providerProperties": {},
+        },
+    }
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = dt.datetime(2024, 1, 10, 12)
+
+    def __call__(self) -> dt.datetime:
+        return self.now
+
+
+def mock_search(requests_mock: req_mock.Mocker, features: list[dict]):
+    requests_mock.post(SEARCH_URL, json={"features": features, "links": []})
+
+
+class TestMonitor:
+    def test_should_yield_new_scenes_since_last_poll(
+        self, requests_mock: req_mock.Mocker, tmp_path: pathlib.Path
+    ):
+        clock = FakeClock()
+        state = tmp_path / "monitor.db"
+        old = feature("old", "2024-01-10T10:00:00Z")
+        late = feature("late", "2024-01-10T11:00:00Z")
+        with monitor.Monitor(PROVIDER, state, clock=clock) as first:
+            mock_search(requests_mock, [old])
+            scenes = first.poll("site", bbox=BBOX, start_date="2024-01-01")
+            assert [scene.id for scene in scenes] == ["old"]
+            assert first.watermark("site") == clock.now
+        assert requests_mock.last_request
+        assert requests_mock.last_request.json()["datetime"] == (
+            "2024-01-01T00:00:00Z/.."
+        )
+
+        clock.now += dt.timedelta(hours=1)
+        with monitor.Monitor(PROVIDER, state, clock=clock) as second:
+            mock_search(requests_mock, [old, late])
+            scenes = second.poll("site", bbox=BBOX, start_date="2024-01-01")
+            assert [scene.id for scene in scenes] == ["late"]
+        assert requests_mock.last_request.json() == {
+            "bbox": BBOX,
+            "datetime": "2024-01-09T12:00:00Z/..",
+        }
+
+    def test_should_forget_scenes_before_search_window(
+        self, requests_mock: req_mock.Mocker, tmp_path: pathlib.Path
+    ):
+        clock = FakeClock()
+        with monitor.Monitor(
+            PROVIDER, tmp_path / "monitor.db", clock=clock
+        ) as scenes_monitor:
+            mock_search(
+                requests_mock,
+                [
+                    feature("old", "2024-01-05T10:00:00Z"),
+                    feature("recent", "2024-01-10T10:00:00Z"),
+                ],
+            )
+            assert len(list(scenes_monitor.poll("site"))) == 2
+            # pylint: disable-next=protected-access
+            seen = scenes_monitor._connection.execute(
+                "SELECT scene_id FROM seen"
+            ).fetchall()
+            assert seen == [("recent",)]
+
+    def test_should_remember_scenes_acquired_into_search_window(
+        self, requests_mock: req_mock.Mocker, tmp_path: pathlib.Path
+    ):
+        clock = FakeClock()
+        # Started before and ended within the search window of later polls
+        interval = feature(
+            "interval", None, "2024-01-05T10:00:00Z", "2024-01-10T10:00:00Z"
+        )
+        mock_search(requests_mock, [interval])
+        with monitor.Monitor(
+            PROVIDER, tmp_path / "monitor.db", clock=clock
+        ) as scenes_monitor:
+            polls = []
+            for _ in range(3):
+                polls.append(
+                    [scene.id for scene in scenes_monitor.poll("site")]
+                )
+                clock.now += dt.timedelta(hours=1)
+            assert polls == [["interval"], [], []]
+
+    def test_should_keep_watermark_of_unfinished_poll(
+        self, requests_mock: req_mock.Mocker, tmp_path: pathlib.Path
+    ):
+        clock = FakeClock()
+        mock_search(
+            requests_mock,
+            [
+                feature("first", "2024-01-10T10:00:00Z"),
+                feature("second", "2024-01-10T11:00:00Z"),
+            ],
+        )
+        with monitor.Monitor(
+            PROVIDER, tmp_path / "monitor.db", clock=clock
+        ) as scenes_monitor:
+            assert next(scenes_monitor.poll("site")).id == "first"
+            assert scenes_monitor.watermark("site") is None
+            assert [scene.id for scene in scenes_monitor.poll("site")] == [
+                "second"
+            ]
+
+    def test_should_track_areas_separately(
+        self, requests_mock: req_mock.Mocker, tmp_path: pathlib.Path
+    ):
+        mock_search(requests_mock, [feature("scene", "2024-01-10T10:00:00Z")])
+        with monitor.Monitor(
+            PROVIDER, tmp_path / "monitor.db", clock=FakeClock()
+        ) as scenes_monitor:
+            assert len(list(scenes_monitor.poll("first"))) == 1
+            assert len(list(scenes_monitor.poll("second"))) == 1
+            assert not list(scenes_monitor.poll("first"))
+            scenes_monitor.reset("first")
+            assert scenes_monitor.watermark("first") is None
+            assert len(list(scenes_monitor.poll("first"))) == 1
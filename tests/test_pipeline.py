@@ -0,0 +1,76 @@
+import threading
+from concurrent import futures
+
+import pytest
+
+from up42 import pipeline
+
+
+def double(item: int) -> int:
+    return item * 2
+
+
+class TestPipeline:
+    def test_should_return_results_in_submission_order(self):
+        with pipeline.Pipeline(double) as items_pipeline:
+            for item in range(10):
+                items_pipeline.submit(item)
+        assert items_pipeline.results == [item * 2 for item in range(10)]
+
+    def test_should_run_callbacks_in_process_pool(self):
+        with futures.ProcessPoolExecutor(2) as executor:
+            items_pipeline: pipeline.Pipeline[int, int] = pipeline.Pipeline(
+                abs, executor
+            )
+            for item in [-1, -2, 3]:
+                items_pipeline.submit(item)
+            assert items_pipeline.close() == [1, 2, 3]
+
+    def test_should_block_submissions_while_queue_is_full(self):
+        release = threading.Event()
+        items_pipeline: pipeline.Pipeline[int, bool] = pipeline.Pipeline(
+            lambda item: release.wait(), max_pending=2
+        )
+        items_pipeline.submit(1)
+        items_pipeline.submit(2)
+        blocked = threading.Thread(target=items_pipeline.submit, args=(3,))
+        blocked.start()
+        blocked.join(timeout=0.2)
+        assert blocked.is_alive()
+        release.set()
+        blocked.join(timeout=1)
+        assert not blocked.is_alive()
+        assert items_pipeline.close() == [True] * 3
+
+    def test_fails_on_callback_error(self):
+        failed = threading.Event()
+
+        def fail(item: int) -> None:
+            failed.set()
+            raise ValueError(item)
+
+        items_pipeline = pipeline.Pipeline(fail)
+        items_pipeline.submit(1)
+        failed.wait()
+        with pytest.raises(ValueError):
+            items_pipeline.close()
+        with pytest.raises(ValueError):
+            items_pipeline.submit(2)
+
+    def test_should_cancel_queued_items_on_error(self):
+        release = threading.Event()
+        processed = []
+
+        def process(item: int) -> None:
+            release.wait()
+            processed.append(item)
+
+        executor = futures.ThreadPoolExecutor(1)
+        with pytest.raises(RuntimeError):
+            with pipeline.Pipeline(process, executor) as items_pipeline:
+                for item in range(3):
+                    items_pipeline.submit(item)
+                raise RuntimeError
+        release.set()
+        executor.shutdown()
+        assert processed == [0]
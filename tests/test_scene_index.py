@@ -0,0 +1,116 @@
+import dataclasses
+import datetime as dt
+
+import pystac
+import pytest
+
+from up42 import geometry, scene_index
+
+TRIANGLE = {
+    "type": "Polygon",
+    "coordinates": [[[0, 0], [4, 0], [0, 4], [0, 0]]],
+}
+
+
+@dataclasses.dataclass
+class Footprint:
+    name: str
+    geometry: dict | None
+
+
+ITEMS = [
+    Footprint("triangle", TRIANGLE),
+    Footprint("east", geometry.box((5.0, 0.0, 6.0, 1.0))),
+    Footprint("missing", None),
+    Footprint("large", geometry.box((-1.0, -1.0, 10.0, 10.0))),
+]
+
+
+def point(x: float, y: float) -> dict:
+    return {"type": "Point", "coordinates": [x, y]}
+
+
+def names(items: list[Footprint]) -> list[str]:
+    return [item.name for item in items]
+
+
+@pytest.fixture(name="index")
+def _index() -> scene_index.SceneIndex[Footprint]:
+    return scene_index.SceneIndex(ITEMS, node_capacity=2)
+
+
+class TestSceneIndex:
+    def test_should_skip_items_without_footprint(
+        self, index: scene_index.SceneIndex[Footprint]
+    ):
+        assert len(index) == 3
+
+    def test_should_find_intersecting_footprints(
+        self, index: scene_index.SceneIndex[Footprint]
+    ):
+        # (3, 3) is within the bounds of the triangle only
+        assert names(index.intersects(point(3, 3))) == ["large"]
+        assert names(index.intersects(geometry.box((3.0, 0.5, 5.0, 0.6)))) == [
+            "triangle",
+            "east",
+            "large",
+        ]
+        assert not index.intersects(geometry.box((20.0, 20.0, 21.0, 21.0)))
+
+    def test_should_find_containing_footprints(
+        self, index: scene_index.SceneIndex[Footprint]
+    ):
+        assert names(index.contains(point(1, 1))) == ["triangle", "large"]
+        assert names(index.contains(geometry.box((1.0, 1.0, 5.5, 2.0)))) == [
+            "large"
+        ]
+
+    def test_should_find_nearest_footprints(
+        self, index: scene_index.SceneIndex[Footprint]
+    ):
+        assert names(index.nearest(point(12, 0.5), count=2)) == [
+            "large",
+            "east",
+        ]
+        assert names(index.nearest(point(3, 3), count=3)) == [
+            "large",
+            "triangle",
+            "east",
+        ]
+
+    def test_should_query_in_bulk(
+        self, index: scene_index.SceneIndex[Footprint]
+    ):
+        areas = [point(5.5, 0.5), point(20, 20)]
+        assert [names(found) for found in index.bulk(areas)] == [
+            ["east", "large"],
+            [],
+        ]
+        assert [
+            names(found) for found in index.bulk(areas, predicate="contains")
+        ] == [["east", "large"], []]
+
+    def test_fails_to_query_with_unsupported_predicate(
+        self, index: scene_index.SceneIndex[Footprint]
+    ):
+        with pytest.raises(ValueError, match="touches"):
+            index.bulk([point(0, 0)], predicate="touches")  # type: ignore
+
+    def test_should_index_stac_items(self):
+        items = [
+            pystac.Item(
+                item_id,
+                geometry.box(bounds),
+                list(bounds),
+                dt.datetime(2023, 1, 1),
+                {},
+            )
+            for item_id, bounds in [
+                ("west", (0.0, 0.0, 1.0, 1.0)),
+                ("east", (2.0, 0.0, 3.0, 1.0)),
+            ]
+        ]
+        index = scene_index.SceneIndex(items)
+        assert [item.id for item in index.contains(point(2.5, 0.5))] == [
+            "east"
+        ]
@@ -0,0 +1,137 @@
+import datetime as dt
+
+import numpy
+import pytest
+
+from up42 import scene_table
+
+
+def feature(
+    identifier: str,
+    collection: str,
+    datetime: str | None,
+    cloud_coverage: float | None,
+    west: float = 0.0,
+) -> dict:
+    return {
+        "geometry": {
+            "type": "Polygon",
+            "coordinates": [
+                [[west, 0], [west + 1, 0], [west + 1, 1], [west, 0]]
+            ],
+        },
+        "properties": {
+            "id": identifier,
+            "collection": collection,
+            "datetime": datetime,
+            "cloudCoverage": cloud_coverage,
+            "resolution": 0.5,
+            "deliveryTime": "HOURS",
+        },
+    }
+
+
+FEATURES = [
+    feature("a", "phr", "2023-01-02T10:00:00Z", 10.0),
+    feature("b", "bjn", "2023-03-01T10:00:00.500+01:00", 50.0, west=5.0),
+    feature("c", "phr", None, None, west=10.0),
+    feature("d", "bjn", "2023-02-01T00:00:00Z", 10.0),
+]
+
+
+def scene_id(feature_dict: dict) -> str:
+    return feature_dict["properties"]["id"]
+
+
+@pytest.fixture(name="table")
+def _table() -> scene_table.SceneTable[str]:
+    return scene_table.SceneTable(FEATURES, scene_id)
+
+
+def ids(table: scene_table.SceneTable[str]) -> list[str]:
+    return list(table)
+
+
+class TestSceneTable:
+    def test_should_build_columns(self, table: scene_table.SceneTable[str]):
+        assert len(table) == 4
+        assert table.id.tolist() == ["a", "b", "c", "d"]
+        assert table.datetime[1] == numpy.datetime64(
+            "2023-03-01T09:00:00.500", "ms"
+        )
+        assert numpy.isnat(table.datetime[2])
+        assert numpy.isnan(table.cloud_coverage[2])
+        assert table.bbox[1].tolist() == [5.0, 0.0, 6.0, 1.0]
+        assert table.delivery_time.tolist() == ["HOURS"] * 4
+
+    def test_should_filter_by_masks(self, table: scene_table.SceneTable[str]):
+        clear = table[table.cloud_coverage < 20]
+        assert ids(clear) == ["a", "d"]
+        assert ids(clear[clear.in_period("2023-01-15", None)]) == ["d"]
+        assert ids(table[table.in_period(end=dt.datetime(2023, 2, 1))]) == [
+            "a",
+            "d",
+        ]
+        assert ids(table[table.intersects_bbox([4.5, 0.5, 10.0, 2.0])]) == [
+            "b",
+            "c",
+        ]
+
+    def test_should_sort_by_several_columns(
+        self, table: scene_table.SceneTable[str]
+    ):
+        assert ids(table.sort("datetime")) == ["a", "d", "b", "c"]
+        assert ids(table.sort("datetime", descending=True)) == [
+            "b",
+            "d",
+            "a",
+            "c",
+        ]
+        assert ids(
+            table.sort("cloud_coverage", "id", descending=[False, True])
+        ) == ["d", "a", "b", "c"]
+        assert ids(table.sort("collection", "datetime")) == [
+            "d",
+            "b",
+            "a",
+            "c",
+        ]
+
+    @pytest.mark.parametrize(
+        "columns, descending, message",
+        [
+            (["bbox"], False, "Cannot sort by bbox"),
+            (["unknown"], False, "Cannot sort by unknown"),
+            (["id", "datetime"], [True], "one sort direction per column"),
+        ],
+    )
+    def test_fails_to_sort_by_invalid_columns(
+        self,
+        table: scene_table.SceneTable[str],
+        columns: list[str],
+        descending: bool | list[bool],
+        message: str,
+    ):
+        with pytest.raises(ValueError, match=message):
+            table.sort(*columns, descending=descending)
+
+    def test_should_group_by_collection(
+        self, table: scene_table.SceneTable[str]
+    ):
+        groups = table.group_by()
+        assert {key: ids(group) for key, group in groups.items()} == {
+            "bjn": ["b", "d"],
+            "phr": ["a", "c"],
+        }
+        assert groups["bjn"].scene(1) == "d"
+
+    def test_should_create_scenes_lazily(self):
+        created = []
+
+        def to_scene(feature_dict: dict) -> str:
+            created.append(scene_id(feature_dict))
+            return scene_id(feature_dict)
+
+        table = scene_table.SceneTable(FEATURES, to_scene)
+        assert table.sort("id", descending=True)[:2].scene(0) == "d"
+        assert created == ["d"]
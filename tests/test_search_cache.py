@@ -0,0 +1,218 @@
+import pathlib
+from unittest import mock
+
+import pytest
+
+from up42 import geometry, search_cache
+
+HOST = "host-name"
+PAYLOAD = {"bbox": [0.0, 0.0, 1.0, 1.0], "collections": ["phr", "bjn"]}
+PAGES = [[{"properties": {"id": "first"}}], [{"properties": {"id": "second"}}]]
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+@pytest.fixture(name="backend", params=["memory", "disk"])
+def _backend(request, tmp_path: pathlib.Path) -> search_cache.Backend:
+    if request.param == "memory":
+        return search_cache.MemoryBackend()
+    return search_cache.DiskBackend(tmp_path / "searches")
+
+
+class TestSearchCache:
+    def test_should_normalize_keys(self):
+        key = search_cache.SearchCache.key(HOST, PAYLOAD)
+        assert key == search_cache.SearchCache.key(
+            HOST, {"collections": ["bjn", "phr"], "bbox": PAYLOAD["bbox"]}
+        )
+        assert key != search_cache.SearchCache.key("other-host", PAYLOAD)
+        assert key != search_cache.SearchCache.key(
+            HOST, {**PAYLOAD, "bbox": [0.0, 0.0, 1.0, 2.0]}
+        )
+
+    def test_should_cache_pages(self, backend: search_cache.Backend):
+        cache = search_cache.SearchCache(backend, ttl=60.0, clock=FakeClock())
+        assert cache.get(HOST, PAYLOAD) is None
+        cache.put(HOST, PAYLOAD, PAGES)
+        assert cache.get(HOST, dict(reversed(PAYLOAD.items()))) == PAGES
+
+    def test_should_expire_pages(self, backend: search_cache.Backend):
+        clock = FakeClock()
+        cache = search_cache.SearchCache(backend, ttl=60.0, clock=clock)
+        cache.put(HOST, PAYLOAD, PAGES)
+        clock.now += 60.0
+        assert cache.get(HOST, PAYLOAD) is None
+        assert not list(backend.summaries())
+
+    def test_should_clear_expired_pages(self, backend: search_cache.Backend):
+        clock = FakeClock()
+        cache = search_cache.SearchCache(backend, ttl=60.0, clock=clock)
+        cache.put(HOST, PAYLOAD, PAGES)
+        clock.now += 30.0
+        cache.put(HOST, {"bbox": [1.0, 1.0, 2.0, 2.0]}, PAGES)
+        clock.now += 30.0
+        cache.clear_expired()
+        assert [summary.payload for _, summary in backend.summaries()] == [
+            {"bbox": [1.0, 1.0, 2.0, 2.0]}
+        ]
+
+
+def test_should_evict_least_recently_used_entries():
+    backend = search_cache.MemoryBackend(max_entries=2)
+    entry = search_cache.Entry(HOST, PAYLOAD, PAGES, 0.0)
+    backend.set("first", entry)
+    backend.set("second", entry)
+    assert backend.get("first")
+    backend.set("third", entry)
+    assert [key for key, _ in backend.summaries()] == ["first", "third"]
+
+
+def test_should_share_disk_entries(tmp_path: pathlib.Path):
+    search_cache.SearchCache(search_cache.DiskBackend(tmp_path)).put(
+        HOST, PAYLOAD, PAGES
+    )
+    cache = search_cache.SearchCache(search_cache.DiskBackend(tmp_path))
+    assert cache.get(HOST, PAYLOAD) == PAGES
+    assert not list(tmp_path.glob("*.part"))
+
+
+def test_should_ignore_corrupt_disk_entries(tmp_path: pathlib.Path):
+    backend = search_cache.DiskBackend(tmp_path)
+    (tmp_path / "corrupt.json").write_text("{", encoding="utf-8")
+    (tmp_path / f"corrupt{search_cache.SUMMARY_SUFFIX}").write_text(
+        "{", encoding="utf-8"
+    )
+    assert backend.get("corrupt") is None
+    assert not list(backend.summaries())
+
+
+def scene(
+    scene_id: str,
+    west: float,
+    south: float,
+    datetime: str,
+    collection: str = "phr",
+    cloud_coverage: float = 10.0,
+) -> dict:
+    return {
+        "geometry": geometry.box((west, south, west + 0.1, south + 0.1)),
+        "properties": {
+            "id": scene_id,
+            "datetime": datetime,
+            "collection": collection,
+            "cloudCoverage": cloud_coverage,
+        },
+    }
+
+
+BROAD_SEARCH = {
+    "bbox": [0.0, 0.0, 10.0, 10.0],
+    "datetime": "2023-01-01T00:00:00Z/2023-12-31T23:59:59Z",
+    "collections": ["phr", "bjn"],
+    "query": {"cloudCoverage": {"lte": 50}},
+}
+SCENES = [
+    scene("match", 1.0, 1.0, "2023-03-01T10:00:00.5Z"),
+    scene("outside", 5.0, 5.0, "2023-03-01T10:00:00Z"),
+    scene("later", 1.0, 1.0, "2023-08-01T10:00:00Z"),
+    scene("other-collection", 1.0, 1.0, "2023-03-01T10:00:00Z", "bjn"),
+    scene("cloudy", 1.0, 1.0, "2023-03-01T10:00:00Z", cloud_coverage=30),
+]
+
+
+class TestCoveredSearches:
+    narrow_search = {
+        "intersects": geometry.box((0.5, 0.5, 2.0, 2.0)),
+        "datetime": "2023-02-01T00:00:00Z/2023-04-30T23:59:59Z",
+        "collections": ["phr"],
+        "query": {"cloudCoverage": {"lte": 20}},
+    }
+
+    def test_should_answer_covered_search(self):
+        cache = search_cache.SearchCache(answer_covered=True)
+        cache.put(HOST, BROAD_SEARCH, [SCENES[:2], SCENES[2:]])
+        assert cache.get(HOST, self.narrow_search) == [SCENES[:1]]
+
+    @pytest.mark.parametrize(
+        "change",
+        [
+            {"bbox": [9.0, 9.0, 11.0, 11.0]},
+            {"datetime": "2022-12-01T00:00:00Z/2023-04-30T23:59:59Z"},
+            {"datetime": "2023-02-01T00:00:00Z/.."},
+            {"collections": ["phr", "spot"]},
+            {"query": {"cloudCoverage": {"lte": 60}}},
+            {"query": {"resolution": {"lte": 0.5}}},
+            {"query": {"cloudCoverage": {"lte": 20, "like": "%"}}},
+        ],
+    )
+    def test_should_not_answer_uncovered_search(self, change: dict):
+        cache = search_cache.SearchCache(answer_covered=True)
+        cache.put(HOST, BROAD_SEARCH, [SCENES])
+        payload = {
+            key: value
+            for key, value in {**self.narrow_search, **change}.items()
+            if not ("bbox" in change and key == "intersects")
+        }
+        assert cache.get(HOST, payload) is None
+
+    def test_should_not_answer_searches_of_other_hosts(self):
+        cache = search_cache.SearchCache(answer_covered=True)
+        cache.put(HOST, BROAD_SEARCH, [SCENES])
+        assert cache.get("other-host", self.narrow_search) is None
+
+    def test_should_not_answer_from_expired_searches(self):
+        clock = FakeClock()
+        cache = search_cache.SearchCache(
+            ttl=60.0, clock=clock, answer_covered=True
+        )
+        cache.put(HOST, BROAD_SEARCH, [SCENES])
+        clock.now += 60.0
+        assert cache.get(HOST, self.narrow_search) is None
+        assert not list(cache.backend.summaries())
+
+    def test_should_only_load_pages_of_covering_search(
+        self, backend: search_cache.Backend
+    ):
+        cache = search_cache.SearchCache(backend, answer_covered=True)
+        cache.put(HOST, {"collections": ["spot"]}, [SCENES])
+        cache.put(HOST, BROAD_SEARCH, [SCENES])
+        with mock.patch.object(backend, "get", wraps=backend.get) as get_entry:
+            assert cache.get(HOST, self.narrow_search) == [SCENES[:1]]
+        assert get_entry.call_args_list == [
+            mock.call(cache.key(HOST, self.narrow_search)),
+            mock.call(cache.key(HOST, BROAD_SEARCH)),
+        ]
+
+    def test_should_only_replay_identical_searches_by_default(self):
+        cache = search_cache.SearchCache()
+        cache.put(HOST, BROAD_SEARCH, [SCENES])
+        assert cache.get(HOST, self.narrow_search) is None
+
+    @pytest.mark.parametrize(
+        "query, expected_ids",
+        [
+            ({"collection": {"in": ["bjn"]}}, ["other-collection"]),
+            ({"id": {"startsWith": "clo"}}, ["cloudy"]),
+            ({"id": {"endsWith": "er"}}, ["later"]),
+            ({"id": {"contains": "tsi"}}, ["outside"]),
+            ({"cloudCoverage": {"gt": 10}}, ["cloudy"]),
+            ({"cloudCoverage": {"neq": 10, "gte": 5}}, ["cloudy"]),
+            ({"cloudCoverage": {"eq": "10"}}, []),
+            ({"cloudCoverage": {"lt": "10"}}, []),
+            ({"resolution": {"eq": 1}}, []),
+        ],
+    )
+    def test_should_filter_by_query(self, query: dict, expected_ids: list):
+        cache = search_cache.SearchCache(answer_covered=True)
+        cache.put(HOST, {}, [SCENES])
+        pages = cache.get(HOST, {"query": query})
+        assert pages is not None
+        assert [feature["properties"]["id"] for feature in pages[0]] == (
+            expected_ids
+        )
@@ -0,0 +1,146 @@
+import dataclasses
+import pathlib
+
+import fsspec  # type: ignore
+import pytest
+
+from up42 import sinks
+
+CONTENT = bytes(range(256)) * 10
+
+
+@dataclasses.dataclass
+class FakeUpload:
+    parts: dict[int, bytes] = dataclasses.field(default_factory=dict)
+    completed: bool = False
+    aborted: bool = False
+
+    def upload_part(self, number: int, data: bytes) -> None:
+        self.parts[number] = data
+
+    def complete(self) -> None:
+        self.completed = True
+
+    def abort(self) -> None:
+        self.aborted = True
+
+
+class FakeStorage:
+    """Stand-in of an S3 compatible storage recording multipart uploads."""
+
+    def __init__(self):
+        self.uploads: dict[str, FakeUpload] = {}
+
+    def start_upload(self, name: str) -> FakeUpload:
+        self.uploads[name] = FakeUpload()
+        return self.uploads[name]
+
+    def location(self, name: str) -> str:
+        return f"s3://bucket/{name}"
+
+    def objects(self) -> dict[str, bytes]:
+        return {
+            name: b"".join(
+                upload.parts[number] for number in sorted(upload.parts)
+            )
+            for name, upload in self.uploads.items()
+            if upload.completed
+        }
+
+
+def write_in_chunks(
+    sink: sinks.Sink, name: str, chunk_size: int = 100
+) -> None:
+    with sink.open(name) as write:
+        for start in range(0, len(CONTENT), chunk_size):
+            write(memoryview(CONTENT[start:][:chunk_size]))
+
+
+class TestLocalSink:
+    def test_should_write_file(self, tmp_path: pathlib.Path):
+        sink = sinks.LocalSink(tmp_path)
+        write_in_chunks(sink, "folder/file.tif")
+        path = tmp_path / "folder" / "file.tif"
+        assert path.read_bytes() == CONTENT
+        assert sink.location("folder/file.tif") == str(path)
+        assert list(path.parent.iterdir()) == [path]
+
+    def test_should_discard_failed_file(self, tmp_path: pathlib.Path):
+        sink = sinks.LocalSink(tmp_path)
+        with pytest.raises(ValueError):
+            with sink.open("file.tif") as write:
+                write(memoryview(CONTENT))
+                raise ValueError
+        assert not list(tmp_path.iterdir())
+
+
+class TestMultipartSink:
+    def test_should_upload_parts(self):
+        storage = FakeStorage()
+        sink = sinks.MultipartSink(
+            storage.start_upload, storage.location, part_size=1000
+        )
+        write_in_chunks(sink, "file.tif", chunk_size=300)
+        upload = storage.uploads["file.tif"]
+        assert [len(part) for part in upload.parts.values()] == [
+            1000,
+            1000,
+            560,
+        ]
+        assert storage.objects() == {"file.tif": CONTENT}
+        assert sink.location("file.tif") == "s3://bucket/file.tif"
+
+    def test_should_upload_empty_file(self):
+        storage = FakeStorage()
+        sink = sinks.MultipartSink(storage.start_upload, storage.location)
+        with sink.open("empty"):
+            pass
+        assert storage.objects() == {"empty": b""}
+
+    def test_should_abort_failed_upload(self):
+        storage = FakeStorage()
+        sink = sinks.MultipartSink(
+            storage.start_upload, storage.location, part_size=1000
+        )
+        with pytest.raises(ValueError):
+            with sink.open("file.tif") as write:
+                write(memoryview(CONTENT))
+                raise ValueError
+        assert storage.uploads["file.tif"].aborted
+        assert not storage.objects()
+
+
+@pytest.fixture(name="fsspec_url", params=["memory", "file"])
+def _fsspec_url(request, tmp_path) -> str:
+    if request.param == "memory":
+        return "memory://bucket/prefix"
+    return tmp_path.as_uri()
+
+
+class TestFsspecSink:
+    def test_should_write_file(self, fsspec_url: str):
+        sink = sinks.FsspecSink(fsspec_url, part_size=1000)
+        write_in_chunks(sink, "folder/file.tif")
+        with fsspec.open(sink.location("folder/file.tif"), "rb") as file:
+            assert file.read() == CONTENT
+
+    def test_should_discard_failed_file(self, fsspec_url: str):
+        sink = sinks.FsspecSink(fsspec_url, part_size=1000)
+        with pytest.raises(ValueError):
+            with sink.open("file.tif") as write:
+                write(memoryview(CONTENT))
+                raise ValueError
+        file_system, path = fsspec.core.url_to_fs(sink.location("file.tif"))
+        assert not file_system.exists(path)
+        assert not file_system.transaction.files
+
+    def test_should_keep_existing_file_on_failed_overwrite(
+        self, tmp_path: pathlib.Path
+    ):
+        (tmp_path / "file.tif").write_bytes(b"previous")
+        sink = sinks.FsspecSink(tmp_path.as_uri(), part_size=1000)
+        with pytest.raises(ValueError):
+            with sink.open("file.tif") as write:
+                write(memoryview(CONTENT))
+                raise ValueError
+        assert (tmp_path / "file.tif").read_bytes() == b"previous"
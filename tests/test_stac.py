@@ -1,13 +1,15 @@
 import datetime as dt
+import pathlib
 import uuid
 from unittest import mock
 
 import pystac
 import pytest
+import requests
 import requests_mock as req_mock
 
 from tests import constants, helpers
-from up42 import stac, utils
+from up42 import checksums, pipeline, stac, utils
 
 
 @pytest.fixture(autouse=True)
@@ -40,6 +42,163 @@ class TestFileProvider:
         expected = utils.ImageFile(url=DOWNLOAD_URL)
         assert asset.file == expected  # type: ignore
 
+    def test_should_provide_image_file_refreshing_signed_url(
+        self, requests_mock: req_mock.Mocker
+    ):
+        refreshed_url = f"{DOWNLOAD_URL}?refreshed"
+        requests_mock.post(
+            url=f"{STAC_ASSET_HREF}/download-url",
+            response_list=[
+                {"json": {"url": DOWNLOAD_URL}},
+                {"json": {"url": refreshed_url}},
+            ],
+        )
+        image_file = pystac.Asset(href=STAC_ASSET_HREF).file  # type: ignore
+        assert image_file.url == DOWNLOAD_URL
+        assert image_file.refresh_url() == refreshed_url
+
+    @pytest.mark.parametrize(
+        "multihash, checksum",
+        [
+            ("1220" + "ab" * 32, checksums.Checksum("sha256", "ab" * 32)),
+            ("1e20" + "ab" * 32, None),
+            (None, None),
+        ],
+    )
+    def test_should_provide_image_file_with_checksum(
+        self,
+        requests_mock: req_mock.Mocker,
+        multihash: str | None,
+        checksum: checksums.Checksum | None,
+    ):
+        requests_mock.post(
+            url=f"{STAC_ASSET_HREF}/download-url",
+            json={"url": DOWNLOAD_URL},
+        )
+        extra_fields = {stac.FILE_CHECKSUM_KEY: multihash} if multihash else {}
+        asset = pystac.Asset(href=STAC_ASSET_HREF, extra_fields=extra_fields)
+        assert asset.file.checksum == checksum  # type: ignore
+
+
+NOW = dt.datetime(2026, 1, 1, 12, tzinfo=dt.timezone.utc)
+
+
+@pytest.mark.parametrize(
+    "query, expiry",
+    [
+        (
+            "X-Goog-Date=20260101T110000Z&X-Goog-Expires=900",
+            dt.datetime(2026, 1, 1, 11, 15, tzinfo=dt.timezone.utc),
+        ),
+        (
+            "X-Amz-Date=20260101T113000Z&X-Amz-Expires=3600",
+            dt.datetime(2026, 1, 1, 12, 30, tzinfo=dt.timezone.utc),
+        ),
+        ("X-Goog-Expires=60", NOW + dt.timedelta(seconds=60)),
+        (
+            "Expires=1767272400",
+            dt.datetime(2026, 1, 1, 13, tzinfo=dt.timezone.utc),
+        ),
+        ("signature=value", NOW + stac.SIGNED_URL_LIFETIME),
+    ],
+)
+def test_should_compute_signed_url_expiry(query: str, expiry: dt.datetime):
+    assert (
+        stac.signed_url_expiry(f"{DOWNLOAD_URL}?{query}", signed_on=NOW)
+        == expiry
+    )
+
+
+class TestFileProviderCache:
+    sign_url = f"{STAC_ASSET_HREF}/download-url"
+
+    @pytest.fixture(name="clock")
+    def _clock(self):
+        clock = mock.Mock(return_value=NOW)
+        pystac.Asset.file = stac.FileProvider(clock=clock)  # type: ignore
+        return clock
+
+    def signed_url(self, index: int) -> str:
+        return f"{DOWNLOAD_URL}?X-Goog-Expires=600&signature={index}"
+
+    def test_should_cache_signed_urls(
+        self, requests_mock: req_mock.Mocker, clock
+    ):
+        requests_mock.post(self.sign_url, json={"url": self.signed_url(1)})
+        asset = pystac.Asset(href=STAC_ASSET_HREF)
+        assert asset.file.url == self.signed_url(1)  # type: ignore
+        clock.return_value = NOW + dt.timedelta(minutes=8)
+        assert asset.file.url == self.signed_url(1)  # type: ignore
+        assert requests_mock.call_count == 1
+
+    def test_should_sign_again_shortly_before_expiry(
+        self, requests_mock: req_mock.Mocker, clock
+    ):
+        requests_mock.post(
+            self.sign_url,
+            response_list=[
+                {"json": {"url": self.signed_url(1)}},
+                {"json": {"url": self.signed_url(2)}},
+            ],
+        )
+        asset = pystac.Asset(href=STAC_ASSET_HREF)
+        assert asset.file.url == self.signed_url(1)  # type: ignore
+        clock.return_value = NOW + dt.timedelta(minutes=9, seconds=1)
+        assert asset.file.url == self.signed_url(2)  # type: ignore
+
+    def test_should_cache_refreshed_signed_urls(
+        self, requests_mock: req_mock.Mocker, clock
+    ):
+        requests_mock.post(
+            self.sign_url,
+            response_list=[
+                {"json": {"url": self.signed_url(1)}},
+                {"json": {"url": self.signed_url(2)}},
+            ],
+        )
+        asset = pystac.Asset(href=STAC_ASSET_HREF)
+        asset.file.refresh_url()  # type: ignore
+        assert asset.file.url == self.signed_url(2)  # type: ignore
+        assert requests_mock.call_count == 2
+        assert clock.called
+
+    def test_should_forget_expired_signed_urls(
+        self, requests_mock: req_mock.Mocker, clock
+    ):
+        hrefs = [f"{STAC_ASSET_HREF}-{index}" for index in range(3)]
+        for index, href in enumerate(hrefs):
+            requests_mock.post(
+                f"{href}/download-url", json={"url": self.signed_url(index)}
+            )
+        assert pystac.Asset(href=hrefs[0]).file  # type: ignore
+        clock.return_value = NOW + dt.timedelta(minutes=5)
+        assert pystac.Asset(href=hrefs[1]).file  # type: ignore
+        clock.return_value = NOW + dt.timedelta(minutes=10)
+        assert pystac.Asset(href=hrefs[2]).file  # type: ignore
+        provider = vars(pystac.Asset)["file"]
+        # pylint: disable-next=protected-access
+        assert list(provider._signed_urls) == hrefs[1:]
+
+    def test_should_resolve_files_once_per_asset(
+        self, requests_mock: req_mock.Mocker, clock
+    ):
+        hrefs = [f"{STAC_ASSET_HREF}-{index}" for index in range(5)]
+        for index, href in enumerate(hrefs):
+            requests_mock.post(
+                f"{href}/download-url", json={"url": self.signed_url(index)}
+            )
+        assets = [pystac.Asset(href=href) for href in hrefs * 2]
+        external = pystac.Asset(href="http://example.com")
+
+        files = stac.resolve_files([*assets, external])
+
+        assert [file and file.url for file in files] == [
+            self.signed_url(index) for index in range(5)
+        ] * 2 + [None]
+        assert assets[0].file.url == self.signed_url(0)  # type: ignore
+        assert requests_mock.call_count == len(hrefs)
+        assert clock.called
+
 
 class TestUpdateItem:
     def test_should_update_item_metadata(self, requests_mock: req_mock.Mocker):
@@ -214,3 +373,145 @@ class TestBulkDeletion:
 
         bulk_deletion.delete()
         assert requests_mock.request_history[0].method == "DELETE"
+
+
+class TestBulkDownload:
+    content = b"content"
+
+    def signed_url(self, key: str) -> str:
+        return (
+            f"https://storage.com/{key}.tif"
+            f"?response-content-disposition=attachment%3Bfilename%3D{key}"
+        )
+
+    def item(self, item_id: str, *keys: str) -> pystac.Item:
+        item = pystac.Item(
+            id=item_id,
+            geometry=None,
+            bbox=None,
+            datetime=dt.datetime.now(),
+            properties={},
+        )
+        for key in keys:
+            href = f"{constants.API_HOST}/v2/assets/{item_id}-{key}"
+            item.add_asset(
+                key,
+                pystac.Asset(
+                    href=href,
+                    extra_fields={stac.FILE_SIZE_KEY: len(self.content)},
+                ),
+            )
+        return item
+
+    def mock_asset(
+        self,
+        requests_mock: req_mock.Mocker,
+        item_id: str,
+        key: str,
+        **response,
+    ):
+        requests_mock.post(
+            f"{constants.API_HOST}/v2/assets/{item_id}-{key}/download-url",
+            json={"url": self.signed_url(key)},
+        )
+        requests_mock.get(
+            self.signed_url(key), **(response or {"content": self.content})
+        )
+
+    def test_should_download_items_and_collections(
+        self, requests_mock: req_mock.Mocker, tmp_path
+    ):
+        item = self.item("item", "data", "metadata")
+        collection = pystac.Collection(
+            id="collection",
+            description="",
+            extent=pystac.Extent(
+                spatial=pystac.SpatialExtent(bboxes=[[1.0, 2.0, 3.0, 4.0]]),
+                temporal=pystac.TemporalExtent(
+                    intervals=[[dt.datetime.now(), None]]
+                ),
+            ),
+        )
+        collection.add_item(self.item("collection-item", "data"))
+        self.mock_asset(requests_mock, "item", "data")
+        self.mock_asset(requests_mock, "item", "metadata")
+        self.mock_asset(requests_mock, "collection-item", "data")
+
+        report = stac.BulkDownload(item, collection).download(tmp_path)
+
+        assert [
+            (download.key, download.status, download.path)
+            for download in report
+        ] == [
+            (
+                "data",
+                stac.AssetDownloadStatus.DOWNLOADED,
+                tmp_path / "item" / "data.tif",
+            ),
+            (
+                "metadata",
+                stac.AssetDownloadStatus.DOWNLOADED,
+                tmp_path / "item" / "metadata.tif",
+            ),
+            (
+                "data",
+                stac.AssetDownloadStatus.DOWNLOADED,
+                tmp_path / "collection-item" / "data.tif",
+            ),
+        ]
+        assert all(
+            download.path and download.path.read_bytes() == self.content
+            for download in report
+        )
+
+    def test_should_skip_downloaded_assets(
+        self, requests_mock: req_mock.Mocker, tmp_path
+    ):
+        item = self.item("item", "data")
+        self.mock_asset(requests_mock, "item", "data")
+        path = tmp_path / "item" / "data.tif"
+        path.parent.mkdir()
+        path.write_bytes(self.content)
+
+        (download,) = stac.BulkDownload(item).download(tmp_path)
+
+        assert download.status == stac.AssetDownloadStatus.SKIPPED
+        assert download.path == path
+        assert requests_mock.call_count == 1
+
+    def test_should_report_failed_assets(
+        self, requests_mock: req_mock.Mocker, tmp_path
+    ):
+        item = self.item("item", "data", "metadata")
+        self.mock_asset(requests_mock, "item", "data", status_code=404)
+        self.mock_asset(requests_mock, "item", "metadata")
+        external_asset = pystac.Asset(href="https://example.com/external.tif")
+
+        report = stac.BulkDownload(item, external_asset).download(tmp_path)
+
+        assert [download.status for download in report] == [
+            stac.AssetDownloadStatus.FAILED,
+            stac.AssetDownloadStatus.DOWNLOADED,
+            stac.AssetDownloadStatus.FAILED,
+        ]
+        assert isinstance(report[0].error, requests.HTTPError)
+        assert isinstance(report[2].error, stac.InvalidUp42Asset)
+        assert report[2].key == "external.tif"
+
+    def test_should_hand_files_to_pipeline(
+        self, requests_mock: req_mock.Mocker, tmp_path
+    ):
+        item = self.item("item", "data", "metadata")
+        self.mock_asset(requests_mock, "item", "data")
+        self.mock_asset(requests_mock, "item", "metadata")
+
+        with pipeline.Pipeline(pathlib.Path.read_bytes) as files_pipeline:
+            report = stac.BulkDownload(item).download(
+                tmp_path, on_file=files_pipeline.submit
+            )
+
+        assert files_pipeline.results == [self.content] * 2
+        assert all(
+            download.status == stac.AssetDownloadStatus.DOWNLOADED
+            for download in report
+        )
@@ -0,0 +1,682 @@
+import hashlib
+import http.server
+import io
+import json
+import threading
+import time
+from collections.abc import Iterator
+from unittest import mock
+
+import pytest
+import requests
+import requests_mock as req_mock
+import tqdm
+
+from tests import helpers
+from up42 import bandwidth, checksums, transfer
+
+URL = "https://storage.com/some-file"
+CONTENT = bytes(range(256)) * 1000
+
+
+def get(url: str = URL) -> requests.Response:
+    return requests.get(url, stream=True, timeout=10)
+
+
+class TestContentLength:
+    @pytest.mark.parametrize(
+        "headers, expected",
+        [
+            ({"Content-Length": "10"}, 10),
+            ({}, None),
+            ({"Content-Length": "unknown"}, None),
+            ({"Content-Length": "10", "Content-Encoding": "gzip"}, None),
+        ],
+    )
+    def test_should_compute_content_length(
+        self, requests_mock: req_mock.Mocker, headers: dict, expected
+    ):
+        requests_mock.get(URL, content=b"", headers=headers)
+        assert transfer.content_length(get()) == expected
+
+
+class TestProgress:
+    @mock.patch("tqdm.tqdm")
+    def test_should_batch_updates_within_interval(self, tqdm_class):
+        clock = mock.Mock(side_effect=[0.0, 0.1, 0.2, 1.5, 1.6])
+        bar = tqdm_class.return_value
+        with transfer.Progress(
+            total=10, interval=1.0, clock=clock
+        ) as progress:
+            for _ in range(4):
+                progress.update(2)
+        assert bar.update.call_args_list == [mock.call(6), mock.call(2)]
+        bar.close.assert_called_once()
+
+
+class TestStream:
+    @pytest.mark.parametrize("buffer_size", [1, 1000, 10**6])
+    def test_should_stream_content(
+        self, requests_mock: req_mock.Mocker, buffer_size: int
+    ):
+        requests_mock.get(URL, content=CONTENT)
+        destination = io.BytesIO()
+        written = transfer.stream(
+            get(),
+            destination.write,
+            transfer.Settings(buffer_size=buffer_size),
+        )
+        assert written == len(CONTENT)
+        assert destination.getvalue() == CONTENT
+
+    def test_should_reuse_single_buffer(self, requests_mock: req_mock.Mocker):
+        requests_mock.get(URL, content=CONTENT)
+        buffers = set()
+        transfer.stream(
+            get(),
+            lambda view: buffers.add(id(view.obj)),
+            transfer.Settings(buffer_size=1024),
+        )
+        assert len(buffers) == 1
+
+    def test_should_limit_bandwidth(self, requests_mock: req_mock.Mocker):
+        requests_mock.get(URL, content=CONTENT)
+        limiter = bandwidth.Limiter(len(CONTENT) * 4)
+        sizes = []
+        started_at = time.monotonic()
+        transfer.stream(
+            get(),
+            lambda view: sizes.append(len(view)),
+            transfer.Settings(limiter=limiter),
+        )
+        assert 0.15 < time.monotonic() - started_at < 1
+        assert max(sizes) == limiter.read_size(transfer.BUFFER_SIZE)
+
+
+class _DroppingBody(io.RawIOBase):
+    """Body of a connection which is reset after a number of bytes."""
+
+    def __init__(self, content: bytes, drop_at: int):
+        super().__init__()
+        self._content = io.BytesIO(content[:drop_at])
+
+    def readable(self):
+        return True
+
+    def readinto(self, buffer):
+        if size := self._content.readinto(buffer):
+            return size
+        raise ConnectionResetError
+
+
+class TestDownloadResumable:
+    size = len(CONTENT)
+    half = len(CONTENT) // 2
+    etag = '"etag"'
+    settings = transfer.Settings(buffer_size=1000)
+
+    @pytest.fixture(name="path")
+    def _path(self, tmp_path):
+        return tmp_path / "file"
+
+    def partial_content(self, start: int) -> dict:
+        return {
+            "status_code": 206,
+            "content": CONTENT[start:],
+            "headers": {
+                "Content-Range": f"bytes {start}-{self.size - 1}/{self.size}",
+                "ETag": self.etag,
+            },
+        }
+
+    def test_should_resume_after_connection_error(
+        self, requests_mock: req_mock.Mocker, path
+    ):
+        requests_mock.get(
+            URL,
+            response_list=[
+                {
+                    "body": _DroppingBody(CONTENT, self.half),
+                    "headers": {
+                        "Content-Length": str(self.size),
+                        "ETag": self.etag,
+                    },
+                },
+                self.partial_content(self.half),
+            ],
+        )
+        transfer.download_resumable(
+            requests.Session(), URL, path, self.settings
+        )
+        assert path.read_bytes() == CONTENT
+        assert sorted(file.name for file in path.parent.iterdir()) == ["file"]
+        resumption = requests_mock.request_history[1]
+        assert resumption.headers["Range"] == f"bytes={self.half}-"
+        assert resumption.headers["If-Range"] == self.etag
+
+    def test_fails_when_resume_attempts_are_exhausted(
+        self, requests_mock: req_mock.Mocker, path
+    ):
+        requests_mock.get(
+            URL,
+            body=_DroppingBody(CONTENT, self.half),
+            headers={"Content-Length": str(self.size)},
+        )
+        with pytest.raises(requests.exceptions.ChunkedEncodingError):
+            transfer.download_resumable(
+                requests.Session(),
+                URL,
+                path,
+                transfer.Settings(buffer_size=1000, resume_attempts=0),
+            )
+        assert path.with_name("file.part").read_bytes() == CONTENT[: self.half]
+        assert path.with_name("file.part.json").exists()
+
+    def write_partial_download(self, path):
+        path.with_name("file.part").write_bytes(CONTENT[: self.half])
+        path.with_name("file.part.json").write_text(
+            json.dumps({"url": URL, "size": self.size, "etag": self.etag})
+        )
+
+    def test_should_resume_partial_download(
+        self, requests_mock: req_mock.Mocker, path
+    ):
+        self.write_partial_download(path)
+        requests_mock.get(
+            URL,
+            request_headers={
+                "Range": f"bytes={self.half}-",
+                "If-Range": self.etag,
+            },
+            **self.partial_content(self.half),
+        )
+        transfer.download_resumable(
+            requests.Session(), URL, path, self.settings
+        )
+        assert path.read_bytes() == CONTENT
+
+    def test_should_restart_changed_partial_download(
+        self, requests_mock: req_mock.Mocker, path
+    ):
+        self.write_partial_download(path)
+        changed = CONTENT[::-1]
+        requests_mock.get(URL, content=changed)
+        transfer.download_resumable(
+            requests.Session(), URL, path, self.settings
+        )
+        assert path.read_bytes() == changed
+
+    @pytest.mark.parametrize(
+        "manifest",
+        [
+            '{"url": "http',
+            json.dumps({"size": 10}),
+            json.dumps(
+                {"url": f"{URL}-other", "size": len(CONTENT), "etag": None}
+            ),
+        ],
+    )
+    def test_should_start_over_without_valid_manifest(
+        self, requests_mock: req_mock.Mocker, path, manifest: str
+    ):
+        path.with_name("file.part").write_bytes(CONTENT[: self.half])
+        path.with_name("file.part.json").write_text(manifest)
+        requests_mock.get(URL, content=CONTENT)
+        transfer.download_resumable(
+            requests.Session(), URL, path, self.settings
+        )
+        assert path.read_bytes() == CONTENT
+        assert requests_mock.last_request
+        assert "Range" not in requests_mock.last_request.headers
+        assert sorted(file.name for file in path.parent.iterdir()) == ["file"]
+
+    def test_should_complete_finished_partial_download(
+        self, requests_mock: req_mock.Mocker, path
+    ):
+        path.with_name("file.part").write_bytes(CONTENT)
+        path.with_name("file.part.json").write_text(
+            json.dumps({"url": URL, "size": self.size, "etag": None})
+        )
+        requests_mock.get(
+            URL,
+            status_code=416,
+            headers={"Content-Range": f"bytes */{self.size}"},
+        )
+        transfer.download_resumable(
+            requests.Session(), URL, path, self.settings
+        )
+        assert path.read_bytes() == CONTENT
+
+    def test_should_refresh_expired_signed_url(
+        self, requests_mock: req_mock.Mocker, path
+    ):
+        refreshed_url = f"{URL}?signature=new"
+        requests_mock.get(URL, status_code=403)
+        requests_mock.get(refreshed_url, content=CONTENT)
+        transfer.download_resumable(
+            requests.Session(),
+            URL,
+            path,
+            self.settings,
+            refresh_url=lambda: refreshed_url,
+        )
+        assert path.read_bytes() == CONTENT
+
+    def test_fails_on_size_mismatch(
+        self, requests_mock: req_mock.Mocker, path
+    ):
+        requests_mock.get(
+            URL,
+            status_code=206,
+            content=CONTENT,
+            headers={"Content-Range": f"bytes 0-0/{self.size - 1}"},
+        )
+        with pytest.raises(transfer.IncompleteDownload):
+            transfer.download_resumable(
+                requests.Session(),
+                URL,
+                path,
+                transfer.Settings(resume_attempts=0),
+            )
+
+    sha256 = checksums.Checksum("sha256", hashlib.sha256(CONTENT).hexdigest())
+
+    def test_should_verify_resumed_download_checksum(
+        self, requests_mock: req_mock.Mocker, path
+    ):
+        self.write_partial_download(path)
+        requests_mock.get(URL, **self.partial_content(self.half))
+        transfer.download_resumable(
+            requests.Session(), URL, path, self.settings, checksum=self.sha256
+        )
+        assert path.read_bytes() == CONTENT
+
+    def test_fails_on_checksum_mismatch(
+        self, requests_mock: req_mock.Mocker, path
+    ):
+        requests_mock.get(URL, content=CONTENT[::-1])
+        with pytest.raises(checksums.ChecksumMismatch):
+            transfer.download_resumable(
+                requests.Session(),
+                URL,
+                path,
+                self.settings,
+                checksum=self.sha256,
+            )
+        assert not list(path.parent.iterdir())
+
+
+class TestDownloadTo:
+    def test_should_resume_stream_after_connection_error(
+        self, requests_mock: req_mock.Mocker
+    ):
+        half, size = len(CONTENT) // 2, len(CONTENT)
+        requests_mock.get(
+            URL,
+            response_list=[
+                {
+                    "body": _DroppingBody(CONTENT, half),
+                    "headers": {"Content-Length": str(size)},
+                },
+                {
+                    "status_code": 206,
+                    "content": CONTENT[half:],
+                    "headers": {
+                        "Content-Range": f"bytes {half}-{size - 1}/{size}"
+                    },
+                },
+            ],
+        )
+        received = bytearray()
+        written = transfer.download_to(
+            requests.Session(),
+            URL,
+            received.extend,
+            transfer.Settings(buffer_size=1000),
+        )
+        assert written == len(CONTENT)
+        assert received == CONTENT
+
+    def test_should_pay_for_each_byte_once(
+        self, requests_mock: req_mock.Mocker
+    ):
+        requests_mock.get(URL, content=CONTENT)
+        limiter = helpers.RecordingLimiter()
+        transfer.download_to(
+            requests.Session(),
+            URL,
+            lambda view: None,
+            transfer.Settings(buffer_size=1000, limiter=limiter),
+        )
+        assert len(limiter.flows) == 1
+        assert sum(limiter.consumed.values()) == len(CONTENT)
+
+
+class TestRemoteStream:
+    def test_should_pay_for_buffered_reads(
+        self, requests_mock: req_mock.Mocker
+    ):
+        requests_mock.get(URL, content=CONTENT)
+        limiter = helpers.RecordingLimiter()
+        settings = transfer.Settings(limiter=limiter)
+        with transfer.RemoteStream(
+            requests.Session(), URL, settings
+        ) as remote:
+            assert io.BufferedReader(remote, 1000).read() == CONTENT
+        assert sum(limiter.consumed.values()) == len(CONTENT)
+
+
+class TestRangeFile:
+    def test_should_read_at_positions(self, requests_mock: req_mock.Mocker):
+        requests_mock.get(URL, content=helpers.ranged_content(CONTENT))
+        with transfer.RangeFile(
+            requests.Session(), URL, size=len(CONTENT)
+        ) as remote:
+            remote.seek(-10, io.SEEK_END)
+            assert remote.read() == CONTENT[-10:]
+            remote.seek(100)
+            assert remote.read(5) == CONTENT[100:105]
+            assert remote.tell() == 105
+        assert requests_mock.request_history[1].headers["Range"] == (
+            "bytes=100-104"
+        )
+
+    def test_should_retry_failed_ranges(self, requests_mock: req_mock.Mocker):
+        refreshed_url = f"{URL}?signature=new"
+        requests_mock.get(
+            URL,
+            response_list=[
+                {"exc": requests.exceptions.ConnectionError},
+                {"status_code": 403},
+            ],
+        )
+        requests_mock.get(
+            refreshed_url, content=helpers.ranged_content(CONTENT)
+        )
+        remote = transfer.RangeFile(
+            requests.Session(),
+            URL,
+            refresh_url=lambda: refreshed_url,
+            size=len(CONTENT),
+        )
+        assert remote.read(10) == CONTENT[:10]
+
+    def test_fails_without_range_support(self, requests_mock: req_mock.Mocker):
+        requests_mock.head(URL, status_code=405)
+        requests_mock.get(URL, content=CONTENT)
+        with pytest.raises(transfer.RangeNotSupported):
+            transfer.RangeFile(requests.Session(), URL)
+
+
+PAYLOAD_SIZE = 32 * 1024 * 1024
+LEGACY_CHUNK_SIZE = 1024
+
+
+class _PayloadHandler(http.server.BaseHTTPRequestHandler):
+    payload = bytes(range(256)) * (PAYLOAD_SIZE // 256)
+    ranges: list[str] = []
+    # Ranges whose next response is cut off halfway
+    truncated: set[str] = set()
+
+    def do_HEAD(self):  # pylint: disable=invalid-name
+        self.send_response(200)
+        self.send_header("Accept-Ranges", "bytes")
+        self.send_header("Content-Length", str(len(self.payload)))
+        self.end_headers()
+
+    def do_GET(self):  # pylint: disable=invalid-name
+        body = self.payload
+        if byte_range := self.headers.get("Range"):
+            self.ranges.append(byte_range)
+            start, end = map(int, byte_range.removeprefix("bytes=").split("-"))
+            body = self.payload[start:][: end - start + 1]
+            self.send_response(206)
+            self.send_header(
+                "Content-Range", f"bytes {start}-{end}/{len(self.payload)}"
+            )
+        else:
+            self.send_response(200)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        if byte_range in self.truncated:
+            self.truncated.discard(byte_range)
+            body = body[: len(body) // 2]
+            self.close_connection = True
+        self.wfile.write(body)
+
+    def log_message(self, *args):  # pylint: disable=arguments-differ
+        pass
+
+
+@pytest.fixture(name="local_server", scope="module")
+def _local_server() -> Iterator[str]:
+    server = http.server.ThreadingHTTPServer(("127.0.0.1", 0), _PayloadHandler)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    yield f"http://127.0.0.1:{server.server_port}/payload"
+    server.shutdown()
+    server.server_close()
+
+
+class TestDownloadSegmented:
+    size = len(CONTENT)
+
+    def test_should_download_ranges_into_file(
+        self, local_server: str, tmp_path
+    ):
+        _PayloadHandler.ranges.clear()
+        path = tmp_path / "file"
+        segment_size = PAYLOAD_SIZE // 5 + 1
+        assert transfer.download_segmented(
+            requests.Session(),
+            local_server,
+            path,
+            transfer.Settings(segment_count=3, segment_size=segment_size),
+        )
+        assert path.read_bytes() == _PayloadHandler.payload
+        assert len(_PayloadHandler.ranges) == 5
+
+    def test_should_share_one_flow_between_segments(
+        self, local_server: str, tmp_path
+    ):
+        limiter = helpers.RecordingLimiter()
+        assert transfer.download_segmented(
+            requests.Session(),
+            local_server,
+            tmp_path / "file",
+            transfer.Settings(
+                segment_count=3,
+                segment_size=PAYLOAD_SIZE // 5 + 1,
+                limiter=limiter,
+            ),
+        )
+        assert len(limiter.flows) == 1
+        assert limiter.consumed[id(limiter.flows[0])] == PAYLOAD_SIZE
+
+    def test_should_resume_interrupted_ranges(
+        self, local_server: str, tmp_path
+    ):
+        _PayloadHandler.ranges.clear()
+        half = PAYLOAD_SIZE // 2
+        _PayloadHandler.truncated.add(f"bytes={half}-{PAYLOAD_SIZE - 1}")
+        path = tmp_path / "file"
+        assert transfer.download_segmented(
+            requests.Session(),
+            local_server,
+            path,
+            transfer.Settings(segment_count=2, segment_size=half),
+        )
+        assert path.read_bytes() == _PayloadHandler.payload
+        resumed_at = half + half // 2
+        assert _PayloadHandler.ranges[-1] == (
+            f"bytes={resumed_at}-{PAYLOAD_SIZE - 1}"
+        )
+
+    def test_fails_after_resume_attempts(
+        self, requests_mock: req_mock.Mocker, tmp_path
+    ):
+        requests_mock.head(
+            URL,
+            headers={
+                "Accept-Ranges": "bytes",
+                "Content-Length": str(self.size),
+            },
+        )
+        requests_mock.get(URL, exc=requests.exceptions.ConnectionError)
+        with pytest.raises(requests.exceptions.ConnectionError):
+            transfer.download_segmented(
+                requests.Session(),
+                URL,
+                tmp_path / "file",
+                transfer.Settings(
+                    segment_count=2,
+                    segment_size=self.size // 2,
+                    resume_attempts=2,
+                ),
+            )
+        # The size probe and three attempts for each of both ranges
+        assert requests_mock.call_count == 1 + 3 * 2
+        assert not list(tmp_path.iterdir())
+
+    def test_should_keep_partial_resumable_download(
+        self, requests_mock: req_mock.Mocker, tmp_path
+    ):
+        path = tmp_path / "file"
+        part = path.with_name("file.part")
+        manifest = path.with_name("file.part.json")
+        part.write_bytes(CONTENT[:10])
+        manifest.write_text(
+            json.dumps({"url": URL, "size": self.size, "etag": None})
+        )
+        requests_mock.head(
+            URL,
+            headers={
+                "Accept-Ranges": "bytes",
+                "Content-Length": str(self.size),
+            },
+        )
+        requests_mock.get(URL, exc=requests.exceptions.ConnectionError)
+        with pytest.raises(requests.exceptions.ConnectionError):
+            transfer.download_segmented(
+                requests.Session(),
+                URL,
+                path,
+                transfer.Settings(
+                    segment_count=2, segment_size=1000, resume_attempts=0
+                ),
+            )
+        assert part.read_bytes() == CONTENT[:10]
+        assert manifest.exists()
+        assert sorted(tmp_path.iterdir()) == [part, manifest]
+
+    def test_should_skip_if_disabled(self, tmp_path):
+        assert not transfer.download_segmented(
+            requests.Session(), URL, tmp_path / "file", transfer.Settings()
+        )
+
+    def test_should_skip_small_resources(
+        self, requests_mock: req_mock.Mocker, tmp_path
+    ):
+        requests_mock.head(
+            URL, headers={"Accept-Ranges": "bytes", "Content-Length": "10"}
+        )
+        assert not transfer.download_segmented(
+            requests.Session(),
+            URL,
+            tmp_path / "file",
+            transfer.Settings(segment_count=2, segment_size=10),
+        )
+
+    def test_should_skip_if_ranges_are_not_supported(
+        self, requests_mock: req_mock.Mocker, tmp_path
+    ):
+        requests_mock.head(URL, headers={"Content-Length": str(self.size)})
+        requests_mock.get(URL, content=CONTENT)
+        assert not transfer.download_segmented(
+            requests.Session(),
+            URL,
+            tmp_path / "file",
+            transfer.Settings(segment_count=2, segment_size=1000),
+        )
+
+    def test_should_skip_if_ranges_are_ignored(
+        self, requests_mock: req_mock.Mocker, tmp_path
+    ):
+        requests_mock.head(
+            URL,
+            headers={
+                "Accept-Ranges": "bytes",
+                "Content-Length": str(self.size),
+            },
+        )
+        requests_mock.get(URL, content=CONTENT)
+        assert not transfer.download_segmented(
+            requests.Session(),
+            URL,
+            tmp_path / "file",
+            transfer.Settings(segment_count=2, segment_size=1000),
+        )
+        assert not list(tmp_path.iterdir())
+
+
+class TestProbeSize:
+    def test_should_probe_size_with_head(self, requests_mock: req_mock.Mocker):
+        requests_mock.head(
+            URL, headers={"Accept-Ranges": "bytes", "Content-Length": "10"}
+        )
+        assert transfer.probe_size(requests.Session(), URL) == 10
+
+    def test_should_probe_size_with_range_if_head_fails(
+        self, requests_mock: req_mock.Mocker
+    ):
+        requests_mock.head(URL, status_code=403)
+        requests_mock.get(
+            URL,
+            request_headers={"Range": "bytes=0-0"},
+            status_code=206,
+            headers={"Content-Range": "bytes 0-0/10"},
+            content=b"0",
+        )
+        assert transfer.probe_size(requests.Session(), URL) == 10
+
+    def test_should_not_probe_size_without_range_support(
+        self, requests_mock: req_mock.Mocker
+    ):
+        requests_mock.head(URL, status_code=403)
+        requests_mock.get(URL, content=CONTENT)
+        assert transfer.probe_size(requests.Session(), URL) is None
+
+
+def _timed(download) -> float:
+    start = time.perf_counter()
+    size = download()
+    elapsed = time.perf_counter() - start
+    assert size == PAYLOAD_SIZE
+    return elapsed
+
+
+def test_should_stream_whole_payload(local_server: str):
+    digest = hashlib.sha256()
+    assert transfer.stream(get(local_server), digest.update) == PAYLOAD_SIZE
+    assert digest.digest() == hashlib.sha256(_PayloadHandler.payload).digest()
+
+
+@pytest.mark.benchmark
+class TestThroughputBenchmark:
+    def test_should_outpace_legacy_chunked_download(self, local_server: str):
+        def legacy() -> int:
+            size = 0
+            response = get(local_server)
+            for chunk in tqdm.tqdm(response.iter_content(LEGACY_CHUNK_SIZE)):
+                size += len(chunk)
+            return size
+
+        def engine() -> int:
+            return transfer.stream(get(local_server), lambda view: None)
+
+        legacy_elapsed = _timed(legacy)
+        engine_elapsed = _timed(engine)
+        assert engine_elapsed < legacy_elapsed, (
+            f"legacy: {PAYLOAD_SIZE / legacy_elapsed / 2**20:.0f} MiB/s, "
+            f"engine: {PAYLOAD_SIZE / engine_elapsed / 2**20:.0f} MiB/s"
+        )
@@ -1,6 +1,11 @@
+import hashlib
+import io
 import itertools
 import json
 import pathlib
+import tarfile
+import zipfile
+from typing import Literal
 from unittest import mock
 
 import pytest
@@ -9,7 +14,15 @@ import requests_mock as req_mock
 from dateutil import parser
 
 from tests import constants as test_constants
-from up42 import constants, utils
+from tests import helpers
+from up42 import checksums, cog, constants, sinks, transfer, utils
+
+ZIP_ARCHIVE = pathlib.Path("tests/mock_data/result_tif.zip")
+TGZ_ARCHIVE = pathlib.Path("tests/mock_data/result_tif.tgz")
+TIF_MEMBER = (
+    "7e17f023-a8e3-43bd-aaac-5bbef749c7f4/"
+    "7e17f023-a8e3-43bd-aaac-5bbef749c7f4_0-0.tif"
+)
 
 
 @pytest.mark.parametrize(
@@ -31,6 +44,21 @@ def test_format_time(date, set_end_of_day, result_time):
     assert formatted_time == result_time
 
 
+@pytest.mark.parametrize(
+    "value",
+    [
+        "2023-01-01",
+        "2023-01-01T10:00:00",
+        "2023-01-01T10:00:00Z",
+        "2023-01-01T10:00:00.5Z",
+        "2023-01-01T10:00:00.123456789Z",
+        "2023-01-01T10:00:00.123+02:00",
+    ],
+)
+def test_should_parse_datetime(value: str):
+    assert utils.parse_datetime(value) == parser.isoparse(value)
+
+
 class TestDownloadArchive:
     archive_url = "https://clouddownload.api.com/abcdef"
 
@@ -53,6 +81,168 @@ class TestDownloadArchive:
             assert pathlib.Path(file).exists()
             assert pathlib.Path(file).suffix in [".tif", ".json"]
         assert len(out_files) == 2
+        assert not list(tmp_path.glob(".up42-*"))
+
+    @pytest.mark.parametrize(
+        "source",
+        ["tests/mock_data/result_tif.tgz", "tests/mock_data/result_tif.zip"],
+    )
+    def test_should_hand_extracted_files_to_callback(
+        self, requests_mock: req_mock.Mocker, tmp_path, source: str
+    ):
+        requests_mock.get(
+            url=self.archive_url,
+            content=pathlib.Path(source).read_bytes(),
+        )
+        completed: list[pathlib.Path] = []
+        out_files = utils.download_archive(
+            download_url=self.archive_url,
+            output_directory=tmp_path,
+            on_file=completed.append,
+        )
+        assert sorted(map(str, completed)) == sorted(out_files)
+
+    def test_should_extract_selected_zip_members_with_byte_ranges(
+        self, requests_mock: req_mock.Mocker, tmp_path
+    ):
+        content = ZIP_ARCHIVE.read_bytes()
+        helpers.mock_ranged_content(requests_mock, self.archive_url, content)
+        out_files = utils.download_archive(
+            download_url=self.archive_url,
+            output_directory=tmp_path,
+            members="*.json",
+        )
+        assert out_files == [str(tmp_path / "data.json")]
+        assert [path for path in tmp_path.rglob("*") if path.is_file()] == [
+            tmp_path / "data.json"
+        ]
+        ranges = [
+            request.headers["Range"]
+            for request in requests_mock.request_history
+            if "Range" in request.headers
+        ]
+        assert ranges
+        assert not list(tmp_path.glob(".up42-*"))
+
+    def test_should_share_one_flow_between_zip_workers(
+        self, requests_mock: req_mock.Mocker
+    ):
+        content = ZIP_ARCHIVE.read_bytes()
+        helpers.mock_ranged_content(requests_mock, self.archive_url, content)
+        limiter = helpers.RecordingLimiter()
+        # pylint: disable-next=protected-access
+        open_zip = utils._remote_zip_opener(
+            requests.Session(),
+            self.archive_url,
+            transfer.Settings(limiter=limiter),
+            None,
+        )
+        for _ in range(2):
+            with open_zip() as zip_file:
+                zip_file.read("output/data.json")
+        assert len(limiter.flows) == 1
+
+    @pytest.mark.parametrize("source", [TGZ_ARCHIVE, ZIP_ARCHIVE])
+    def test_should_extract_selected_members_without_byte_ranges(
+        self, requests_mock: req_mock.Mocker, tmp_path, source: pathlib.Path
+    ):
+        requests_mock.head(self.archive_url, status_code=405)
+        requests_mock.get(self.archive_url, content=source.read_bytes())
+        out_files = utils.download_archive(
+            download_url=self.archive_url,
+            output_directory=tmp_path,
+            members=lambda name: name.endswith(".tif"),
+        )
+        assert out_files == [str(tmp_path / TIF_MEMBER)]
+
+    def test_should_extract_tar_archive_while_downloading(
+        self, requests_mock: req_mock.Mocker, tmp_path
+    ):
+        requests_mock.get(
+            url=self.archive_url,
+            content=pathlib.Path(
+                "tests/mock_data/result_tif.tgz"
+            ).read_bytes(),
+        )
+        with mock.patch.object(transfer, "download_resumable") as download:
+            out_files = utils.download_archive(
+                download_url=self.archive_url,
+                output_directory=tmp_path,
+            )
+        download.assert_not_called()
+        assert requests_mock.call_count == 1
+        assert sorted(
+            path for path in tmp_path.rglob("*") if path.is_file()
+        ) == sorted(map(pathlib.Path, out_files))
+
+    @pytest.mark.parametrize("mode", ["w", "w:gz", "w:bz2", "w:xz"])
+    def test_should_extract_compressed_tar_archives(
+        self,
+        requests_mock: req_mock.Mocker,
+        tmp_path,
+        mode: Literal["w", "w:gz", "w:bz2", "w:xz"],
+    ):
+        archive = io.BytesIO()
+        with tarfile.open(fileobj=archive, mode=mode) as tar:
+            member = tarfile.TarInfo("output/data.txt")
+            member.size = 4
+            tar.addfile(member, io.BytesIO(b"data"))
+        requests_mock.get(url=self.archive_url, content=archive.getvalue())
+        out_files = utils.download_archive(
+            download_url=self.archive_url, output_directory=tmp_path / "out"
+        )
+        assert [pathlib.Path(file).read_bytes() for file in out_files] == [
+            b"data"
+        ]
+
+    def test_should_resume_partial_zip_archive(
+        self, requests_mock: req_mock.Mocker, tmp_path
+    ):
+        content = pathlib.Path("tests/mock_data/result_tif.zip").read_bytes()
+        half = len(content) // 2
+        part = transfer.part_path(
+            utils._archive_path(  # pylint: disable=protected-access
+                self.archive_url, tmp_path
+            )
+        )
+        part.write_bytes(content[:half])
+        part.with_name(part.name + ".json").write_text(
+            json.dumps(
+                {"url": self.archive_url, "size": len(content), "etag": None}
+            )
+        )
+        requests_mock.get(
+            url=self.archive_url,
+            request_headers={"Range": f"bytes={half}-"},
+            status_code=206,
+            content=content[half:],
+            headers={
+                "Content-Range": f"bytes {half}-{len(content) - 1}/{len(content)}"
+            },
+        )
+        out_files = utils.download_archive(
+            download_url=self.archive_url,
+            output_directory=tmp_path,
+        )
+        assert requests_mock.call_count == 1
+        assert len(out_files) == 2
+
+    def test_should_retry_failed_connection(
+        self, requests_mock: req_mock.Mocker, tmp_path
+    ):
+        content = pathlib.Path("tests/mock_data/result_tif.zip").read_bytes()
+        requests_mock.get(
+            url=self.archive_url,
+            response_list=[
+                {"exc": requests.exceptions.ConnectionError},
+                {"content": content},
+            ],
+        )
+        out_files = utils.download_archive(
+            download_url=self.archive_url,
+            output_directory=tmp_path,
+        )
+        assert len(out_files) == 2
 
     def test_fail_to_download_non_archive_file(self, requests_mock, tmp_path):
         source = pathlib.Path("tests/mock_data/multipolygon.geojson")
@@ -68,6 +258,245 @@ class TestDownloadArchive:
             )
 
 
+class TestDownloadArchiveTo:
+    archive_url = "https://clouddownload.api.com/abcdef"
+
+    @pytest.mark.parametrize("source", [TGZ_ARCHIVE, ZIP_ARCHIVE])
+    def test_should_transfer_archive_files(
+        self, requests_mock: req_mock.Mocker, tmp_path, source: pathlib.Path
+    ):
+        requests_mock.head(self.archive_url, status_code=405)
+        requests_mock.get(url=self.archive_url, content=source.read_bytes())
+        locations = utils.download_archive_to(
+            download_url=self.archive_url,
+            sink=sinks.LocalSink(tmp_path),
+        )
+        assert sorted(locations) == sorted(
+            str(path) for path in tmp_path.rglob("*") if path.is_file()
+        )
+        assert sorted(
+            pathlib.Path(location).suffix for location in locations
+        ) == [".json", ".tif"]
+
+    @pytest.mark.parametrize("source", [TGZ_ARCHIVE, ZIP_ARCHIVE])
+    def test_should_transfer_selected_archive_files(
+        self, requests_mock: req_mock.Mocker, tmp_path, source: pathlib.Path
+    ):
+        helpers.mock_ranged_content(
+            requests_mock, self.archive_url, source.read_bytes()
+        )
+        locations = utils.download_archive_to(
+            download_url=self.archive_url,
+            sink=sinks.LocalSink(tmp_path),
+            members="*.tif",
+        )
+        assert locations == [str(tmp_path / TIF_MEMBER)]
+
+    def test_fail_to_transfer_non_archive_file(self, requests_mock, tmp_path):
+        requests_mock.get(
+            url=self.archive_url,
+            content=pathlib.Path(
+                "tests/mock_data/multipolygon.geojson"
+            ).read_bytes(),
+        )
+        with pytest.raises(utils.UnsupportedArchive):
+            utils.download_archive_to(
+                download_url=self.archive_url,
+                sink=sinks.LocalSink(tmp_path),
+            )
+        assert not list(tmp_path.iterdir())
+
+
+class TestListArchiveMembers:
+    archive_url = "https://clouddownload.api.com/abcdef"
+
+    def test_should_list_zip_members(self, requests_mock: req_mock.Mocker):
+        content = ZIP_ARCHIVE.read_bytes()
+        helpers.mock_ranged_content(requests_mock, self.archive_url, content)
+        members = utils.list_archive_members(
+            self.archive_url, transfer.Settings(buffer_size=1024)
+        )
+        assert members == ["data.json", TIF_MEMBER]
+        assert all(
+            "Range" in request.headers
+            for request in requests_mock.request_history
+            if request.method == "GET"
+        )
+
+    def test_fails_to_list_members_without_byte_ranges(
+        self, requests_mock: req_mock.Mocker
+    ):
+        requests_mock.head(self.archive_url, status_code=405)
+        requests_mock.get(self.archive_url, content=ZIP_ARCHIVE.read_bytes())
+        with pytest.raises(transfer.RangeNotSupported):
+            utils.list_archive_members(self.archive_url)
+
+    def test_fails_to_list_members_of_non_zip_file(
+        self, requests_mock: req_mock.Mocker
+    ):
+        helpers.mock_ranged_content(
+            requests_mock, self.archive_url, TGZ_ARCHIVE.read_bytes()
+        )
+        with pytest.raises(utils.UnsupportedArchive):
+            utils.list_archive_members(self.archive_url)
+
+
+class TestUnpackZipFiles:
+    members = {
+        f"output/band_{index % 3}/file_{index}.tif": bytes([index]) * 10**4
+        for index in range(20)
+    } | {"metadata.xml": b"<metadata/>"}
+
+    def test_should_extract_members_in_parallel(self, tmp_path):
+        archive = tmp_path / "archive.zip"
+        with zipfile.ZipFile(archive, "w", zipfile.ZIP_DEFLATED) as zip_file:
+            zip_file.mkdir("output")
+            for name, content in self.members.items():
+                zip_file.writestr(name, content)
+        output_directory = tmp_path / "output_directory"
+        output_directory.mkdir()
+
+        out_files = (
+            utils._unpack_zip_files(  # pylint: disable=protected-access
+                str(archive), output_directory
+            )
+        )
+
+        assert out_files == [
+            output_directory / name.removeprefix("output/")
+            for name in self.members
+        ]
+        for out_file, content in zip(out_files, self.members.values()):
+            assert out_file.read_bytes() == content
+
+
+class TestImageFile:
+    url = "https://storage.com/some-image.tif"
+    content = bytes(range(256)) * 100
+
+    def test_should_download_file(
+        self, requests_mock: req_mock.Mocker, tmp_path
+    ):
+        requests_mock.get(self.url, content=self.content)
+        image = utils.ImageFile(url=self.url, session=requests.Session())
+        path = image.download(tmp_path)
+        assert path == tmp_path / "output.tif"
+        assert path.read_bytes() == self.content
+
+    def test_should_download_file_in_segments(
+        self, requests_mock: req_mock.Mocker, tmp_path
+    ):
+        helpers.mock_ranged_content(requests_mock, self.url, self.content)
+        image = utils.ImageFile(url=self.url, session=requests.Session())
+        path = image.download(
+            tmp_path,
+            transfer.Settings(segment_count=4, segment_size=1000),
+        )
+        assert path.read_bytes() == self.content
+        assert requests_mock.call_count == 1 + 26
+
+    def test_fails_to_download_file(
+        self, requests_mock: req_mock.Mocker, tmp_path
+    ):
+        requests_mock.get(self.url, status_code=404)
+        image = utils.ImageFile(url=self.url, session=requests.Session())
+        with pytest.raises(requests.exceptions.HTTPError):
+            image.download(tmp_path)
+
+    def test_should_open_file(self, requests_mock: req_mock.Mocker):
+        requests_mock.get(self.url, content=self.content)
+        image = utils.ImageFile(url=self.url, session=requests.Session())
+        with image.open(transfer.Settings(buffer_size=1000)) as file:
+            assert file.read(10) == self.content[:10]
+            assert file.read() == self.content[10:]
+        assert file.closed
+
+    def test_should_read_bytes(self, requests_mock: req_mock.Mocker):
+        requests_mock.get(self.url, content=self.content)
+        image = utils.ImageFile(url=self.url, session=requests.Session())
+        assert image.read_bytes() == self.content
+
+    def test_should_read_cog_windows(self, requests_mock: req_mock.Mocker):
+        helpers.mock_ranged_content(
+            requests_mock, self.url, helpers.make_tiff()
+        )
+        image = utils.ImageFile(
+            url=self.url, session=requests.Session(), cache_key="cog"
+        )
+        window = cog.Window(column=20, row=16, width=4, height=4)
+        assert image.open_cog().read(window).data == helpers.window_bytes(
+            window
+        )
+        requests_count = len(requests_mock.request_history)
+        assert image.open_cog().read(window).data == helpers.window_bytes(
+            window
+        )
+        assert len(requests_mock.request_history) == requests_count + 1
+        assert requests_mock.request_history[-1].headers["Range"] == (
+            "bytes=1032-1287"
+        )
+
+    def test_should_verify_downloaded_file_checksum(
+        self, requests_mock: req_mock.Mocker, tmp_path
+    ):
+        requests_mock.get(self.url, content=self.content)
+        image = utils.ImageFile(
+            url=self.url,
+            session=requests.Session(),
+            checksum=checksums.Checksum(
+                "md5", hashlib.md5(self.content).hexdigest()
+            ),
+        )
+        path = image.download(tmp_path, transfer.Settings(segment_count=4))
+        assert path.read_bytes() == self.content
+        assert [
+            request.method for request in requests_mock.request_history
+        ] == ["GET"]
+
+    def test_fails_to_read_bytes_with_checksum_mismatch(
+        self, requests_mock: req_mock.Mocker
+    ):
+        signed_url = f"{self.url}?signature=secret"
+        requests_mock.get(signed_url, content=self.content)
+        image = utils.ImageFile(
+            url=signed_url,
+            session=requests.Session(),
+            checksum=checksums.Checksum("md5", hashlib.md5().hexdigest()),
+        )
+        with pytest.raises(checksums.ChecksumMismatch) as error:
+            image.read_bytes()
+        assert self.url in str(error.value)
+        assert "secret" not in str(error.value)
+
+    def test_should_download_file_to_sink(
+        self, requests_mock: req_mock.Mocker, tmp_path
+    ):
+        requests_mock.get(self.url, content=self.content)
+        image = utils.ImageFile(url=self.url, session=requests.Session())
+        location = image.download_to(sinks.LocalSink(tmp_path))
+        assert location == str(tmp_path / "output.tif")
+        assert (tmp_path / "output.tif").read_bytes() == self.content
+
+    def test_fails_to_download_file_to_sink_with_checksum_mismatch(
+        self, requests_mock: req_mock.Mocker, tmp_path
+    ):
+        requests_mock.get(self.url, content=self.content)
+        image = utils.ImageFile(
+            url=self.url,
+            session=requests.Session(),
+            checksum=checksums.Checksum("md5", hashlib.md5().hexdigest()),
+        )
+        with pytest.raises(checksums.ChecksumMismatch):
+            image.download_to(sinks.LocalSink(tmp_path))
+        assert not list(tmp_path.iterdir())
+
+    def test_fails_to_read_bytes(self, requests_mock: req_mock.Mocker):
+        requests_mock.get(self.url, status_code=404)
+        image = utils.ImageFile(url=self.url, session=requests.Session())
+        with pytest.raises(requests.exceptions.HTTPError):
+            image.read_bytes()
+
+
 @mock.patch("importlib.metadata.version", return_value="some_version")
 def test_get_up42_py_version(version: mock.Mock):
     assert utils.get_up42_py_version() == "some_version"
@@ -45,6 +45,24 @@ class TestCheckLatestVersion:
         )
         warn.assert_called_with(message)
 
+    def test_should_request_latest_version_without_retrying_session(self):
+        unused = mock.MagicMock()
+        is_version_check_enabled = mock.MagicMock(return_value=True)
+        with mock.patch("requests.get") as get:
+            get.return_value.json.return_value = {
+                "info": {"version": fake_installed_version}
+            }
+            version_control.check_is_latest_version(
+                fake_installed_version,
+                warn=unused,
+                build_warning_message=unused,
+                is_version_check_enabled=is_version_check_enabled,
+            )
+        get.assert_called_once_with(
+            "https://pypi.org/pypi/up42-py/json", timeout=2
+        )
+        unused.assert_not_called()
+
     def test_should_ignore_http_error_exception(
         self,
         requests_mock: req_mock.Mocker,
@@ -25,13 +25,15 @@ from up42.base import authenticate, stac_client
 from up42.glossary import (
     CollectionSorting,
     CollectionType,
+    MultiHostSearch,
     ProductGlossary,
     Provider,
 )
 from up42.order import Order, OrderSorting
 from up42.order_template import BatchOrderTemplate
+from up42.pipeline import Pipeline
 from up42.processing import Job, JobSorting, JobStatus
-from up42.stac import BulkDeletion
+from up42.stac import BulkDeletion, BulkDownload
 from up42.stac import extend as stac_extend
 from up42.tasking import (
     FeasibilityStudy,
@@ -65,12 +67,15 @@ __all__ = [
         CollectionType,
         ProductGlossary,
         Provider,
+        MultiHostSearch,
         BatchOrderTemplate,
         Quotation,
         QuotationSorting,
         FeasibilityStudy,
         FeasibilityStudySorting,
         BulkDeletion,
+        BulkDownload,
+        Pipeline,
         OrderCoverage,
     ]
 ]
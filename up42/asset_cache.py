@@ -0,0 +1,144 @@
+import contextlib
+import hashlib
+import os
+import pathlib
+import shutil
+import sys
+from collections.abc import Callable, Iterator
+
+if sys.platform == "win32":
+    import msvcrt
+else:
+    import fcntl
+
+FICLONE = 0x40049409  # Linux ioctl cloning the extents of a file
+
+Download = Callable[[pathlib.Path], pathlib.Path]
+
+
+@contextlib.contextmanager
+def _locked(path: pathlib.Path, blocking: bool = True) -> Iterator[bool]:
+    """
+    Holds an exclusive lock on a lock file, shared between threads and
+    processes and released by the system if the holder dies.
+    Yields whether the lock was acquired, which is always the case when
+    blocking.
+    """
+    with open(path, "a+b") as lock_file:
+        try:
+            if sys.platform == "win32":
+                lock_file.seek(0)
+                mode = msvcrt.LK_LOCK if blocking else msvcrt.LK_NBLCK
+                while True:
+                    try:
+                        msvcrt.locking(lock_file.fileno(), mode, 1)
+                        break
+                    except OSError:
+                        if not blocking:
+                            raise
+            else:
+                operation = fcntl.LOCK_EX | (0 if blocking else fcntl.LOCK_NB)
+                fcntl.flock(lock_file, operation)
+        except OSError:
+            yield False
+            return
+        try:
+            yield True
+        finally:
+            if sys.platform == "win32":
+                lock_file.seek(0)
+                msvcrt.locking(lock_file.fileno(), msvcrt.LK_UNLCK, 1)
+            else:
+                fcntl.flock(lock_file, fcntl.LOCK_UN)
+
+
+def _link(source: pathlib.Path, target: pathlib.Path) -> None:
+    """Hard-links, else reflinks, else copies a file."""
+    target.unlink(missing_ok=True)
+    try:
+        os.link(source, target)
+        return
+    except OSError:
+        pass
+    if sys.platform == "linux":
+        try:
+            with open(source, "rb") as src, open(target, "wb") as dst:
+                fcntl.ioctl(dst.fileno(), FICLONE, src.fileno())
+            return
+        except OSError:
+            target.unlink(missing_ok=True)
+    shutil.copyfile(source, target)
+
+
+class AssetCache:
+    """
+    Shared on-disk cache of downloaded assets, keyed by asset identity and
+    checksum or ETag, with least recently used entries evicted once the
+    cache exceeds its maximum size. Concurrent threads and processes
+    fetching the same key download it once.
+    """
+
+    def __init__(self, directory: str | pathlib.Path, max_size: int):
+        """
+        Args:
+            directory: The cache directory, shared by all cache users.
+            max_size: Maximum size in bytes of the cached entries.
+        """
+        self.directory = pathlib.Path(directory)
+        self.max_size = max_size
+        self._objects = self.directory / "objects"
+        self._locks = self.directory / "locks"
+        self._staging = self.directory / "staging"
+        for directory_path in [self._objects, self._locks, self._staging]:
+            directory_path.mkdir(parents=True, exist_ok=True)
+
+    def fetch(
+        self, key: str, path: pathlib.Path, download: Download
+    ) -> pathlib.Path:
+        """
+        Links the cached entry of a key to a path, downloading it first on a
+        cache miss.
+
+        Args:
+            key: Identity of the content, e.g. asset id and checksum.
+            path: The file path to link the entry to.
+            download: Downloads the content into a given directory and
+                returns the downloaded file path. Partial downloads are kept
+                in the cache directory, so they can be resumed.
+
+        Returns:
+            The file path.
+        """
+        digest = hashlib.sha256(key.encode()).hexdigest()
+        entry = self._objects / digest
+        with _locked(self._locks / f"{digest}.lock"):
+            if entry.exists():
+                # Least recently used order is kept in modification times
+                os.utime(entry)
+            else:
+                staging = self._staging / digest
+                staging.mkdir(exist_ok=True)
+                os.replace(download(staging), entry)
+                shutil.rmtree(staging, ignore_errors=True)
+            _link(entry, path)
+        self.evict()
+        return path
+
+    def evict(self) -> None:
+        """Removes least recently used entries until the cache fits its size."""
+        with _locked(self.directory / "cache.lock"):
+            entries = sorted(
+                (entry.stat().st_mtime, entry.stat().st_size, entry)
+                for entry in self._objects.iterdir()
+            )
+            size = sum(entry_size for _, entry_size, _ in entries)
+            for _, entry_size, entry in entries:
+                if size <= self.max_size:
+                    break
+                # Entries locked by a fetch in progress are kept
+                with _locked(
+                    self._locks / f"{entry.name}.lock", blocking=False
+                ) as acquired:
+                    if acquired:
+                        entry.unlink()
+                        size -= entry_size
@@ -0,0 +1,125 @@
+import dataclasses
+import heapq
+import itertools
+import threading
+import time
+from collections.abc import Callable
+
+GRANT_INTERVAL = 0.1  # seconds of bandwidth granted to a single read
+MIN_READ_SIZE = 64 * 1024  # bytes
+
+
+class Limiter:
+    """
+    Token bucket limiting the bytes per second downloaded by all threads.
+    Waiting downloads are served in start-time fair queuing order, so each
+    one receives a share of the bandwidth proportional to its priority.
+    """
+
+    def __init__(
+        self,
+        rate: float | None = None,
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        """
+        Args:
+            rate: Maximum bytes per second, None disables the limit.
+            clock: Monotonic clock in seconds.
+        """
+        self._rate = rate
+        self._clock = clock
+        self._tokens = 0.0
+        self._updated_at = clock()
+        self._condition = threading.Condition()
+        self._queue: list[tuple[float, int]] = []
+        self._tickets = itertools.count()
+        self._virtual_time = 0.0
+
+    @property
+    def rate(self) -> float | None:
+        return self._rate
+
+    def configure(self, rate: float | None) -> None:
+        """Changes the maximum bytes per second, also of running downloads."""
+        with self._condition:
+            self._refill()
+            self._rate = rate
+            self._tokens = min(self._tokens, 0.0)
+            self._condition.notify_all()
+
+    def read_size(self, buffer_size: int) -> int:
+        """Returns how many bytes to read at once to keep the rate smooth."""
+        if self._rate is None:
+            return buffer_size
+        return min(
+            buffer_size, max(MIN_READ_SIZE, int(self._rate * GRANT_INTERVAL))
+        )
+
+    def _refill(self) -> None:
+        now = self._clock()
+        if self._rate is not None:
+            # Idle bandwidth is not saved up beyond a single grant
+            self._tokens = min(
+                self._tokens + (now - self._updated_at) * self._rate,
+                self._rate * GRANT_INTERVAL,
+            )
+        self._updated_at = now
+
+    def consume(self, size: int, flow: "Flow") -> None:
+        """
+        Blocks until the limit allows a flow to continue after reading a
+        number of bytes. Reads are paid for afterwards, the debt delays the
+        next reads of all flows.
+        """
+        with self._condition:
+            if self._rate is None:
+                return
+            start = max(self._virtual_time, flow.finish)
+            flow.finish = start + size / flow.priority
+            entry = (start, next(self._tickets))
+            heapq.heappush(self._queue, entry)
+            try:
+                while self._rate is not None:
+                    self._refill()
+                    timeout = None
+                    if self._queue[0] == entry:
+                        if self._tokens > 0:
+                            self._tokens -= size
+                            break
+                        timeout = -self._tokens / self._rate
+                    self._condition.wait(timeout)
+            finally:
+                self._queue.remove(entry)
+                heapq.heapify(self._queue)
+                self._virtual_time = max(self._virtual_time, start)
+                self._condition.notify_all()
+
+    def flow(self, priority: float = 1.0) -> "Flow":
+        """
+        Starts a download sharing the bandwidth.
+
+        Args:
+            priority: Weight of the flow's share of the bandwidth, a flow of
+                priority 2 receives twice the bandwidth of priority 1.
+        """
+        if priority <= 0:
+            raise ValueError("Priority must be positive")
+        return Flow(self, priority)
+
+
+@dataclasses.dataclass
+class Flow:
+    """A single download sharing the bandwidth of a limiter."""
+
+    limiter: Limiter
+    priority: float
+    finish: float = 0.0  # virtual time at which the flow's last read ends
+
+    def read_size(self, buffer_size: int) -> int:
+        return self.limiter.read_size(buffer_size)
+
+    def consume(self, size: int) -> None:
+        self.limiter.consume(size, self)
+
+
+limiter = Limiter()
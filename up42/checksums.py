@@ -0,0 +1,92 @@
+import dataclasses
+import hashlib
+from typing import Protocol
+
+# Multihash codes of the hash functions available in hashlib
+MULTIHASH_ALGORITHMS = {
+    0x11: "sha1",
+    0x12: "sha256",
+    0x13: "sha512",
+    0xD5: "md5",
+}
+
+
+class Hasher(Protocol):
+    def update(self, data: bytes | memoryview, /) -> None:
+        ...
+
+    def hexdigest(self) -> str:
+        ...
+
+
+class UnsupportedChecksum(ValueError):
+    pass
+
+
+class ChecksumMismatch(ValueError):
+    pass
+
+
+def _read_varint(data: bytes, position: int) -> tuple[int, int]:
+    value, shift = 0, 0
+    while position < len(data):
+        byte = data[position]
+        value |= (byte & 0x7F) << shift
+        position += 1
+        if not byte & 0x80:
+            return value, position
+        shift += 7
+    raise UnsupportedChecksum("Truncated multihash")
+
+
+@dataclasses.dataclass(frozen=True)
+class Checksum:
+    """
+    Expected digest of a file.
+
+    Args:
+        algorithm: Name of the hashlib hash function, e.g. md5 or sha256.
+        digest: The hexadecimal digest.
+    """
+
+    algorithm: str
+    digest: str
+
+    @classmethod
+    def from_multihash(cls, value: str) -> "Checksum":
+        """
+        Parses a hexadecimal multihash, as used by the STAC `file:checksum`
+        field.
+        """
+        try:
+            data = bytes.fromhex(value)
+        except ValueError as error:
+            raise UnsupportedChecksum(f"Invalid multihash {value}") from error
+        code, position = _read_varint(data, 0)
+        length, position = _read_varint(data, position)
+        if code not in MULTIHASH_ALGORITHMS:
+            raise UnsupportedChecksum(f"Unsupported multihash code {code:#x}")
+        digest = data[position:]
+        if len(digest) != length:
+            raise UnsupportedChecksum(f"Invalid multihash {value}")
+        return cls(MULTIHASH_ALGORITHMS[code], digest.hex())
+
+    def hasher(self) -> Hasher:
+        try:
+            return hashlib.new(self.algorithm)
+        except ValueError as error:
+            raise UnsupportedChecksum(
+                f"Unsupported hash function {self.algorithm}"
+            ) from error
+
+    def verify(self, hasher: Hasher, source: str) -> None:
+        """
+        Raises:
+            ChecksumMismatch: The computed digest differs from the expected one.
+        """
+        actual = hasher.hexdigest()
+        if actual != self.digest.lower():
+            raise ChecksumMismatch(
+                f"{self.algorithm} digest of {source} is {actual}, "
+                f"expected {self.digest}"
+            )
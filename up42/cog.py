@@ -0,0 +1,534 @@
+import array
+import collections
+import dataclasses
+import io
+import math
+import struct
+import sys
+import threading
+import zlib
+from collections.abc import Callable, Iterator
+
+HEADER_SIZE = 16 * 1024  # bytes read at once while parsing the header
+HEADER_CACHE_SIZE = 128  # headers kept in memory
+MAX_GAP = 64 * 1024  # bytes between tiles fetched in a single range
+
+# TIFF field types by the struct format and number of values of each item
+_TYPES = {
+    1: ("B", 1),
+    2: ("s", 1),
+    3: ("H", 1),
+    4: ("L", 1),
+    5: ("L", 2),
+    6: ("b", 1),
+    7: ("B", 1),
+    8: ("h", 1),
+    9: ("l", 1),
+    10: ("l", 2),
+    11: ("f", 1),
+    12: ("d", 1),
+    16: ("Q", 1),
+    17: ("q", 1),
+    18: ("Q", 1),
+}
+File = io.RawIOBase | io.BufferedIOBase
+
+_SAMPLE_KINDS = {1: "u", 2: "i", 3: "f"}
+
+NEW_SUBFILE_TYPE = 254
+IMAGE_WIDTH = 256
+IMAGE_LENGTH = 257
+BITS_PER_SAMPLE = 258
+COMPRESSION = 259
+SAMPLES_PER_PIXEL = 277
+PLANAR_CONFIGURATION = 284
+PREDICTOR = 317
+TILE_WIDTH = 322
+TILE_LENGTH = 323
+TILE_OFFSETS = 324
+TILE_BYTE_COUNTS = 325
+SAMPLE_FORMAT = 339
+MODEL_PIXEL_SCALE = 33550
+MODEL_TIEPOINT = 33922
+MODEL_TRANSFORMATION = 34264
+
+NO_COMPRESSION = 1
+LZW = 5
+DEFLATE = (8, 32946)
+MASK_SUBFILE = 4
+
+_LZW_CLEAR = 256
+_LZW_END = 257
+
+
+class UnsupportedTiff(ValueError):
+    pass
+
+
+@dataclasses.dataclass(frozen=True)
+class Window:
+    """Pixel window of an image, in columns and rows."""
+
+    column: int
+    row: int
+    width: int
+    height: int
+
+
+@dataclasses.dataclass(frozen=True)
+class Image:
+    """A tiled image of a GeoTIFF, the full resolution one or an overview."""
+
+    width: int
+    height: int
+    tile_width: int
+    tile_height: int
+    samples: int
+    bits_per_sample: int
+    sample_format: int
+    compression: int
+    predictor: int
+    tile_offsets: tuple[int, ...]
+    tile_byte_counts: tuple[int, ...]
+
+    @property
+    def pixel_size(self) -> int:
+        return self.samples * self.bits_per_sample // 8
+
+    @property
+    def tiles_across(self) -> int:
+        return math.ceil(self.width / self.tile_width)
+
+    def tiles(self, window: Window) -> Iterator[tuple[int, int]]:
+        """Yields the row and column of each tile intersecting a window."""
+        first_row = window.row // self.tile_height
+        last_row = (window.row + window.height - 1) // self.tile_height
+        first_column = window.column // self.tile_width
+        last_column = (window.column + window.width - 1) // self.tile_width
+        for row in range(first_row, last_row + 1):
+            for column in range(first_column, last_column + 1):
+                yield row, column
+
+
+@dataclasses.dataclass(frozen=True)
+class Header:
+    """
+    Layout of a tiled GeoTIFF.
+
+    Attributes:
+        images: The full resolution image followed by its overviews.
+        byte_order: `<` for little endian, `>` for big endian files.
+        size: The file size in bytes.
+        transform: Origin and pixel size `(x0, dx, y0, dy)` in the
+            coordinates of the image, a pixel at a column and row starts
+            at `x0 + column * dx, y0 + row * dy`. None without
+            georeferencing.
+    """
+
+    images: list[Image]
+    byte_order: str
+    size: int
+    transform: tuple[float, float, float, float] | None = None
+
+
+@dataclasses.dataclass(frozen=True)
+class Raster:
+    """
+    Pixels of a window, interleaved by pixel and stored row by row, e.g.
+    `numpy.frombuffer(raster.data, raster.dtype).reshape(raster.shape)`.
+    """
+
+    window: Window
+    samples: int
+    dtype: str
+    data: bytes
+
+    @property
+    def shape(self) -> tuple[int, int, int]:
+        return self.window.height, self.window.width, self.samples
+
+
+def _values(
+    file: File,
+    byte_order: str,
+    offset_format: str,
+    entry: bytes,
+) -> tuple:
+    tag_type, count = struct.unpack_from(
+        f"{byte_order}H{offset_format}", entry, 2
+    )
+    if tag_type not in _TYPES:
+        return ()
+    type_format, multiplier = _TYPES[tag_type]
+    value_format = f"{byte_order}{count * multiplier}{type_format}"
+    size = struct.calcsize(value_format)
+    field_size = struct.calcsize(f"={offset_format}")
+    value_start = 4 + field_size
+    if size <= field_size:
+        return struct.unpack_from(value_format, entry, value_start)
+    (value_offset,) = struct.unpack_from(
+        f"{byte_order}{offset_format}", entry, value_start
+    )
+    file.seek(value_offset)
+    return struct.unpack(value_format, _read_exactly(file, size))
+
+
+def _read_ifds(file: File) -> tuple[str, list[dict[int, tuple]]]:
+    file.seek(0)
+    prefix = file.read(16)
+    byte_order = {b"II": "<", b"MM": ">"}.get(prefix[:2])
+    if byte_order is None:
+        raise UnsupportedTiff("Not a TIFF file")
+    (version,) = struct.unpack(f"{byte_order}H", prefix[2:4])
+    if version == 42:
+        count_format, offset_format = "H", "L"
+        (offset,) = struct.unpack(f"{byte_order}L", prefix[4:8])
+    elif version == 43:
+        count_format, offset_format = "Q", "Q"
+        (offset,) = struct.unpack(f"{byte_order}Q", prefix[8:16])
+    else:
+        raise UnsupportedTiff("Not a TIFF file")
+    entry_size = 4 + 2 * struct.calcsize(f"={offset_format}")
+    count_size = struct.calcsize(f"={count_format}")
+    ifds: list[dict[int, tuple]] = []
+    visited = set()
+    while offset and offset not in visited:
+        visited.add(offset)
+        file.seek(offset)
+        (count,) = struct.unpack(
+            f"{byte_order}{count_format}", file.read(count_size)
+        )
+        entries = file.read(count * entry_size)
+        (offset,) = struct.unpack(
+            f"{byte_order}{offset_format}",
+            file.read(struct.calcsize(f"={offset_format}")),
+        )
+        tags = {}
+        for index in range(count):
+            start = index * entry_size
+            entry = entries[start:][:entry_size]
+            (tag,) = struct.unpack(f"{byte_order}H", entry[:2])
+            tags[tag] = entry
+        ifds.append(
+            {
+                tag: _values(file, byte_order, offset_format, entry)
+                for tag, entry in tags.items()
+            }
+        )
+    return byte_order, ifds
+
+
+def _image(tags: dict[int, tuple]) -> Image:
+    if TILE_OFFSETS not in tags:
+        raise UnsupportedTiff("Only tiled TIFF files can be read in windows")
+    if tags.get(PLANAR_CONFIGURATION, (1,))[0] != 1:
+        raise UnsupportedTiff(
+            "Only pixel interleaved TIFF files are supported"
+        )
+    bits_per_sample = set(tags.get(BITS_PER_SAMPLE, (1,)))
+    bits = bits_per_sample.pop()
+    if bits_per_sample or bits % 8:
+        raise UnsupportedTiff(f"Unsupported bits per sample {bits}")
+    return Image(
+        width=tags[IMAGE_WIDTH][0],
+        height=tags[IMAGE_LENGTH][0],
+        tile_width=tags[TILE_WIDTH][0],
+        tile_height=tags[TILE_LENGTH][0],
+        samples=tags.get(SAMPLES_PER_PIXEL, (1,))[0],
+        bits_per_sample=bits,
+        sample_format=tags.get(SAMPLE_FORMAT, (1,))[0],
+        compression=tags.get(COMPRESSION, (NO_COMPRESSION,))[0],
+        predictor=tags.get(PREDICTOR, (1,))[0],
+        tile_offsets=tags[TILE_OFFSETS],
+        tile_byte_counts=tags[TILE_BYTE_COUNTS],
+    )
+
+
+def _transform(
+    tags: dict[int, tuple]
+) -> tuple[float, float, float, float] | None:
+    if MODEL_TRANSFORMATION in tags:
+        matrix = tags[MODEL_TRANSFORMATION]
+        if matrix[1] or matrix[4]:
+            raise UnsupportedTiff("Rotated images are not supported")
+        return matrix[3], matrix[0], matrix[7], matrix[5]
+    if MODEL_PIXEL_SCALE in tags and MODEL_TIEPOINT in tags:
+        scale_x, scale_y = tags[MODEL_PIXEL_SCALE][:2]
+        column, row, _, x, y = tags[MODEL_TIEPOINT][:5]
+        return x - column * scale_x, scale_x, y + row * scale_y, -scale_y
+    return None
+
+
+def read_header(file: File) -> Header:
+    """
+    Parses the layout of a tiled GeoTIFF, e.g. a Cloud-Optimized GeoTIFF
+    whose header and tile offsets come first in the file.
+
+    Args:
+        file: A seekable binary file, ideally buffered.
+
+    Raises:
+        UnsupportedTiff: The file is not a tiled, pixel interleaved TIFF.
+    """
+    byte_order, ifds = _read_ifds(file)
+    if not ifds:
+        raise UnsupportedTiff("TIFF file without images")
+    images = [
+        _image(tags)
+        for tags in ifds
+        if not tags.get(NEW_SUBFILE_TYPE, (0,))[0] & MASK_SUBFILE
+    ]
+    size = file.seek(0, io.SEEK_END)
+    return Header(images, byte_order, size, _transform(ifds[0]))
+
+
+class HeaderCache:
+    """Least recently used headers, shared by all readers of a process."""
+
+    def __init__(self, size: int = HEADER_CACHE_SIZE):
+        self.size = size
+        self._headers: collections.OrderedDict[
+            str, Header
+        ] = collections.OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key: str, read: Callable[[], Header]) -> Header:
+        with self._lock:
+            if key in self._headers:
+                self._headers.move_to_end(key)
+                return self._headers[key]
+        header = read()
+        with self._lock:
+            self._headers[key] = header
+            while len(self._headers) > self.size:
+                self._headers.popitem(last=False)
+        return header
+
+    def clear(self) -> None:
+        with self._lock:
+            self._headers.clear()
+
+
+headers = HeaderCache()
+
+
+def _lzw_decode(data: bytes) -> bytes:
+    """Decodes TIFF LZW, with most significant bits first and early change."""
+    padded = data + bytes(3)
+    end = len(data) * 8
+    table = [bytes([value]) for value in range(256)] + [b"", b""]
+    output = bytearray()
+    previous = b""
+    bits, position = 9, 0
+    while position + bits <= end:
+        start = position // 8
+        chunk = int.from_bytes(padded[start:][:3], "big")
+        code = (chunk >> (24 - bits - position % 8)) & ((1 << bits) - 1)
+        position += bits
+        if code == _LZW_CLEAR:
+            del table[258:]
+            bits, previous = 9, b""
+            continue
+        if code == _LZW_END:
+            break
+        if code < len(table):
+            entry = table[code]
+            if previous:
+                table.append(previous + entry[:1])
+        elif previous:
+            entry = previous + previous[:1]
+            table.append(entry)
+        else:
+            raise UnsupportedTiff("Corrupt LZW data")
+        output += entry
+        previous = entry
+        if len(table) + 1 >= 1 << bits and bits < 12:
+            bits += 1
+    return bytes(output)
+
+
+def _undo_predictor(data: bytes, image: Image, byte_order: str) -> bytes:
+    """Reverses horizontal differencing of integer samples."""
+    typecode = {1: "B", 2: "H", 4: "I", 8: "Q"}[image.bits_per_sample // 8]
+    samples = array.array(typecode, data)
+    swap = image.bits_per_sample > 8 and byte_order != (
+        "<" if sys.byteorder == "little" else ">"
+    )
+    if swap:
+        samples.byteswap()
+    mask = (1 << image.bits_per_sample) - 1
+    row_size = image.tile_width * image.samples
+    for start in range(0, len(samples), row_size):
+        for index in range(start + image.samples, start + row_size):
+            samples[index] = (
+                samples[index] + samples[index - image.samples]
+            ) & mask
+    if swap:
+        samples.byteswap()
+    return samples.tobytes()
+
+
+def decode_tile(data: bytes, image: Image, byte_order: str) -> bytes:
+    """
+    Decompresses a tile of an image.
+
+    Raises:
+        UnsupportedTiff: The compression or predictor is not supported.
+    """
+    if image.compression in DEFLATE:
+        data = zlib.decompress(data)
+    elif image.compression == LZW:
+        data = _lzw_decode(data)
+    elif image.compression != NO_COMPRESSION:
+        raise UnsupportedTiff(f"Unsupported compression {image.compression}")
+    if image.predictor == 2 and image.sample_format != 3:
+        return _undo_predictor(data, image, byte_order)
+    if image.predictor != 1:
+        raise UnsupportedTiff(f"Unsupported predictor {image.predictor}")
+    return data
+
+
+class Reader:
+    """
+    Reads windows of a tiled GeoTIFF, fetching only the tiles covering
+    them. Adjacent tiles are fetched in a single read.
+    """
+
+    def __init__(self, file: File, header: Header):
+        """
+        Args:
+            file: The seekable file, e.g. a `transfer.RangeFile`.
+            header: The layout of the file, see `read_header`.
+        """
+        self.file = file
+        self.header = header
+
+    def window(
+        self,
+        bounds: tuple[float, float, float, float],
+        overview: int = 0,
+    ) -> Window:
+        """
+        Returns the pixel window covering geographic bounds.
+
+        Args:
+            bounds: `(left, bottom, right, top)` in the coordinate
+                reference system of the image.
+            overview: 0 for the full resolution image, otherwise the
+                number of the overview.
+
+        Raises:
+            UnsupportedTiff: The image is not georeferenced.
+            ValueError: The bounds do not intersect the image.
+        """
+        if self.header.transform is None:
+            raise UnsupportedTiff("The image is not georeferenced")
+        full, image = self.header.images[0], self.header.images[overview]
+        x0, dx, y0, dy = self.header.transform
+        dx *= full.width / image.width
+        dy *= full.height / image.height
+        left, bottom, right, top = bounds
+        columns = sorted(((left - x0) / dx, (right - x0) / dx))
+        rows = sorted(((top - y0) / dy, (bottom - y0) / dy))
+        column = max(math.floor(columns[0]), 0)
+        row = max(math.floor(rows[0]), 0)
+        width = min(math.ceil(columns[1]), image.width) - column
+        height = min(math.ceil(rows[1]), image.height) - row
+        if width <= 0 or height <= 0:
+            raise ValueError(f"Bounds {bounds} outside of the image")
+        return Window(column, row, width, height)
+
+    def _fetch(self, ranges: list[tuple[int, int]]) -> Iterator[bytes]:
+        """Yields the bytes of ranges, merging those close to each other."""
+        order = sorted(range(len(ranges)), key=lambda index: ranges[index])
+        chunks: dict[int, bytes] = {}
+        position = 0
+        while position < len(order):
+            group = [order[position]]
+            start, size = ranges[order[position]]
+            end = start + size
+            position += 1
+            while position < len(order):
+                next_start, next_size = ranges[order[position]]
+                if next_start - end > MAX_GAP:
+                    break
+                group.append(order[position])
+                end = max(end, next_start + next_size)
+                position += 1
+            self.file.seek(start)
+            data = _read_exactly(self.file, end - start)
+            for index in group:
+                offset, length = ranges[index]
+                chunk_start = offset - start
+                chunks[index] = data[chunk_start:][:length]
+        for index in range(len(ranges)):
+            yield chunks.pop(index)
+
+    def read(self, window: Window | None = None, overview: int = 0) -> Raster:
+        """
+        Reads the pixels of a window.
+
+        Args:
+            window: The pixel window, by default the whole image.
+            overview: 0 for the full resolution image, otherwise the
+                number of the overview.
+
+        Raises:
+            UnsupportedTiff: The compression or predictor is not supported.
+            ValueError: The window exceeds the image.
+        """
+        image = self.header.images[overview]
+        window = window or Window(0, 0, image.width, image.height)
+        if (
+            min(window.column, window.row) < 0
+            or min(window.width, window.height) <= 0
+            or window.column + window.width > image.width
+            or window.row + window.height > image.height
+        ):
+            raise ValueError(f"Window {window} outside of the image")
+        pixel_size = image.pixel_size
+        output = bytearray(window.width * window.height * pixel_size)
+        tiles = list(image.tiles(window))
+        indexes = [row * image.tiles_across + column for row, column in tiles]
+        ranges = [
+            (image.tile_offsets[index], image.tile_byte_counts[index])
+            for index in indexes
+        ]
+        for (row, column), data in zip(tiles, self._fetch(ranges)):
+            tile = decode_tile(data, image, self.header.byte_order)
+            tile_column = column * image.tile_width
+            tile_row = row * image.tile_height
+            first_column = max(window.column, tile_column)
+            last_column = min(
+                window.column + window.width, tile_column + image.tile_width
+            )
+            span = (last_column - first_column) * pixel_size
+            for y in range(
+                max(window.row, tile_row),
+                min(window.row + window.height, tile_row + image.tile_height),
+            ):
+                source = (
+                    (y - tile_row) * image.tile_width
+                    + first_column
+                    - tile_column
+                ) * pixel_size
+                target = (
+                    (y - window.row) * window.width
+                    + first_column
+                    - window.column
+                ) * pixel_size
+                target_end = target + span
+                output[target:target_end] = tile[source:][:span]
+        kind = _SAMPLE_KINDS.get(image.sample_format, "u")
+        dtype = f"{self.header.byte_order}{kind}{image.bits_per_sample // 8}"
+        return Raster(window, image.samples, dtype, bytes(output))
+
+
+def _read_exactly(file: File, size: int) -> bytes:
+    chunks = io.BytesIO()
+    while chunks.tell() < size:
+        chunk = file.read(size - chunks.tell())
+        if not chunk:
+            raise UnsupportedTiff("Data beyond the end of the file")
+        chunks.write(chunk)
+    return chunks.getvalue()
@@ -0,0 +1,423 @@
+import dataclasses
+import heapq
+import itertools
+import math
+from collections.abc import Callable, Iterable, Iterator, Sequence
+from typing import Generic, TypeVar, cast
+
+Item = TypeVar("Item")
+
+Bounds = tuple[float, float, float, float]  # west, south, east, north
+Point = Sequence[float]
+Ring = Sequence[Point]
+Edge = tuple[Point, Point]
+
+
+def polygons(geometry: dict) -> list[Sequence[Ring]]:
+    """Returns the rings of each polygon of a (Multi)Polygon geometry."""
+    if geometry["type"] == "Polygon":
+        return [geometry["coordinates"]]
+    if geometry["type"] == "MultiPolygon":
+        return list(geometry["coordinates"])
+    raise ValueError(f"Unsupported geometry type {geometry['type']}")
+
+
+def _point(geometry: dict) -> Point | None:
+    """Returns the coordinates of a Point geometry, None for polygons."""
+    return geometry["coordinates"] if geometry["type"] == "Point" else None
+
+
+def _ring_bounds(rings: Sequence[Ring]) -> Bounds:
+    """Bounds of a polygon, i.e. of its exterior ring."""
+    xs = [point[0] for point in rings[0]]
+    ys = [point[1] for point in rings[0]]
+    return min(xs), min(ys), max(xs), max(ys)
+
+
+def bounds(geometry: dict) -> Bounds:
+    if point := _point(geometry):
+        return point[0], point[1], point[0], point[1]
+    return union(_ring_bounds(polygon) for polygon in polygons(geometry))
+
+
+def box(box_bounds: Bounds) -> dict:
+    """Returns the polygon of bounds."""
+    west, south, east, north = box_bounds
+    return {
+        "type": "Polygon",
+        "coordinates": [
+            [
+                [west, south],
+                [east, south],
+                [east, north],
+                [west, north],
+                [west, south],
+            ]
+        ],
+    }
+
+
+def grid(area: Bounds, tile_size: float) -> Iterator[Bounds]:
+    """Splits bounds into square tiles, clipped at the east and north."""
+    west, south, east, north = area
+    columns = max(math.ceil((east - west) / tile_size), 1)
+    rows = max(math.ceil((north - south) / tile_size), 1)
+    for row in range(rows):
+        for column in range(columns):
+            yield (
+                west + column * tile_size,
+                south + row * tile_size,
+                min(west + (column + 1) * tile_size, east),
+                min(south + (row + 1) * tile_size, north),
+            )
+
+
+def _overlap(first: Bounds, second: Bounds) -> bool:
+    return (
+        first[0] <= second[2]
+        and second[0] <= first[2]
+        and first[1] <= second[3]
+        and second[1] <= first[3]
+    )
+
+
+def _edges(rings: Sequence[Ring]) -> Iterator[Edge]:
+    for ring in rings:
+        yield from zip(ring, ring[1:])
+
+
+def _cross(origin: Point, first: Point, second: Point) -> float:
+    return (first[0] - origin[0]) * (second[1] - origin[1]) - (
+        first[1] - origin[1]
+    ) * (second[0] - origin[0])
+
+
+def _on_segment(point: Point, start: Point, end: Point) -> bool:
+    return min(start[0], end[0]) <= point[0] <= max(start[0], end[0]) and min(
+        start[1], end[1]
+    ) <= point[1] <= max(start[1], end[1])
+
+
+def _segments_intersect(first: Edge, second: Edge) -> bool:
+    (a, b), (c, d) = first, second
+    sides = [
+        _cross(c, d, a),
+        _cross(c, d, b),
+        _cross(a, b, c),
+        _cross(a, b, d),
+    ]
+    if sides[0] * sides[1] < 0 and sides[2] * sides[3] < 0:
+        return True
+    # Touching or collinear segments
+    return any(
+        not side and _on_segment(point, *segment)
+        for side, point, segment in zip(
+            sides, (a, b, c, d), (second, second, first, first)
+        )
+    )
+
+
+def _contains_point(rings: Sequence[Ring], point: Point) -> bool:
+    """Even-odd test, points in holes are outside."""
+    inside = False
+    x, y = point[0], point[1]
+    for start, end in _edges(rings):
+        if (start[1] > y) != (end[1] > y):
+            crossing = start[0] + (y - start[1]) * (end[0] - start[0]) / (
+                end[1] - start[1]
+            )
+            if x < crossing:
+                inside = not inside
+    return inside
+
+
+def _edge_bounds(edge: Edge) -> Bounds:
+    start, end = edge
+    return (
+        min(start[0], end[0]),
+        min(start[1], end[1]),
+        max(start[0], end[0]),
+        max(start[1], end[1]),
+    )
+
+
+def _edge_pairs(
+    first: Sequence[Ring], second: Sequence[Ring]
+) -> Iterator[tuple[Edge, Edge]]:
+    """
+    Pairs of edges of two polygons whose bounds overlap. Only the edges
+    within the bounds of the other polygon are candidates, the candidates
+    of the second polygon are indexed in an R-tree, so that a large area
+    is not compared edge by edge with a footprint.
+    """
+    first_bounds, second_bounds = _ring_bounds(first), _ring_bounds(second)
+    candidates = [
+        (_edge_bounds(edge), edge)
+        for edge in _edges(second)
+        if _overlap(_edge_bounds(edge), first_bounds)
+    ]
+    if not candidates:
+        return
+    tree: STRTree[Edge] = STRTree(candidates)
+    for edge in _edges(first):
+        edge_bounds = _edge_bounds(edge)
+        if _overlap(edge_bounds, second_bounds):
+            for other in tree.query(edge_bounds):
+                yield edge, other
+
+
+def _polygons_intersect(first: Sequence[Ring], second: Sequence[Ring]) -> bool:
+    # Containment is linear, unlike the comparison of edges
+    if _contains_point(first, second[0][0]) or _contains_point(
+        second, first[0][0]
+    ):
+        return True
+    return any(
+        _segments_intersect(edge, other)
+        for edge, other in _edge_pairs(first, second)
+    )
+
+
+def intersects(first: dict, second: dict) -> bool:
+    """Whether two Point or (Multi)Polygon geometries share a point."""
+    if not _overlap(bounds(first), bounds(second)):
+        return False
+    if point := _point(first):
+        # Points with overlapping bounds are equal
+        return bool(_point(second)) or _covered(second, point)
+    if point := _point(second):
+        return _covered(first, point)
+    return any(
+        _polygons_intersect(polygon, other)
+        for polygon in polygons(first)
+        for other in polygons(second)
+    )
+
+
+def _covers_point(rings: Sequence[Ring], point: Point) -> bool:
+    return _contains_point(rings, point) or any(
+        not _cross(start, end, point) and _on_segment(point, start, end)
+        for start, end in _edges(rings)
+    )
+
+
+def _covered(geometry: dict, point: Point) -> bool:
+    return any(_covers_point(polygon, point) for polygon in polygons(geometry))
+
+
+def _crosses(first: Sequence[Ring], second: Sequence[Ring]) -> bool:
+    """Whether edges of two polygons cross properly, not just touch."""
+    return any(
+        _cross(c, d, a) * _cross(c, d, b) < 0
+        and _cross(a, b, c) * _cross(a, b, d) < 0
+        for (a, b), (c, d) in _edge_pairs(first, second)
+    )
+
+
+def _polygon_contains(outer: Sequence[Ring], inner: Sequence[Ring]) -> bool:
+    return (
+        all(_covers_point(outer, point) for point in inner[0])
+        and not _crosses(outer, inner)
+        # No hole of the outer polygon may lie inside the inner one
+        and not any(_contains_point(inner, hole[0]) for hole in outer[1:])
+    )
+
+
+def contains(outer: dict, inner: dict) -> bool:
+    """
+    Whether a (Multi)Polygon geometry covers a Point or (Multi)Polygon
+    geometry, each polygon of the inner geometry has to lie within a
+    single outer polygon.
+    """
+    outer_bounds, inner_bounds = bounds(outer), bounds(inner)
+    if not (
+        outer_bounds[0] <= inner_bounds[0]
+        and outer_bounds[1] <= inner_bounds[1]
+        and inner_bounds[2] <= outer_bounds[2]
+        and inner_bounds[3] <= outer_bounds[3]
+    ):
+        return False
+    if point := _point(inner):
+        return _covered(outer, point)
+    return all(
+        any(_polygon_contains(polygon, other) for polygon in polygons(outer))
+        for other in polygons(inner)
+    )
+
+
+def _segment_distance(point: Point, start: Point, end: Point) -> float:
+    dx, dy = end[0] - start[0], end[1] - start[1]
+    length = dx * dx + dy * dy
+    ratio = 0.0
+    if length:
+        ratio = (
+            (point[0] - start[0]) * dx + (point[1] - start[1]) * dy
+        ) / length
+        ratio = min(max(ratio, 0.0), 1.0)
+    return math.hypot(
+        point[0] - start[0] - ratio * dx, point[1] - start[1] - ratio * dy
+    )
+
+
+def _segments(geometry: dict) -> list[Edge]:
+    if point := _point(geometry):
+        return [(point, point)]
+    return [edge for polygon in polygons(geometry) for edge in _edges(polygon)]
+
+
+def distance(first: dict, second: dict) -> float:
+    """
+    Planar distance between two Point or (Multi)Polygon geometries, 0 if
+    they intersect.
+    """
+    if intersects(first, second):
+        return 0.0
+    # Disjoint geometries are closest at a vertex of one of them
+    first_segments, second_segments = _segments(first), _segments(second)
+    return min(
+        _segment_distance(point, *segment)
+        for points, segments in [
+            (first_segments, second_segments),
+            (second_segments, first_segments),
+        ]
+        for point, _ in points
+        for segment in segments
+    )
+
+
+def _bounds_distance(first: Bounds, second: Bounds) -> float:
+    return math.hypot(
+        max(first[0] - second[2], second[0] - first[2], 0),
+        max(first[1] - second[3], second[1] - first[3], 0),
+    )
+
+
+def union(all_bounds: Iterable[Bounds]) -> Bounds:
+    wests, souths, easts, norths = zip(*all_bounds)
+    return min(wests), min(souths), max(easts), max(norths)
+
+
+@dataclasses.dataclass
+class _Node(Generic[Item]):
+    bounds: Bounds
+    children: list["_Node[Item]"] = dataclasses.field(default_factory=list)
+    item: Item | None = None
+
+    @property
+    def center(self) -> tuple[float, float]:
+        west, south, east, north = self.bounds
+        return (west + east) / 2, (south + north) / 2
+
+
+class STRTree(Generic[Item]):
+    """
+    Static R-tree packed with the Sort-Tile-Recursive algorithm, finding
+    the items whose bounds overlap a query in logarithmic time, and the
+    items nearest to a query.
+    """
+
+    def __init__(
+        self, entries: Iterable[tuple[Bounds, Item]], node_capacity: int = 16
+    ):
+        """
+        Args:
+            entries: The bounds and item of each entry.
+            node_capacity: Maximum number of children of a node.
+        """
+        if node_capacity < 2:
+            raise ValueError("Node capacity must be at least 2")
+        self.node_capacity = node_capacity
+        level: list[_Node[Item]] = [
+            _Node(entry_bounds, item=item) for entry_bounds, item in entries
+        ]
+        self.size = len(level)
+        while len(level) > node_capacity:
+            level = self._pack(level)
+        self._roots = level
+
+    def _pack(self, nodes: list[_Node[Item]]) -> list[_Node[Item]]:
+        capacity = self.node_capacity
+        slice_count = math.ceil(math.sqrt(math.ceil(len(nodes) / capacity)))
+        slice_size = slice_count * capacity
+        by_x = sorted(nodes, key=lambda node: node.center[0])
+        parents = []
+        for start in range(0, len(by_x), slice_size):
+            column = sorted(
+                by_x[start:][:slice_size], key=lambda node: node.center[1]
+            )
+            for offset in range(0, len(column), capacity):
+                children = column[offset:][:capacity]
+                parents.append(
+                    _Node(
+                        union(child.bounds for child in children),
+                        children,
+                    )
+                )
+        return parents
+
+    def __len__(self) -> int:
+        return self.size
+
+    def query(self, query_bounds: Bounds) -> list[Item]:
+        """Returns the items whose bounds overlap bounds."""
+        found: list[Item] = []
+        stack = [
+            node for node in self._roots if _overlap(node.bounds, query_bounds)
+        ]
+        while stack:
+            node = stack.pop()
+            if not node.children:
+                found.append(cast(Item, node.item))
+                continue
+            stack.extend(
+                child
+                for child in node.children
+                if _overlap(child.bounds, query_bounds)
+            )
+        return found
+
+    def nearest(
+        self,
+        query_bounds: Bounds,
+        count: int = 1,
+        distance_to: Callable[[Item], float] | None = None,
+    ) -> list[Item]:
+        """
+        Returns the items nearest to bounds, nearest first.
+
+        Args:
+            query_bounds: The bounds to measure the distance from.
+            count: Maximum number of items to return.
+            distance_to: Exact distance of an item to the query, at least
+                the distance of its bounds. By default the distance of the
+                item bounds.
+        """
+        found: list[Item] = []
+        order = itertools.count()  # breaks ties without comparing nodes
+        # Best-first search, bounds distances are lower bounds
+        heap = [
+            (_bounds_distance(node.bounds, query_bounds), next(order), node)
+            for node in self._roots
+        ]
+        heapq.heapify(heap)
+        measured: set[int] = set()
+        while heap and len(found) < count:
+            _, _, node = heapq.heappop(heap)
+            if node.children:
+                for child in node.children:
+                    heapq.heappush(
+                        heap,
+                        (
+                            _bounds_distance(child.bounds, query_bounds),
+                            next(order),
+                            child,
+                        ),
+                    )
+                continue
+            item = cast(Item, node.item)
+            if distance_to is None or id(node) in measured:
+                found.append(item)
+                continue
+            measured.add(id(node))
+            heapq.heappush(heap, (distance_to(item), next(order), node))
+        return found
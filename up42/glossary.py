@@ -1,12 +1,17 @@
 import dataclasses
 import enum
-from collections.abc import Iterator
-from typing import Any, Literal, TypeAlias
+import math
+import queue
+import threading
+import time
+from collections.abc import Callable, Iterable, Iterator, Mapping, Sequence
+from concurrent import futures
+from typing import TYPE_CHECKING, Any, Literal, TypeAlias
 
 import geojson  # type: ignore
 import requests
 
-from up42 import base, host, utils
+from up42 import base, geometry, host, scene_table, search_cache, utils
 
 
 class CollectionType(enum.Enum):
@@ -61,6 +66,60 @@ class Scene:
     quicklook: utils.ImageFile
     provider_properties: dict
 
+    # Hidden from type checkers, which would accept any attribute of scenes
+    if not TYPE_CHECKING:
+
+        def __getattr__(self, name: str) -> Any:
+            # Only reached by fields of views not read yet, see `_scene_view`
+            try:
+                feature, quicklook = vars(self)["_feature"]
+                resolve = _SCENE_FIELDS[name]
+            except KeyError:
+                raise AttributeError(name) from None
+            value = (
+                quicklook(feature["properties"]["id"])
+                if resolve is None
+                else resolve(feature)
+            )
+            setattr(self, name, value)
+            return value
+
+
+_SCENE_FIELDS: dict[str, Callable[[dict], Any] | None] = {
+    "bbox": lambda feature: feature.get("bbox"),
+    "geometry": lambda feature: feature["geometry"],
+    "id": lambda feature: feature["properties"]["id"],
+    "datetime": lambda feature: feature["properties"].get("datetime"),
+    "start_datetime": lambda feature: feature["properties"].get(
+        "start_datetime"
+    ),
+    "end_datetime": lambda feature: feature["properties"].get("end_datetime"),
+    "constellation": lambda feature: feature["properties"]["constellation"],
+    "collection": lambda feature: feature["properties"]["collection"],
+    "cloud_coverage": lambda feature: feature["properties"].get(
+        "cloudCoverage"
+    ),
+    "resolution": lambda feature: feature["properties"].get("resolution"),
+    "delivery_time": lambda feature: feature["properties"].get("deliveryTime"),
+    "producer": lambda feature: feature["properties"]["producer"],
+    "quicklook": None,  # built from the scene id
+    "provider_properties": lambda feature: feature["properties"][
+        "providerProperties"
+    ],
+}
+
+
+def _scene_view(
+    feature: geojson.Feature, quicklook: Callable[[str], utils.ImageFile]
+) -> Scene:
+    """
+    Returns a scene referencing a search feature without copying it, its
+    fields are resolved on first access.
+    """
+    scene = object.__new__(Scene)
+    vars(scene)["_feature"] = feature, quicklook
+    return scene
+
 
 class InvalidHost(ValueError):
     pass
@@ -87,17 +146,15 @@ class Provider:
     def is_host(self):
         return "HOST" in self.roles
 
-    def search(
-        self,
-        bbox: BoundingBox | None = None,
-        intersects: geojson.Polygon | None = None,
-        query: dict | None = None,
-        collections: list[str] | None = None,
-        start_date: str | None = None,
-        end_date: str | None = None,
-    ) -> Iterator[Scene]:
-        if not self.is_host:
-            raise InvalidHost("Provider does not host collections")
+    @staticmethod
+    def _payload(
+        bbox: BoundingBox | None,
+        intersects: geojson.Polygon | None,
+        query: dict | None,
+        collections: list[str] | None,
+        start_date: str | None,
+        end_date: str | None,
+    ) -> dict:
         datetime_str = None
         if start_date or end_date:
             start_datetime = (
@@ -110,7 +167,7 @@ class Provider:
             )
             datetime_str = f"{start_datetime}/{end_datetime}"
 
-        payload = {
+        return {
             key: value
             for key, value in {
                 "bbox": bbox,
@@ -122,59 +179,412 @@ class Provider:
             if value
         }
 
-        def get_pages():
-            url = host.endpoint(f"/catalog/hosts/{self.name}/stac/search")
-            while url:
-                try:
-                    page: dict = self.session.post(url, json=payload).json()
-                    yield page["features"]
-                    url = next(
-                        (
-                            link["href"]
-                            for link in page["links"]
-                            if link["rel"] == "next"
-                        ),
-                        None,
-                    )
-                except requests.HTTPError as http_error:
-                    if http_error.response.status_code == 422:
-                        error = http_error.response.json()["error"]
-                        raise InvalidSearchRequest(
-                            error["message"]
-                        ) from http_error
-                    raise http_error
-
-        for page in get_pages():
-            for feature in page:
-                yield self._as_scene(feature)
+    def _pages(self, payload: dict) -> Iterator[list[geojson.Feature]]:
+        url = host.endpoint(f"/catalog/hosts/{self.name}/stac/search")
+        while url:
+            try:
+                page: dict = self.session.post(url, json=payload).json()
+                yield page["features"]
+                url = next(
+                    (
+                        link["href"]
+                        for link in page["links"]
+                        if link["rel"] == "next"
+                    ),
+                    None,
+                )
+            except requests.HTTPError as http_error:
+                if http_error.response.status_code == 422:
+                    error = http_error.response.json()["error"]
+                    raise InvalidSearchRequest(
+                        error["message"]
+                    ) from http_error
+                raise http_error
+
+    def search(
+        self,
+        bbox: BoundingBox | None = None,
+        intersects: geojson.Polygon | None = None,
+        query: dict | None = None,
+        collections: list[str] | None = None,
+        start_date: str | None = None,
+        end_date: str | None = None,
+        cache: search_cache.SearchCache | None = None,
+    ) -> Iterator[Scene]:
+        """
+        Searches the scenes of the host.
+
+        Args:
+            cache: Cache replaying the pages of identical recent searches
+                instead of requesting them again.
+        """
+        for feature in self._features(
+            bbox, intersects, query, collections, start_date, end_date, cache
+        ):
+            yield self._as_scene(feature)
+
+    def search_table(
+        self,
+        bbox: BoundingBox | None = None,
+        intersects: geojson.Polygon | None = None,
+        query: dict | None = None,
+        collections: list[str] | None = None,
+        start_date: str | None = None,
+        end_date: str | None = None,
+        cache: search_cache.SearchCache | None = None,
+    ) -> scene_table.SceneTable[Scene]:
+        """
+        Searches the scenes of the host into a columnar table for
+        vectorized filtering, sorting and grouping, creating scenes only
+        for the rows read. Requires the `numpy` extra.
+        """
+        return scene_table.SceneTable(
+            list(
+                self._features(
+                    bbox,
+                    intersects,
+                    query,
+                    collections,
+                    start_date,
+                    end_date,
+                    cache,
+                )
+            ),
+            self._as_scene,
+        )
+
+    def _features(
+        self,
+        bbox: BoundingBox | None,
+        intersects: geojson.Polygon | None,
+        query: dict | None,
+        collections: list[str] | None,
+        start_date: str | None,
+        end_date: str | None,
+        cache: search_cache.SearchCache | None,
+    ) -> Iterator[geojson.Feature]:
+        if not self.is_host:
+            raise InvalidHost("Provider does not host collections")
+        payload = self._payload(
+            bbox, intersects, query, collections, start_date, end_date
+        )
+        pages: Iterable[list[geojson.Feature]] | None = None
+        if cache:
+            pages = cache.get(self.name, payload)
+            if pages is None:
+                pages = self._caching(self._pages(payload), cache, payload)
+        if pages is None:
+            pages = self._pages(payload)
+        for page in pages:
+            yield from page
+
+    def _caching(
+        self,
+        pages: Iterator[list[geojson.Feature]],
+        cache: search_cache.SearchCache,
+        payload: dict,
+    ) -> Iterator[list[geojson.Feature]]:
+        """Stores the pages in a cache once all of them are consumed."""
+        consumed = []
+        for page in pages:
+            consumed.append(page)
+            yield page
+        cache.put(self.name, payload, consumed)
+
+    def search_tiled(
+        self,
+        intersects: geojson.Polygon | geojson.MultiPolygon,
+        tile_size: float = 1.0,
+        query: dict | None = None,
+        collections: list[str] | None = None,
+        start_date: str | None = None,
+        end_date: str | None = None,
+        max_workers: int = 8,
+    ) -> Iterator[Scene]:
+        """
+        Searches a large area of interest in tiles, keeping request bodies
+        small and searching the tiles concurrently. Scenes crossing tile
+        borders are returned once, scenes of tiles only partially covered
+        by the area of interest are returned only if they intersect it.
+
+        Args:
+            intersects: The area of interest.
+            tile_size: The tile edge length in degrees.
+            query: See `search`.
+            collections: See `search`.
+            start_date: See `search`.
+            end_date: See `search`.
+            max_workers: Maximum number of tiles searched at once.
+        """
+        if not self.is_host:
+            raise InvalidHost("Provider does not host collections")
+        if tile_size <= 0:
+            raise ValueError("Tile size must be positive")
+        tiles = [
+            list(tile)
+            for tile in geometry.grid(geometry.bounds(intersects), tile_size)
+            if geometry.intersects(geometry.box(tile), intersects)
+        ]
+
+        def search_tile(tile: BoundingBox) -> list[geojson.Feature]:
+            payload = self._payload(
+                tile, None, query, collections, start_date, end_date
+            )
+            return [
+                feature for page in self._pages(payload) for feature in page
+            ]
+
+        seen = set()
+        executor = futures.ThreadPoolExecutor(max_workers)
+        try:
+            for features in executor.map(search_tile, tiles):
+                for feature in features:
+                    scene_id = feature["properties"]["id"]
+                    if scene_id not in seen and geometry.intersects(
+                        feature["geometry"], intersects
+                    ):
+                        seen.add(scene_id)
+                        yield self._as_scene(feature)
+        finally:
+            executor.shutdown(wait=False, cancel_futures=True)
+
+    def search_batch(
+        self,
+        areas: Mapping[str, geojson.Polygon | geojson.MultiPolygon],
+        group_size: float = 1.0,
+        query: dict | None = None,
+        collections: list[str] | None = None,
+        start_date: str | None = None,
+        end_date: str | None = None,
+        max_workers: int = 8,
+    ) -> dict[str, list[Scene]]:
+        """
+        Searches many small areas of interest, e.g. monitored sites, with
+        few requests. Areas are grouped in a grid, each group is searched
+        once by the bounds of its areas and the scenes are assigned to the
+        areas they intersect with a spatial index.
+
+        Args:
+            areas: The areas of interest by key.
+            group_size: The edge length of the grid cells grouping areas
+                in degrees, the bounds of a group extend by at most the
+                size of its areas.
+            query: See `search`.
+            collections: See `search`.
+            start_date: See `search`.
+            end_date: See `search`.
+            max_workers: Maximum number of groups searched at once.
+
+        Returns:
+            The scenes intersecting each area, by area key.
+        """
+        if not self.is_host:
+            raise InvalidHost("Provider does not host collections")
+        if group_size <= 0:
+            raise ValueError("Group size must be positive")
+        area_bounds = {
+            key: geometry.bounds(area) for key, area in areas.items()
+        }
+        groups: dict[tuple[int, int], list[geometry.Bounds]] = {}
+        for west, south, east, north in area_bounds.values():
+            cell = (
+                math.floor((west + east) / 2 / group_size),
+                math.floor((south + north) / 2 / group_size),
+            )
+            groups.setdefault(cell, []).append((west, south, east, north))
+        index = geometry.STRTree(
+            (bounds, key) for key, bounds in area_bounds.items()
+        )
+
+        def search_group(
+            group: list[geometry.Bounds],
+        ) -> list[geojson.Feature]:
+            payload = self._payload(
+                list(geometry.union(group)),
+                None,
+                query,
+                collections,
+                start_date,
+                end_date,
+            )
+            return [
+                feature for page in self._pages(payload) for feature in page
+            ]
+
+        results: dict[str, list[Scene]] = {key: [] for key in areas}
+        seen = set()
+        with futures.ThreadPoolExecutor(max_workers) as executor:
+            for features in executor.map(search_group, groups.values()):
+                for feature in features:
+                    scene_id = feature["properties"]["id"]
+                    if scene_id in seen:
+                        continue
+                    seen.add(scene_id)
+                    footprint = feature["geometry"]
+                    scene = None
+                    for key in index.query(geometry.bounds(footprint)):
+                        if geometry.intersects(footprint, areas[key]):
+                            scene = scene or self._as_scene(feature)
+                            results[key].append(scene)
+        return results
 
     def _as_scene(self, feature: geojson.Feature) -> Scene:
-        properties = feature["properties"]
-        scene_id = properties["id"]
-        return Scene(
-            bbox=feature.get("bbox"),
-            geometry=feature["geometry"],
-            id=scene_id,
-            constellation=properties["constellation"],
-            collection=properties["collection"],
-            producer=properties["producer"],
-            datetime=properties.get("datetime"),
-            start_datetime=properties.get("start_datetime"),
-            end_datetime=properties.get("end_datetime"),
-            cloud_coverage=properties.get("cloudCoverage"),
-            resolution=properties.get("resolution"),
-            delivery_time=properties.get("deliveryTime"),
-            quicklook=utils.ImageFile(
-                url=host.endpoint(
-                    f"/catalog/{self.name}/image/{scene_id}/quicklook"
-                ),
-                file_name=f"quicklook_{scene_id}.jpg",
-                session=self.session,
+        return _scene_view(feature, self._quicklook)
+
+    def _quicklook(self, scene_id: str) -> utils.ImageFile:
+        return utils.ImageFile(
+            url=host.endpoint(
+                f"/catalog/{self.name}/image/{scene_id}/quicklook"
             ),
-            provider_properties=properties["providerProperties"],
+            file_name=f"quicklook_{scene_id}.jpg",
+            session=self.session,
         )
 
 
+@dataclasses.dataclass
+class HostSearch:
+    """Outcome of searching a single host."""
+
+    host: str
+    scenes: int = 0
+    duration: float | None = None  # seconds, None while searching
+    error: Exception | None = None
+
+
+class MultiHostSearch:
+    """
+    Searches several hosts concurrently and merges their scenes into a
+    single iterator, dropping scenes already found on another host.
+    A failing host does not stop the search, its error is reported in
+    `failed` once all scenes are consumed.
+    """
+
+    def __init__(
+        self,
+        providers: Sequence[Provider],
+        max_workers: int = 8,
+        slow_after: float = 10.0,
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        """
+        Args:
+            providers: The hosts to search, e.g. `ProductGlossary.get_hosts()`.
+            max_workers: Maximum number of hosts searched at once.
+            slow_after: Seconds after which a host search counts as slow.
+            clock: Monotonic clock in seconds.
+        """
+        self.providers = list(providers)
+        self.max_workers = max_workers
+        self.slow_after = slow_after
+        self._clock = clock
+        self.reports: dict[str, HostSearch] = {}
+
+    @property
+    def failed(self) -> dict[str, Exception]:
+        """The errors of hosts whose search failed, by host name."""
+        return {
+            name: report.error
+            for name, report in self.reports.items()
+            if report.error
+        }
+
+    @property
+    def slow(self) -> list[str]:
+        """The names of hosts whose search took longer than `slow_after`."""
+        return [
+            name
+            for name, report in self.reports.items()
+            if report.duration is not None
+            and report.duration > self.slow_after
+        ]
+
+    def _search_host(
+        self,
+        provider: Provider,
+        search: Callable[[Provider], Iterator[Scene]],
+        found: queue.Queue,
+        stopped: threading.Event,
+    ) -> None:
+        report = self.reports[provider.name]
+        started_at = self._clock()
+        try:
+            for scene in search(provider):
+                if stopped.is_set():
+                    break
+                report.scenes += 1
+                found.put(scene)
+        except Exception as error:  # pylint: disable=broad-exception-caught
+            report.error = error
+        finally:
+            report.duration = self._clock() - started_at
+            found.put(None)
+
+    def _merge(
+        self, search: Callable[[Provider], Iterator[Scene]]
+    ) -> Iterator[Scene]:
+        self.reports = {
+            provider.name: HostSearch(provider.name)
+            for provider in self.providers
+        }
+        hosts = {provider.name: provider for provider in self.providers}
+        if not hosts:
+            return
+        found: queue.Queue[Scene | None] = queue.Queue()
+        stopped = threading.Event()
+        executor = futures.ThreadPoolExecutor(
+            min(self.max_workers, len(hosts))
+        )
+        seen = set()
+        try:
+            for provider in hosts.values():
+                executor.submit(
+                    self._search_host, provider, search, found, stopped
+                )
+            searching = len(hosts)
+            while searching:
+                scene = found.get()
+                if scene is None:
+                    searching -= 1
+                elif scene.id not in seen:
+                    seen.add(scene.id)
+                    yield scene
+        finally:
+            stopped.set()
+            executor.shutdown(wait=False, cancel_futures=True)
+
+    def search(
+        self,
+        bbox: BoundingBox | None = None,
+        intersects: geojson.Polygon | None = None,
+        query: dict | None = None,
+        collections: list[str] | None = None,
+        start_date: str | None = None,
+        end_date: str | None = None,
+        order_by_datetime: Literal["ascending", "descending"] | None = None,
+    ) -> Iterator[Scene]:
+        """
+        Searches all hosts with the parameters of `Provider.search`.
+
+        Args:
+            order_by_datetime: Waits for all hosts and sorts the scenes by
+                their (start) datetime, by default scenes are yielded as
+                soon as any host returns them.
+        """
+        scenes = self._merge(
+            lambda provider: provider.search(
+                bbox, intersects, query, collections, start_date, end_date
+            )
+        )
+        if order_by_datetime:
+            yield from sorted(
+                scenes,
+                key=lambda scene: scene.datetime or scene.start_datetime or "",
+                reverse=order_by_datetime == "descending",
+            )
+        else:
+            yield from scenes
+
+
 @dataclasses.dataclass
 class DataProduct:
     session = base.Session()
@@ -273,3 +683,16 @@ class ProductGlossary:
                             ),
                         ),
                     )
+
+    @classmethod
+    def get_hosts(
+        cls, collection_type: CollectionType | None = None
+    ) -> list[Provider]:
+        """Returns the hosts of all collections, each one once."""
+        hosts = {
+            provider.name: provider
+            for collection in cls.get_collections(collection_type)
+            for provider in collection.providers
+            if provider.is_host
+        }
+        return list(hosts.values())
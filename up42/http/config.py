@@ -8,6 +8,16 @@ class ResilienceSettings:
     statuses: tuple = tuple(range(500, 600))
 
 
+@dc.dataclass(eq=True, frozen=True)
+class DownloadSettings:
+    pool_size: int = 32
+    total: int = 5
+    backoff_factor: float = 0.5
+    statuses: tuple = (408, 429, 500, 502, 503, 504)
+    connect_timeout: float = 10
+    read_timeout: float = 120
+
+
 @dc.dataclass(eq=True, frozen=True)
 class TokenProviderSettings:
     token_url: str
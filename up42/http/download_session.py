@@ -0,0 +1,49 @@
+import threading
+
+import requests
+
+from up42.http import config, http_adapter
+
+SCHEMAS = ["http", "https"]
+
+_lock = threading.Lock()
+_shared: requests.Session | None = None
+
+
+class DownloadSession(requests.Session):
+    """Session applying a default timeout to requests without one."""
+
+    def __init__(self, timeout: tuple[float, float]):
+        super().__init__()
+        self.timeout = timeout
+
+    def request(self, *args, **kwargs) -> requests.Response:
+        kwargs.setdefault("timeout", self.timeout)
+        return super().request(*args, **kwargs)
+
+
+def create(
+    settings: config.DownloadSettings = config.DownloadSettings(),
+) -> DownloadSession:
+    """
+    Creates a session for downloads from storage providers, with a
+    connection pool sized for concurrent downloads, retries of transient
+    storage errors and keep-alive connections. Signed urls carry their own
+    authorization, so the session has none.
+    """
+    session = DownloadSession(
+        (settings.connect_timeout, settings.read_timeout)
+    )
+    adapter = http_adapter.create_download(settings)
+    for schema in SCHEMAS:
+        session.mount(schema + "://", adapter)
+    return session
+
+
+def shared() -> requests.Session:
+    """Returns the download session shared by all threads, created on first use."""
+    global _shared  # pylint: disable=global-statement
+    with _lock:
+        if _shared is None:
+            _shared = create()
+        return _shared
@@ -24,3 +24,21 @@ def create(
         allowed_methods=allowed_methods,
     )
     return adapters.HTTPAdapter(max_retries=retries)
+
+
+def create_download(
+    settings: config.DownloadSettings = config.DownloadSettings(),
+) -> adapters.HTTPAdapter:
+    # Exhausted retries return the last response, so that callers see the
+    # HTTP error of the storage rather than a retry error
+    retries = util.Retry(
+        total=settings.total,
+        backoff_factor=settings.backoff_factor,
+        status_forcelist=settings.statuses,
+        raise_on_status=False,
+    )
+    return adapters.HTTPAdapter(
+        pool_connections=settings.pool_size,
+        pool_maxsize=settings.pool_size,
+        max_retries=retries,
+    )
@@ -0,0 +1,144 @@
+import datetime as dt
+import pathlib
+import sqlite3
+from collections.abc import Callable, Iterator
+
+import geojson  # type: ignore
+
+from up42 import glossary
+
+OVERLAP = dt.timedelta(days=1)
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS watermarks (
+    aoi TEXT PRIMARY KEY,
+    watermark TEXT NOT NULL
+) WITHOUT ROWID;
+CREATE TABLE IF NOT EXISTS seen (
+    aoi TEXT NOT NULL,
+    scene_id TEXT NOT NULL,
+    acquired TEXT,
+    PRIMARY KEY (aoi, scene_id)
+) WITHOUT ROWID;
+"""
+
+
+def _utc_now() -> dt.datetime:
+    return dt.datetime.now(dt.timezone.utc).replace(tzinfo=None)
+
+
+def _iso(moment: dt.datetime) -> str:
+    return moment.strftime("%Y-%m-%dT%H:%M:%S")
+
+
+class Monitor:
+    """
+    Watches areas of interest for new scenes of a host. Each poll searches
+    only the time since the previous poll of the area, extended by an
+    overlap for scenes ingested late, and yields only scenes not yielded
+    before. Watermarks and seen scene ids are kept in a SQLite file.
+    """
+
+    def __init__(
+        self,
+        provider: glossary.Provider,
+        path: str | pathlib.Path,
+        overlap: dt.timedelta = OVERLAP,
+        clock: Callable[[], dt.datetime] = _utc_now,
+    ):
+        """
+        Args:
+            provider: The host to search.
+            path: The SQLite file storing the state, created if missing.
+            overlap: How far each search reaches back before the previous
+                poll, to catch scenes published after their acquisition.
+            clock: Current naive UTC time.
+        """
+        self.provider = provider
+        self.overlap = overlap
+        self._clock = clock
+        self._connection = sqlite3.connect(path)
+        with self._connection:
+            self._connection.executescript(_SCHEMA)
+
+    def close(self) -> None:
+        self._connection.close()
+
+    def __enter__(self) -> "Monitor":
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback) -> None:
+        self.close()
+
+    def watermark(self, aoi: str) -> dt.datetime | None:
+        """Returns the time of the last completed poll of an area."""
+        row = self._connection.execute(
+            "SELECT watermark FROM watermarks WHERE aoi = ?", (aoi,)
+        ).fetchone()
+        return row and dt.datetime.fromisoformat(row[0])
+
+    def reset(self, aoi: str) -> None:
+        """Forgets the watermark and seen scenes of an area."""
+        with self._connection:
+            self._connection.execute(
+                "DELETE FROM watermarks WHERE aoi = ?", (aoi,)
+            )
+            self._connection.execute("DELETE FROM seen WHERE aoi = ?", (aoi,))
+
+    def _is_new(self, aoi: str, scene: glossary.Scene) -> bool:
+        # Scenes acquired over an interval match searches until its end
+        acquired = scene.end_datetime or scene.datetime or scene.start_datetime
+        inserted = self._connection.execute(
+            "INSERT OR IGNORE INTO seen VALUES (?, ?, ?)",
+            (aoi, scene.id, acquired),
+        )
+        return inserted.rowcount > 0
+
+    def _complete(self, aoi: str, polled_at: dt.datetime) -> None:
+        with self._connection:
+            self._connection.execute(
+                "INSERT OR REPLACE INTO watermarks VALUES (?, ?)",
+                (aoi, polled_at.isoformat()),
+            )
+            # Scenes acquired before the next search window cannot recur
+            self._connection.execute(
+                "DELETE FROM seen WHERE aoi = ? AND acquired < ?",
+                (aoi, _iso(polled_at - self.overlap)),
+            )
+
+    def poll(
+        self,
+        aoi: str,
+        bbox: glossary.BoundingBox | None = None,
+        intersects: geojson.Polygon | None = None,
+        query: dict | None = None,
+        collections: list[str] | None = None,
+        start_date: str | None = None,
+    ) -> Iterator[glossary.Scene]:
+        """
+        Yields the scenes of an area not yielded by previous polls. The
+        watermark advances once all scenes are consumed.
+
+        Args:
+            aoi: Identifier of the area of interest in the state file.
+            bbox: See `Provider.search`.
+            intersects: See `Provider.search`.
+            query: See `Provider.search`.
+            collections: See `Provider.search`.
+            start_date: Start of the first search of the area, by default
+                it covers all past scenes.
+        """
+        polled_at = self._clock()
+        watermark = self.watermark(aoi)
+        if watermark:
+            start_date = _iso(watermark - self.overlap)
+        try:
+            for scene in self.provider.search(
+                bbox, intersects, query, collections, start_date
+            ):
+                if self._is_new(aoi, scene):
+                    yield scene
+        finally:
+            # Scenes already yielded stay seen even if the poll stops early
+            self._connection.commit()
+        self._complete(aoi, polled_at)
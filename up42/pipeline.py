@@ -0,0 +1,107 @@
+import threading
+from collections.abc import Callable
+from concurrent import futures
+from typing import Generic, TypeVar
+
+Item = TypeVar("Item")
+Result = TypeVar("Result")
+
+
+class Pipeline(Generic[Item, Result]):
+    """
+    Hands downloaded files to a callback running in a thread or process
+    pool as soon as each one completes, overlapping post-processing with
+    the remaining downloads. At most `max_pending` files are queued or
+    processed at once, further submissions block and so slow down the
+    downloads.
+
+    Use `submit` as the `on_file` callback of a download, e.g.
+
+    ```python
+    with Pipeline(convert, futures.ProcessPoolExecutor()) as pipeline:
+        utils.download_archive(url, output_directory, on_file=pipeline.submit)
+    results = pipeline.results
+    ```
+    """
+
+    def __init__(
+        self,
+        callback: Callable[[Item], Result],
+        executor: futures.Executor | None = None,
+        max_pending: int = 8,
+    ):
+        """
+        Args:
+            callback: Processes a single file, must be picklable for process
+                pools.
+            executor: Pool running the callback, by default a thread pool
+                owned by the pipeline.
+            max_pending: Maximum number of files queued or processed at once.
+        """
+        self._callback = callback
+        self._owns_executor = executor is None
+        self._executor = executor or futures.ThreadPoolExecutor()
+        self._slots = threading.BoundedSemaphore(max_pending)
+        self._lock = threading.Lock()
+        self._futures: list[futures.Future[Result]] = []
+        self._error: BaseException | None = None
+        self.results: list[Result] = []
+
+    def _raise_error(self) -> None:
+        if self._error:
+            raise self._error
+
+    def _done(self, future: futures.Future[Result]) -> None:
+        self._slots.release()
+        if not future.cancelled() and (error := future.exception()):
+            with self._lock:
+                self._error = self._error or error
+
+    def submit(self, item: Item) -> None:
+        """
+        Queues a file for processing, waiting while the queue is full.
+
+        Raises:
+            The error of a failed callback, to stop the download.
+        """
+        self._raise_error()
+        self._slots.acquire()
+        try:
+            future = self._executor.submit(self._callback, item)
+        except BaseException:
+            self._slots.release()
+            raise
+        with self._lock:
+            self._futures.append(future)
+        future.add_done_callback(self._done)
+
+    def close(self) -> list[Result]:
+        """
+        Waits until all queued files are processed.
+
+        Returns:
+            The callback results in submission order.
+
+        Raises:
+            The error of the first failed callback.
+        """
+        try:
+            futures.wait(self._futures)
+        finally:
+            if self._owns_executor:
+                self._executor.shutdown()
+        self._raise_error()
+        self.results = [future.result() for future in self._futures]
+        return self.results
+
+    def __enter__(self) -> "Pipeline[Item, Result]":
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback) -> None:
+        if exc_type:
+            for future in self._futures:
+                future.cancel()
+            if self._owns_executor:
+                self._executor.shutdown()
+        else:
+            self.close()
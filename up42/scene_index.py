@@ -0,0 +1,88 @@
+from collections.abc import Iterable, Sequence
+from typing import Any, Generic, Literal, Protocol, TypeVar
+
+from up42 import geometry
+
+Predicate = Literal["intersects", "contains"]
+
+
+class Footprinted(Protocol):
+    """Anything with a GeoJSON footprint, e.g. a `Scene` or `pystac.Item`."""
+
+    @property
+    def geometry(self) -> Any:
+        ...
+
+
+Item = TypeVar("Item", bound=Footprinted)
+
+
+class SceneIndex(Generic[Item]):
+    """
+    Spatial index over the footprints of scenes or STAC items, e.g.
+    `SceneIndex(provider.search(bbox)).intersects(aoi)`. Candidates are
+    found by their bounds in an R-tree and refined with the exact
+    footprints. Queries take GeoJSON Point or (Multi)Polygon geometries,
+    results keep the order of the indexed items. Items without a
+    footprint are not indexed.
+    """
+
+    def __init__(self, items: Iterable[Item], node_capacity: int = 16):
+        """
+        Args:
+            items: Scenes, STAC items or anything with a `geometry`.
+            node_capacity: Maximum number of children of an R-tree node.
+        """
+        self.items = [item for item in items if item.geometry]
+        self._footprints = [dict(item.geometry) for item in self.items]
+        self._tree: geometry.STRTree[int] = geometry.STRTree(
+            (
+                (geometry.bounds(footprint), index)
+                for index, footprint in enumerate(self._footprints)
+            ),
+            node_capacity,
+        )
+
+    def __len__(self) -> int:
+        return len(self.items)
+
+    def _query(self, area: dict, predicate: Predicate) -> list[Item]:
+        refine = {
+            "intersects": lambda footprint: geometry.intersects(
+                footprint, area
+            ),
+            "contains": lambda footprint: geometry.contains(footprint, area),
+        }.get(predicate)
+        if refine is None:
+            raise ValueError(f"Unsupported predicate {predicate}")
+        return [
+            self.items[index]
+            for index in sorted(self._tree.query(geometry.bounds(area)))
+            if refine(self._footprints[index])
+        ]
+
+    def intersects(self, area: dict) -> list[Item]:
+        """Returns the items whose footprint shares a point with an area."""
+        return self._query(area, "intersects")
+
+    def contains(self, area: dict) -> list[Item]:
+        """Returns the items whose footprint covers an area or a point."""
+        return self._query(area, "contains")
+
+    def nearest(self, area: dict, count: int = 1) -> list[Item]:
+        """
+        Returns the items whose footprint is nearest to an area, nearest
+        first, by planar distance in the coordinates of the footprints.
+        """
+        indices = self._tree.nearest(
+            geometry.bounds(area),
+            count,
+            lambda index: geometry.distance(self._footprints[index], area),
+        )
+        return [self.items[index] for index in indices]
+
+    def bulk(
+        self, areas: Sequence[dict], predicate: Predicate = "intersects"
+    ) -> list[list[Item]]:
+        """Returns the items matching each of many areas, in their order."""
+        return [self._query(area, predicate) for area in areas]
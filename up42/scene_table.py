@@ -0,0 +1,202 @@
+import copy
+import datetime as dt
+from collections.abc import Callable, Iterator, Sequence
+from typing import Any, Generic, TypeVar
+
+from up42 import geometry, utils
+
+Row = TypeVar("Row")
+Array = Any  # numpy.ndarray, numpy is an optional dependency
+
+COLUMNS = (
+    "id",
+    "collection",
+    "datetime",
+    "cloud_coverage",
+    "resolution",
+    "delivery_time",
+    "bbox",
+)
+
+
+def _numpy():
+    try:
+        import numpy  # pylint: disable=import-outside-toplevel
+    except ImportError as error:
+        raise ImportError(
+            "SceneTable requires numpy, install up42-py[numpy]"
+        ) from error
+    return numpy
+
+
+def _datetime(properties: dict) -> dt.datetime | None:
+    value = properties.get("datetime") or properties.get("start_datetime")
+    if not value:
+        return None
+    moment = utils.parse_datetime(value)
+    if moment.tzinfo:
+        moment = moment.astimezone(dt.timezone.utc).replace(tzinfo=None)
+    return moment
+
+
+def _bbox(feature: dict) -> Sequence[float]:
+    if bbox := feature.get("bbox"):
+        return bbox[:4]
+    if feature.get("geometry"):
+        return geometry.bounds(feature["geometry"])
+    return [float("nan")] * 4
+
+
+class SceneTable(Generic[Row]):
+    """
+    Columnar search results backed by numpy arrays, for filtering and
+    sorting many scenes without a Python loop, e.g.
+    `table[(table.cloud_coverage < 20) & table.in_period(start, end)]`.
+    Scenes are only created for the rows read. Requires the `numpy`
+    extra, `pip install up42-py[numpy]`.
+
+    Attributes:
+        id: Scene ids.
+        collection: Collection names.
+        datetime: Acquisition (start) times as `datetime64[ms]` in UTC,
+            NaT if missing.
+        cloud_coverage: Cloud coverage in percent, NaN if missing.
+        resolution: Resolution in meters, NaN if missing.
+        delivery_time: Delivery times, empty if missing.
+        bbox: Bounds `(west, south, east, north)` of each scene, shape
+            `(n, 4)`.
+    """
+
+    def __init__(
+        self, features: Sequence[dict], to_scene: Callable[[dict], Row]
+    ):
+        """
+        Args:
+            features: The STAC features of a search.
+            to_scene: Creates the scene of a feature.
+        """
+        numpy = _numpy()
+        self._features = list(features)
+        self._to_scene = to_scene
+        self._rows = numpy.arange(len(self._features))
+        properties = [feature["properties"] for feature in self._features]
+        self.id = numpy.array([row["id"] for row in properties], dtype=str)
+        self.collection = numpy.array(
+            [row.get("collection") or "" for row in properties], dtype=str
+        )
+        self.datetime = numpy.array(
+            [_datetime(row) for row in properties], dtype="datetime64[ms]"
+        )
+        self.cloud_coverage = numpy.array(
+            [row.get("cloudCoverage") for row in properties], dtype=float
+        )
+        self.resolution = numpy.array(
+            [row.get("resolution") for row in properties], dtype=float
+        )
+        self.delivery_time = numpy.array(
+            [row.get("deliveryTime") or "" for row in properties], dtype=str
+        )
+        self.bbox = numpy.array(
+            [_bbox(feature) for feature in self._features], dtype=float
+        ).reshape(-1, 4)
+
+    def _select(self, rows: Array) -> "SceneTable[Row]":
+        """Returns a table of some rows, sharing the features."""
+        table = copy.copy(self)
+        vars(table).update(
+            _rows=self._rows[rows],
+            **{column: getattr(self, column)[rows] for column in COLUMNS},
+        )
+        return table
+
+    def __len__(self) -> int:
+        return len(self._rows)
+
+    def __getitem__(self, rows: Array) -> "SceneTable[Row]":
+        """Selects rows by a boolean mask, indices or a slice."""
+        return self._select(rows)
+
+    def scene(self, index: int) -> Row:
+        """Creates the scene of a row."""
+        return self._to_scene(self._features[self._rows[index]])
+
+    def __iter__(self) -> Iterator[Row]:
+        for row in self._rows:
+            yield self._to_scene(self._features[row])
+
+    def in_period(
+        self,
+        start: str | dt.datetime | None = None,
+        end: str | dt.datetime | None = None,
+    ) -> Array:
+        """
+        Returns the mask of scenes acquired within a period, both ends
+        included. Naive times are UTC.
+        """
+        numpy = _numpy()
+        mask = ~numpy.isnat(self.datetime)
+        for bound, compare in [
+            (start, numpy.greater_equal),
+            (end, numpy.less_equal),
+        ]:
+            if bound is not None:
+                moment = _datetime({"datetime": str(bound)})
+                mask &= compare(self.datetime, numpy.datetime64(moment, "ms"))
+        return mask
+
+    def intersects_bbox(self, bbox: Sequence[float]) -> Array:
+        """Returns the mask of scenes whose bounds overlap a bbox."""
+        west, south, east, north = bbox
+        return (
+            (self.bbox[:, 0] <= east)
+            & (self.bbox[:, 2] >= west)
+            & (self.bbox[:, 1] <= north)
+            & (self.bbox[:, 3] >= south)
+        )
+
+    def sort(
+        self, *columns: str, descending: bool | Sequence[bool] = False
+    ) -> "SceneTable[Row]":
+        """
+        Sorts the rows by one or more columns, the first column being the
+        primary key. Missing values come last.
+
+        Args:
+            columns: Names of the columns to sort by, except `bbox`.
+            descending: Whether to sort all or each column descending.
+        """
+        numpy = _numpy()
+        if isinstance(descending, bool):
+            descending = [descending] * len(columns)
+        if len(descending) != len(columns):
+            raise ValueError("Provide one sort direction per column")
+        keys = []
+        for column, reverse in zip(columns, descending):
+            if column not in COLUMNS or column == "bbox":
+                raise ValueError(f"Cannot sort by {column}")
+            values = getattr(self, column)
+            # Ranks of unique values, with missing values ranked last
+            _, ranks = numpy.unique(values, return_inverse=True)
+            missing = (
+                numpy.isnat(values)
+                if values.dtype.kind == "M"
+                else numpy.isnan(values)
+                if values.dtype.kind == "f"
+                else numpy.zeros(len(values), dtype=bool)
+            )
+            keys.extend([missing, -ranks if reverse else ranks])
+        # lexsort sorts by the last key first
+        return self._select(numpy.lexsort(keys[::-1]))
+
+    def group_by(
+        self, column: str = "collection"
+    ) -> dict[Any, "SceneTable[Row]"]:
+        """Splits the rows by the values of a column, e.g. collections."""
+        numpy = _numpy()
+        if column not in COLUMNS or column == "bbox":
+            raise ValueError(f"Cannot group by {column}")
+        values = getattr(self, column)
+        return {
+            value.item(): self._select(numpy.flatnonzero(values == value))
+            for value in numpy.unique(values)
+        }
@@ -0,0 +1,364 @@
+import collections
+import dataclasses
+import datetime as dt
+import hashlib
+import json
+import operator
+import os
+import pathlib
+import tempfile
+import threading
+import time
+from collections.abc import Callable, Iterator
+from typing import Any, Protocol, TypeVar
+
+from up42 import geometry, utils
+
+Page = list[dict]  # the features of a search page
+SUMMARY_SUFFIX = ".summary.json"
+Interval = tuple[dt.datetime | None, dt.datetime | None]
+
+QUERY_OPERATORS: dict[str, Callable[[Any, Any], bool]] = {
+    "eq": operator.eq,
+    "neq": operator.ne,
+    "lt": operator.lt,
+    "lte": operator.le,
+    "gt": operator.gt,
+    "gte": operator.ge,
+    "in": lambda value, options: value in options,
+    "startsWith": lambda value, prefix: str(value).startswith(prefix),
+    "endsWith": lambda value, suffix: str(value).endswith(suffix),
+    "contains": lambda value, part: part in str(value),
+}
+# Whether a predicate of a new query implies the one of a cached query
+_IMPLICATIONS: dict[str, Callable[[Any, Any], bool]] = {
+    "lt": operator.le,
+    "lte": operator.le,
+    "gt": operator.ge,
+    "gte": operator.ge,
+    "in": lambda new, cached: set(new) <= set(cached),
+}
+
+
+@dataclasses.dataclass(frozen=True)
+class Summary:
+    """What a cached search covers, without its pages."""
+
+    host: str
+    payload: dict
+    created_at: float  # seconds since the epoch
+
+
+@dataclasses.dataclass(frozen=True)
+class Entry:
+    """The pages of a completed search of a host."""
+
+    host: str
+    payload: dict
+    pages: list[Page]
+    created_at: float  # seconds since the epoch
+
+    @property
+    def summary(self) -> Summary:
+        return Summary(self.host, self.payload, self.created_at)
+
+
+Record = TypeVar("Record", Entry, Summary)
+
+
+class Backend(Protocol):
+    """Storage of cache entries by key."""
+
+    def get(self, key: str) -> Entry | None:
+        ...
+
+    def set(self, key: str, entry: Entry) -> None:
+        ...
+
+    def delete(self, key: str) -> None:
+        ...
+
+    def summaries(self) -> Iterator[tuple[str, Summary]]:
+        """Lists the entries without loading their pages."""
+
+
+class MemoryBackend:
+    """Keeps the least recently used entries in memory."""
+
+    def __init__(self, max_entries: int = 128):
+        self.max_entries = max_entries
+        self._entries: collections.OrderedDict[
+            str, Entry
+        ] = collections.OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key: str) -> Entry | None:
+        with self._lock:
+            if key not in self._entries:
+                return None
+            self._entries.move_to_end(key)
+            return self._entries[key]
+
+    def set(self, key: str, entry: Entry) -> None:
+        with self._lock:
+            self._entries[key] = entry
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def delete(self, key: str) -> None:
+        with self._lock:
+            self._entries.pop(key, None)
+
+    def summaries(self) -> Iterator[tuple[str, Summary]]:
+        with self._lock:
+            entries = list(self._entries.items())
+        for key, entry in entries:
+            yield key, entry.summary
+
+
+class DiskBackend:
+    """
+    Stores entries as JSON files in a directory, shared between processes.
+    A small summary file next to each entry lists it without its pages.
+    """
+
+    def __init__(self, directory: str | pathlib.Path):
+        self.directory = pathlib.Path(directory)
+        self.directory.mkdir(parents=True, exist_ok=True)
+
+    def _path(self, key: str) -> pathlib.Path:
+        return self.directory / f"{key}.json"
+
+    def _summary_path(self, key: str) -> pathlib.Path:
+        return self.directory / f"{key}{SUMMARY_SUFFIX}"
+
+    @staticmethod
+    def _read(path: pathlib.Path, kind: type[Record]) -> Record | None:
+        try:
+            return kind(**json.loads(path.read_text(encoding="utf-8")))
+        except (OSError, ValueError, TypeError):
+            return None
+
+    def _write(self, path: pathlib.Path, record: Entry | Summary) -> None:
+        with tempfile.NamedTemporaryFile(
+            "w",
+            dir=self.directory,
+            suffix=".part",
+            delete=False,
+            encoding="utf-8",
+        ) as file:
+            json.dump(dataclasses.asdict(record), file)
+        os.replace(file.name, path)
+
+    def get(self, key: str) -> Entry | None:
+        return self._read(self._path(key), Entry)
+
+    def set(self, key: str, entry: Entry) -> None:
+        # The summary is written last, listed entries can always be read
+        self._write(self._path(key), entry)
+        self._write(self._summary_path(key), entry.summary)
+
+    def delete(self, key: str) -> None:
+        self._summary_path(key).unlink(missing_ok=True)
+        self._path(key).unlink(missing_ok=True)
+
+    def summaries(self) -> Iterator[tuple[str, Summary]]:
+        for path in list(self.directory.glob(f"*{SUMMARY_SUFFIX}")):
+            if summary := self._read(path, Summary):
+                yield path.name.removesuffix(SUMMARY_SUFFIX), summary
+
+
+def _area(payload: dict) -> dict | None:
+    if "intersects" in payload:
+        return payload["intersects"]
+    if "bbox" in payload:
+        west, south, east, north = payload["bbox"]
+        return geometry.box((west, south, east, north))
+    return None
+
+
+def _time(value: str | None) -> dt.datetime | None:
+    if not value or value == "..":
+        return None
+    try:
+        moment = utils.parse_datetime(value)
+    except ValueError:
+        return None
+    return moment if moment.tzinfo else moment.replace(tzinfo=dt.timezone.utc)
+
+
+def _interval(value: str | None) -> Interval:
+    start, separator, end = (value or "").partition("/")
+    return _time(start), _time(end if separator else start)
+
+
+def _query_covers(cached: dict, query: dict) -> bool:
+    """Whether each predicate of a cached query holds for a new query."""
+    for name, predicates in cached.items():
+        for operation, cached_value in predicates.items():
+            new = query.get(name, {})
+            if operation not in new:
+                return False
+            implies = _IMPLICATIONS.get(operation, operator.eq)
+            if not implies(new[operation], cached_value):
+                return False
+    return True
+
+
+def _covers(cached: dict, payload: dict) -> bool:
+    """Whether all results of a search are among those of a cached one."""
+    cached_area, area = _area(cached), _area(payload)
+    if cached_area and not (area and geometry.contains(cached_area, area)):
+        return False
+    (cached_start, cached_end), (start, end) = _interval(
+        cached.get("datetime")
+    ), _interval(payload.get("datetime"))
+    if cached_start and not (start and start >= cached_start):
+        return False
+    if cached_end and not (end and end <= cached_end):
+        return False
+    cached_collections = cached.get("collections")
+    searched_collections = payload.get("collections")
+    if cached_collections and not (
+        searched_collections
+        and set(searched_collections) <= set(cached_collections)
+    ):
+        return False
+    query = payload.get("query", {})
+    return all(
+        operation in QUERY_OPERATORS
+        for predicates in query.values()
+        for operation in predicates
+    ) and _query_covers(cached.get("query", {}), query)
+
+
+def _matches(feature: dict, payload: dict) -> bool:
+    """Whether a feature is a result of a search."""
+    properties = feature["properties"]
+    area = _area(payload)
+    if area and not geometry.intersects(feature["geometry"], area):
+        return False
+    start, end = _interval(payload.get("datetime"))
+    feature_start = _time(
+        properties.get("start_datetime") or properties.get("datetime")
+    )
+    feature_end = _time(
+        properties.get("end_datetime") or properties.get("datetime")
+    )
+    if start and (feature_end is None or feature_end < start):
+        return False
+    if end and (feature_start is None or feature_start > end):
+        return False
+    searched_collections = payload.get("collections")
+    if (
+        searched_collections
+        and properties.get("collection") not in searched_collections
+    ):
+        return False
+    for name, predicates in payload.get("query", {}).items():
+        if name not in properties:
+            return False
+        for operation, value in predicates.items():
+            try:
+                if not QUERY_OPERATORS[operation](properties[name], value):
+                    return False
+            except TypeError:
+                return False
+    return True
+
+
+class SearchCache:
+    """
+    Caches the pages of catalog searches for a limited time, keyed by the
+    host and the normalized search payload, e.g.
+    `provider.search(bbox=bbox, cache=SearchCache())`.
+    Only searches whose pages were all consumed are cached.
+
+    With `answer_covered`, searches covered by a cached search, with an
+    area of interest inside the cached one, a narrower time range, a
+    subset of the collections and stricter `query` predicates, are
+    answered by filtering the cached scenes.
+    """
+
+    def __init__(
+        self,
+        backend: Backend | None = None,
+        ttl: float = 300.0,
+        clock: Callable[[], float] = time.time,
+        answer_covered: bool = False,
+    ):
+        """
+        Args:
+            backend: Storage of the pages, by default in memory.
+            ttl: Seconds after which cached pages expire.
+            clock: Current time in seconds since the epoch.
+            answer_covered: Whether to answer searches covered by cached
+                searches, otherwise only identical searches are replayed.
+                Each missed search then scans the summaries of all cached
+                searches.
+        """
+        self.backend = backend or MemoryBackend()
+        self.ttl = ttl
+        self._clock = clock
+        self.answer_covered = answer_covered
+
+    @staticmethod
+    def key(host: str, payload: dict) -> str:
+        """Hashes a search, ignoring the order of keys and collections."""
+        normalized = dict(payload)
+        if "collections" in normalized:
+            normalized["collections"] = sorted(normalized["collections"])
+        canonical = json.dumps(
+            {"host": host, "payload": normalized},
+            sort_keys=True,
+            separators=(",", ":"),
+        )
+        return hashlib.sha256(canonical.encode()).hexdigest()
+
+    def _is_fresh(self, record: Entry | Summary) -> bool:
+        return self._clock() - record.created_at < self.ttl
+
+    def get(self, host: str, payload: dict) -> list[Page] | None:
+        """Returns the cached pages of a search, None if missing or expired."""
+        key = self.key(host, payload)
+        entry = self.backend.get(key)
+        if entry is not None:
+            if self._is_fresh(entry):
+                return entry.pages
+            self.backend.delete(key)
+        if self.answer_covered:
+            return self._get_covered(host, payload)
+        return None
+
+    def _get_covered(self, host: str, payload: dict) -> list[Page] | None:
+        for key, summary in self.backend.summaries():
+            if not self._is_fresh(summary):
+                self.backend.delete(key)
+                continue
+            if not (
+                summary.host == host and _covers(summary.payload, payload)
+            ):
+                continue
+            # Only the pages of the covering search are loaded
+            if entry := self.backend.get(key):
+                return [
+                    [
+                        feature
+                        for page in entry.pages
+                        for feature in page
+                        if _matches(feature, payload)
+                    ]
+                ]
+        return None
+
+    def put(self, host: str, payload: dict, pages: list[Page]) -> None:
+        self.backend.set(
+            self.key(host, payload),
+            Entry(host, payload, pages, self._clock()),
+        )
+
+    def clear_expired(self) -> None:
+        for key, summary in self.backend.summaries():
+            if not self._is_fresh(summary):
+                self.backend.delete(key)
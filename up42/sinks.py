@@ -0,0 +1,173 @@
+import contextlib
+import os
+import pathlib
+from collections.abc import Callable, Iterator
+from typing import Any, ContextManager, Protocol
+
+PART_SIZE = 8 * 1024 * 1024  # bytes, above the 5 MiB minimum of S3
+
+Writer = Callable[[memoryview], Any]
+
+
+class Sink(Protocol):
+    """Destination of downloaded files, e.g. a directory or a bucket."""
+
+    def open(self, name: str) -> ContextManager[Writer]:
+        """
+        Opens a file for writing. The file is committed once the context
+        exits and discarded if it exits with an error.
+        """
+
+    def location(self, name: str) -> str:
+        """Returns the path or url of a file."""
+
+
+class LocalSink:
+    def __init__(self, directory: str | pathlib.Path):
+        self.directory = pathlib.Path(directory)
+
+    def location(self, name: str) -> str:
+        return str(self.directory / name)
+
+    @contextlib.contextmanager
+    def open(self, name: str) -> Iterator[Writer]:
+        path = self.directory / name
+        path.parent.mkdir(parents=True, exist_ok=True)
+        part = path.with_name(path.name + ".part")
+        try:
+            with open(part, "wb") as dst:
+                yield dst.write
+            os.replace(part, path)
+        finally:
+            part.unlink(missing_ok=True)
+
+
+class MultipartUpload(Protocol):
+    """Multipart upload of a single object to S3 compatible storage."""
+
+    def upload_part(self, number: int, data: bytes) -> None:
+        """Uploads the part with a given number, starting at 1."""
+
+    def complete(self) -> None:
+        ...
+
+    def abort(self) -> None:
+        ...
+
+
+class MultipartSink:
+    """
+    Uploads files in parts of a fixed size through a custom client, e.g. the
+    multipart upload API of an S3 compatible storage, holding a single part
+    in memory.
+    """
+
+    def __init__(
+        self,
+        start_upload: Callable[[str], MultipartUpload],
+        location: Callable[[str], str],
+        part_size: int = PART_SIZE,
+    ):
+        """
+        Args:
+            start_upload: Starts the multipart upload of a file name.
+            location: Returns the url of a file name.
+            part_size: Size of all parts except the last one.
+        """
+        self._start_upload = start_upload
+        self._location = location
+        self.part_size = part_size
+
+    def location(self, name: str) -> str:
+        return self._location(name)
+
+    @contextlib.contextmanager
+    def open(self, name: str) -> Iterator[Writer]:
+        upload = self._start_upload(name)
+        part = bytearray()
+        number = 0
+
+        def flush() -> None:
+            nonlocal number
+            number += 1
+            upload.upload_part(number, bytes(part))
+            part.clear()
+
+        def write(view: memoryview) -> None:
+            while view:
+                size = min(self.part_size - len(part), len(view))
+                part.extend(view[:size])
+                view = view[size:]
+                if len(part) == self.part_size:
+                    flush()
+
+        try:
+            yield write
+            if part or not number:
+                flush()
+            upload.complete()
+        except BaseException:
+            upload.abort()
+            raise
+
+
+class FsspecSink:
+    """
+    Writes files to any fsspec file system, e.g. S3 compatible storage with
+    s3fs, which uploads files larger than a block in multiple parts.
+    Requires the `fsspec` extra, `pip install up42-py[fsspec]`, and the
+    driver of the file system.
+    """
+
+    def __init__(self, url: str, part_size: int = PART_SIZE, **options):
+        """
+        Args:
+            url: The target directory url, e.g. s3://bucket/prefix.
+            part_size: Block size of the file system writes.
+            options: File system options, e.g. endpoint_url of s3fs.
+        """
+        try:
+            import fsspec  # type: ignore  # pylint: disable=import-outside-toplevel
+        except ImportError as error:
+            raise ImportError(
+                "FsspecSink requires fsspec and the driver of the file system, "
+                "e.g. s3fs"
+            ) from error
+        self._fs, self._root = fsspec.core.url_to_fs(url, **options)
+        self._protocol = url.split("://")[0] if "://" in url else None
+        self.part_size = part_size
+
+    def _path(self, name: str) -> str:
+        return f"{self._root.rstrip('/')}/{name}"
+
+    def location(self, name: str) -> str:
+        path = self._path(name)
+        return f"{self._protocol}://{path}" if self._protocol else path
+
+    @contextlib.contextmanager
+    def open(self, name: str) -> Iterator[Writer]:
+        path = self._path(name)
+        self._fs.makedirs(path.rsplit("/", 1)[0], exist_ok=True)
+        existed = self._fs.exists(path)
+        # Without autocommit, closing a file does not publish it, e.g. s3fs
+        # completes the multipart upload only on commit
+        dst = self._fs.open(
+            path, "wb", block_size=self.part_size, autocommit=False
+        )
+        try:
+            try:
+                yield dst.write
+            except BaseException:
+                dst.discard()
+                # File systems such as memory:// publish files when opened,
+                # files which existed before are kept to not lose them
+                if not existed and self._fs.exists(path):
+                    self._fs.rm(path)
+                raise
+            dst.close()
+            dst.commit()
+        finally:
+            # Files without autocommit are tracked by the file system's
+            # transaction, which is shared by all files of the file system
+            with contextlib.suppress(ValueError):
+                self._fs.transaction.files.remove(dst)
@@ -1,6 +1,17 @@
+import dataclasses
+import datetime
+import enum
+import functools
+import pathlib
+import threading
+from collections.abc import Callable, Iterable, Iterator
+from concurrent import futures
+from typing import TypeAlias
+from urllib import parse
+
 import pystac
 
-from up42 import base, host, utils
+from up42 import asset_cache, base, checksums, host, transfer, utils
 
 
 class InvalidUp42Asset(ValueError):
@@ -13,22 +24,145 @@ class IncompleteCollectionDeletionError(ValueError):
     pass
 
 
+FILE_SIZE_KEY = "file:size"
+FILE_CHECKSUM_KEY = "file:checksum"
+SIGNED_URL_LIFETIME = datetime.timedelta(minutes=5)  # if not in the url
+SIGNED_URL_EXPIRY_MARGIN = datetime.timedelta(seconds=60)
+SIGNED_URL_DATE_FORMAT = "%Y%m%dT%H%M%SZ"
+Clock: TypeAlias = Callable[[], datetime.datetime]
+
+
+def _utc_now() -> datetime.datetime:
+    return datetime.datetime.now(datetime.timezone.utc)
+
+
+def signed_url_expiry(
+    signed_url: str, signed_on: datetime.datetime
+) -> datetime.datetime:
+    """
+    Returns when a signed url expires, based on the query parameters of
+    Google Cloud Storage and S3 compatible signatures.
+    """
+    query = {
+        key.lower(): values[0]
+        for key, values in parse.parse_qs(
+            parse.urlsplit(signed_url).query
+        ).items()
+    }
+    for vendor in ["x-goog", "x-amz"]:
+        if expires := query.get(f"{vendor}-expires"):
+            date = query.get(f"{vendor}-date")
+            start = (
+                datetime.datetime.strptime(
+                    date, SIGNED_URL_DATE_FORMAT
+                ).replace(tzinfo=datetime.timezone.utc)
+                if date
+                else signed_on
+            )
+            return start + datetime.timedelta(seconds=int(expires))
+    if expires := query.get("expires"):
+        return datetime.datetime.fromtimestamp(
+            int(expires), datetime.timezone.utc
+        )
+    return signed_on + SIGNED_URL_LIFETIME
+
+
+def _checksum(multihash: str | None) -> checksums.Checksum | None:
+    # Files with checksums of hash functions missing in hashlib are not verified
+    if multihash:
+        try:
+            return checksums.Checksum.from_multihash(multihash)
+        except checksums.UnsupportedChecksum:
+            return None
+    return None
+
+
 class FileProvider:
     session = base.Session()
 
+    def __init__(self, clock: Clock = _utc_now):
+        self._clock = clock
+        self._signed_urls: dict[str, tuple[str, datetime.datetime]] = {}
+        self._lock = threading.Lock()
+
+    def _sign(self, href: str) -> str:
+        signed_on = self._clock()
+        signed_url = self.session.post(url=href + "/download-url").json()[
+            "url"
+        ]
+        with self._lock:
+            # The provider lives as long as the process, expired urls go
+            self._signed_urls = {
+                signed_href: cached
+                for signed_href, cached in self._signed_urls.items()
+                if signed_on < cached[1] - SIGNED_URL_EXPIRY_MARGIN
+            }
+            self._signed_urls[href] = (
+                signed_url,
+                signed_url_expiry(signed_url, signed_on),
+            )
+        return signed_url
+
+    def _signed_url(self, href: str) -> str:
+        with self._lock:
+            cached = self._signed_urls.get(href)
+        if cached:
+            signed_url, expires_on = cached
+            if self._clock() < expires_on - SIGNED_URL_EXPIRY_MARGIN:
+                return signed_url
+        return self._sign(href)
+
+    @staticmethod
+    def _is_up42_asset(asset: pystac.Asset) -> bool:
+        return asset.href.startswith(host.endpoint(""))
+
+    def _image_file(self, asset: pystac.Asset) -> utils.ImageFile | None:
+        if self._is_up42_asset(asset):
+            checksum = asset.extra_fields.get(FILE_CHECKSUM_KEY)
+            return utils.ImageFile(
+                url=self._signed_url(asset.href),
+                refresh_url=functools.partial(self._sign, asset.href),
+                cache_key=checksum and f"{asset.href}#{checksum}",
+                checksum=_checksum(checksum),
+            )
+        return None
+
     def __get__(
         self, obj: pystac.Asset | None, obj_type=None
     ) -> utils.ImageFile | None:
         if obj:
-            if obj.href.startswith(host.endpoint("")):
-                url = obj.href + "/download-url"
-                signed_url = self.session.post(url=url).json()["url"]
-                return utils.ImageFile(url=signed_url)
-            else:
-                return None
+            return self._image_file(obj)
         else:
             raise AttributeError
 
+    def resolve(
+        self, assets: Iterable[pystac.Asset], max_workers: int = 8
+    ) -> list[utils.ImageFile | None]:
+        assets = list(assets)
+        hrefs = {asset.href for asset in assets if self._is_up42_asset(asset)}
+        with futures.ThreadPoolExecutor(max_workers) as pool:
+            list(pool.map(self._signed_url, hrefs))
+        return [self._image_file(asset) for asset in assets]
+
+
+def resolve_files(
+    assets: Iterable[pystac.Asset], max_workers: int = 8
+) -> list[utils.ImageFile | None]:
+    """
+    Signs the urls of many assets concurrently, at most once per asset.
+    Signed urls are cached until shortly before they expire, so reading
+    `asset.file` afterwards does not sign them again.
+
+    Args:
+        assets: The assets to provide files for.
+        max_workers: Number of concurrent signing requests.
+
+    Returns:
+        The files of the assets in the same order, None for external assets.
+    """
+    file_provider: FileProvider = vars(pystac.Asset)["file"]
+    return file_provider.resolve(assets, max_workers)
+
 
 UP42_USER_TITLE_KEY = "up42-user:title"
 UP42_USER_TAGS_KEY = "up42-user:tags"
@@ -146,3 +280,127 @@ class BulkDeletion:
         for collection_id in collection_ids:
             url = host.endpoint(f"/v2/assets/stac/collections/{collection_id}")
             self.session.delete(url=url)
+
+
+class AssetDownloadStatus(enum.Enum):
+    DOWNLOADED = "DOWNLOADED"
+    SKIPPED = "SKIPPED"
+    FAILED = "FAILED"
+
+
+@dataclasses.dataclass(frozen=True)
+class AssetDownload:
+    key: str
+    asset: pystac.Asset
+    status: AssetDownloadStatus
+    path: pathlib.Path | None = None
+    error: Exception | None = None
+
+
+DownloadSource: TypeAlias = pystac.Item | pystac.Collection | pystac.Asset
+
+
+class BulkDownload:
+    """
+    Downloads the assets of items, collections or single assets through a
+    bounded pool of workers. Item assets are stored in a directory per item.
+    """
+
+    def __init__(
+        self,
+        *sources: DownloadSource,
+        max_workers: int = 4,
+        settings: transfer.Settings = transfer.Settings(),
+        cache: asset_cache.AssetCache | None = None,
+    ):
+        self._sources = sources
+        self._max_workers = max_workers
+        self._settings = settings
+        self._cache = cache
+
+    def _assets(self) -> Iterator[tuple[str, pystac.Asset, str]]:
+        for source in self._sources:
+            if isinstance(source, pystac.Asset):
+                href_path = parse.urlsplit(source.href).path
+                yield pathlib.PurePosixPath(href_path).name, source, ""
+            else:
+                items = (
+                    [source]
+                    if isinstance(source, pystac.Item)
+                    else source.get_items()
+                )
+                for item in items:
+                    for key, asset in item.assets.items():
+                        yield key, asset, item.id
+
+    def _download(
+        self,
+        key: str,
+        asset: pystac.Asset,
+        directory: pathlib.Path,
+        progress: transfer.Progress,
+        on_file: utils.FileCallback | None,
+    ) -> AssetDownload:
+        try:
+            image_file: utils.ImageFile | None = asset.file  # type: ignore
+            if image_file is None:
+                raise InvalidUp42Asset(f"{asset.href} is not an UP42 asset")
+            image_file = dataclasses.replace(image_file, file_name=key)
+            path = image_file.path(directory)
+            size = asset.extra_fields.get(FILE_SIZE_KEY)
+            if path.exists() and size in (None, path.stat().st_size):
+                progress.update(path.stat().st_size)
+                status = AssetDownloadStatus.SKIPPED
+            else:
+                directory.mkdir(parents=True, exist_ok=True)
+                path = image_file.download(
+                    directory, self._settings, progress, self._cache
+                )
+                status = AssetDownloadStatus.DOWNLOADED
+            if on_file:
+                on_file(path)
+            return AssetDownload(key, asset, status, path)
+        except Exception as error:  # pylint: disable=broad-exception-caught
+            return AssetDownload(
+                key, asset, AssetDownloadStatus.FAILED, error=error
+            )
+
+    def download(
+        self,
+        output_directory: str | pathlib.Path,
+        on_file: utils.FileCallback | None = None,
+    ) -> list[AssetDownload]:
+        """
+        Downloads all assets, skipping the ones already downloaded, and
+        reports progress in a single bar.
+
+        Args:
+            output_directory: The file output directory.
+            on_file: Called with each downloaded or skipped file as soon as
+                it is available, e.g. `Pipeline.submit`. Assets whose
+                callback fails are reported as failed.
+
+        Returns:
+            The outcome of each asset download, in the order of the sources.
+        """
+        assets = list(self._assets())
+        sizes = [
+            asset.extra_fields.get(FILE_SIZE_KEY) for _, asset, _ in assets
+        ]
+        total = None if None in sizes else sum(size or 0 for size in sizes)
+        with transfer.Progress(
+            total, self._settings.progress_interval
+        ) as progress:
+            with futures.ThreadPoolExecutor(self._max_workers) as pool:
+                results = [
+                    pool.submit(
+                        self._download,
+                        key,
+                        asset,
+                        pathlib.Path(output_directory, directory),
+                        progress,
+                        on_file,
+                    )
+                    for key, asset, directory in assets
+                ]
+                return [result.result() for result in results]
@@ -0,0 +1,798 @@
+import contextlib
+import dataclasses
+import functools
+import io
+import json
+import os
+import pathlib
+import re
+import tempfile
+import threading
+import time
+from collections.abc import Callable
+from concurrent import futures
+from typing import Any
+from urllib import parse
+
+import requests
+import tqdm
+import urllib3
+
+from up42 import bandwidth, checksums
+
+TIMEOUT = 120  # seconds
+BUFFER_SIZE = 8 * 1024 * 1024  # bytes
+PROGRESS_INTERVAL = 0.5  # seconds
+SEGMENT_SIZE = 64 * 1024 * 1024  # bytes
+
+Writer = Callable[[memoryview], Any]
+Reader = Callable[[memoryview], int]
+UrlProvider = Callable[[], str]
+
+
+@dataclasses.dataclass(frozen=True)
+class Settings:
+    """
+    Tuning of the streaming download engine.
+
+    Args:
+        buffer_size: Size of the preallocated buffer filled by each read.
+        progress_interval: Minimum number of seconds between progress bar
+            refreshes.
+        segment_count: Number of byte ranges downloaded concurrently by
+            segmented downloads, 1 disables them.
+        segment_size: Size of each byte range of a segmented download.
+        resume_attempts: Number of consecutive reconnections after connection
+            errors or expired signed URLs before a download fails.
+        priority: Weight of the download's share of the limited bandwidth.
+        limiter: Bandwidth limiter shared by the downloads, by default the
+            process-wide `bandwidth.limiter`.
+    """
+
+    buffer_size: int = BUFFER_SIZE
+    progress_interval: float = PROGRESS_INTERVAL
+    segment_count: int = 1
+    segment_size: int = SEGMENT_SIZE
+    resume_attempts: int = 5
+    priority: float = 1.0
+    limiter: bandwidth.Limiter = dataclasses.field(
+        default=bandwidth.limiter, compare=False
+    )
+
+
+class Progress:
+    """Progress bar which batches updates and refreshes at most once per interval."""
+
+    def __init__(
+        self,
+        total: int | None,
+        interval: float = PROGRESS_INTERVAL,
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        self._bar = tqdm.tqdm(
+            total=total,
+            unit="B",
+            unit_scale=True,
+            unit_divisor=1024,
+            mininterval=interval,
+        )
+        self._interval = interval
+        self._clock = clock
+        self._pending = 0
+        self._refreshed_at = clock()
+        self._lock = threading.Lock()
+
+    def update(self, size: int) -> None:
+        with self._lock:
+            self._pending += size
+            now = self._clock()
+            if now - self._refreshed_at >= self._interval:
+                self._flush()
+                self._refreshed_at = now
+
+    def _flush(self) -> None:
+        if self._pending:
+            self._bar.update(self._pending)
+            self._pending = 0
+
+    def close(self) -> None:
+        self._flush()
+        self._bar.close()
+
+    def __enter__(self) -> "Progress":
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.close()
+
+
+def _progress(
+    progress: Progress | None, total: int | None, settings: Settings
+) -> contextlib.AbstractContextManager[Progress]:
+    # Shared progress bars are owned and closed by the caller
+    if progress:
+        return contextlib.nullcontext(progress)
+    return Progress(total, settings.progress_interval)
+
+
+def _timeout(session: requests.Session) -> Any:
+    # Download sessions carry their own connect and read timeouts
+    return getattr(session, "timeout", TIMEOUT)
+
+
+def content_length(response: requests.Response) -> int | None:
+    """
+    Returns the number of bytes the response body will yield, if known.
+    Encoded bodies are decoded on the fly, so their length is unknown.
+    """
+    if "Content-Encoding" in response.headers:
+        return None
+    length = response.headers.get("Content-Length")
+    return int(length) if length and length.isdigit() else None
+
+
+def stream(
+    response: requests.Response,
+    write: Writer,
+    settings: Settings = Settings(),
+    progress: Progress | None = None,
+) -> int:
+    """
+    Streams a response body to a writer through a single preallocated buffer.
+
+    Args:
+        response: Response requested with `stream=True`.
+        write: Callable consuming each filled slice of the buffer. The slice
+            is only valid until the callable returns.
+        settings: Buffer size and progress reporting settings.
+        progress: Shared progress bar to report to instead of a new one.
+
+    Returns:
+        The number of bytes written.
+    """
+    with _progress(
+        progress, content_length(response), settings
+    ) as stream_progress:
+        return _copy(
+            _body_reader(response),
+            write,
+            settings,
+            stream_progress,
+            settings.limiter.flow(settings.priority),
+        )
+
+
+def _body_reader(response: requests.Response) -> Reader:
+    response.raw.decode_content = True
+
+    def read(buffer: memoryview) -> int:
+        try:
+            return response.raw.readinto(buffer)
+        # Mirrors the error translation of `requests.Response.iter_content`
+        except urllib3.exceptions.ProtocolError as error:
+            raise requests.exceptions.ChunkedEncodingError(error) from error
+        except urllib3.exceptions.DecodeError as error:
+            raise requests.exceptions.ContentDecodingError(error) from error
+        except urllib3.exceptions.ReadTimeoutError as error:
+            raise requests.exceptions.ConnectionError(error) from error
+
+    return read
+
+
+def _copy(
+    read: Reader,
+    write: Writer,
+    settings: Settings,
+    progress: Progress,
+    flow: bandwidth.Flow | None,
+) -> int:
+    # Without a flow, the reader pays for its reads, e.g. a `RemoteStream`
+    view = memoryview(bytearray(settings.buffer_size))
+    written = 0
+    while True:
+        # Limited downloads read in slices to keep the bandwidth smooth
+        limit = settings.limiter.read_size(settings.buffer_size)
+        if not (size := read(view[:limit])):
+            return written
+        write(view[:size])
+        written += size
+        progress.update(size)
+        if flow:
+            flow.consume(size)
+
+
+class RangeNotSupported(Exception):
+    """The server ignored a byte range request"""
+
+
+_CONTENT_RANGE = re.compile(r"bytes (?:\d+-\d+|\*)/(\d+)")
+
+
+def probe_size(session: requests.Session, url: str) -> int | None:
+    """
+    Returns the size of a resource which can be downloaded in byte ranges.
+    Signed URLs are often valid for GET only, so a failing HEAD request is
+    followed by a single byte range request.
+    """
+    try:
+        response = session.head(
+            url, allow_redirects=True, timeout=_timeout(session)
+        )
+        response.raise_for_status()
+        if response.headers.get("Accept-Ranges") == "bytes":
+            return content_length(response)
+    except requests.RequestException:
+        pass
+    try:
+        with session.get(
+            url,
+            headers={"Range": "bytes=0-0"},
+            stream=True,
+            timeout=_timeout(session),
+        ) as response:
+            response.raise_for_status()
+            if response.status_code == 206:
+                return _total_size(response)
+    except requests.RequestException:
+        pass
+    return None
+
+
+def probe_etag(session: requests.Session, url: str) -> str | None:
+    """
+    Returns the ETag of a resource, requesting its headers only, or a single
+    byte if the url is valid for GET only.
+    """
+    for method, headers in [("HEAD", {}), ("GET", {"Range": "bytes=0-0"})]:
+        try:
+            with session.request(
+                method,
+                url,
+                headers=headers,
+                allow_redirects=True,
+                stream=True,
+                timeout=_timeout(session),
+            ) as response:
+                response.raise_for_status()
+                if etag := response.headers.get("ETag"):
+                    return etag
+        except requests.RequestException:
+            pass
+    return None
+
+
+def download_segmented(
+    session: requests.Session,
+    url: str,
+    path: pathlib.Path,
+    settings: Settings = Settings(),
+    progress: Progress | None = None,
+) -> bool:
+    """
+    Downloads a resource as concurrent byte ranges written in place into a
+    preallocated `.segments.part` file, which is renamed once complete and
+    removed if the download fails. Each range resumes at its current
+    position after connection errors.
+
+    Args:
+        session: Session used for the range requests.
+        url: The signed URL to download.
+        path: The destination file path.
+        settings: Segment count and size, buffer and progress settings.
+        progress: Shared progress bar to report to instead of a new one.
+
+    Returns:
+        False if a segmented download is not possible, i.e. it is disabled,
+        the platform lacks positional writes, the resource is not larger
+        than a single segment or the server does not support byte ranges.
+    """
+    if settings.segment_count <= 1 or not hasattr(os, "pwrite"):
+        return False
+    size = probe_size(session, url)
+    if size is None or size <= settings.segment_size:
+        return False
+    # Apart from the `.part` file of resumable downloads, which would be
+    # taken for a partial download of the first bytes
+    part = path.with_name(path.name + ".segments.part")
+    fd = os.open(part, os.O_RDWR | os.O_CREAT | os.O_TRUNC, 0o666)
+    # The segments share the bandwidth of a single download
+    flow = settings.limiter.flow(settings.priority)
+
+    def fetch(start: int, segment_progress: Progress) -> int:
+        end = min(start + settings.segment_size, size)
+        position = failed_at = start
+        attempts = 0
+
+        def write(view: memoryview) -> None:
+            nonlocal position
+            while view:
+                written = os.pwrite(fd, view, position)
+                position += written
+                view = view[written:]
+
+        # Connection errors resume the segment at the current position
+        while True:
+            try:
+                with session.get(
+                    url,
+                    headers={"Range": f"bytes={position}-{end - 1}"},
+                    stream=True,
+                    timeout=_timeout(session),
+                ) as response:
+                    response.raise_for_status()
+                    if response.status_code != 206:
+                        raise RangeNotSupported(url)
+                    _copy(
+                        _body_reader(response),
+                        write,
+                        settings,
+                        segment_progress,
+                        flow,
+                    )
+                if position < end:
+                    raise requests.exceptions.ChunkedEncodingError(
+                        f"Connection closed at {position} of segment "
+                        f"{start}-{end - 1}"
+                    )
+                return end - start
+            except RESUMABLE_ERRORS:
+                if position > failed_at:
+                    attempts = 0
+                failed_at = position
+                attempts += 1
+                if attempts > settings.resume_attempts:
+                    raise
+
+    try:
+        os.ftruncate(fd, size)
+        with _progress(progress, size, settings) as segment_progress:
+            with futures.ThreadPoolExecutor(settings.segment_count) as pool:
+                written = sum(
+                    pool.map(
+                        functools.partial(
+                            fetch, segment_progress=segment_progress
+                        ),
+                        range(0, size, settings.segment_size),
+                    )
+                )
+        if written != size:
+            raise IncompleteDownload(f"Downloaded {written} of {size} bytes")
+    except RangeNotSupported:
+        part.unlink(missing_ok=True)
+        return False
+    except BaseException:
+        # The preallocated file cannot be resumed, its gaps are zeros
+        part.unlink(missing_ok=True)
+        raise
+    finally:
+        os.close(fd)
+    part.replace(path)
+    return True
+
+
+class IncompleteDownload(Exception):
+    """The downloaded size differs from the announced one"""
+
+
+RESUMABLE_ERRORS = (
+    requests.exceptions.ConnectionError,
+    requests.exceptions.ChunkedEncodingError,
+    requests.exceptions.Timeout,
+)
+# Statuses of storage providers rejecting an expired signature
+SIGNATURE_STATUSES = (400, 401, 403)
+
+
+class RemoteStream(io.RawIOBase):
+    """
+    Readable body of a remote resource which reconnects with a byte range
+    request at the current position after connection errors. Expired signed
+    URLs are renewed with `refresh_url` if provided. Reads are paid for by
+    `flow`, by default a new flow of the limiter of the settings.
+    """
+
+    def __init__(
+        self,
+        session: requests.Session,
+        url: str,
+        settings: Settings = Settings(),
+        offset: int = 0,
+        etag: str | None = None,
+        refresh_url: UrlProvider | None = None,
+        progress: Progress | None = None,
+        flow: bandwidth.Flow | None = None,
+    ):
+        super().__init__()
+        self.url = url
+        self.position = offset
+        self.etag = etag
+        self.size: int | None = None
+        self._session = session
+        self._settings = settings
+        self._refresh_url = refresh_url
+        self._progress = progress
+        self._flow = flow or settings.limiter.flow(settings.priority)
+        self._attempts = 0
+        self._failed_at = offset
+        self._resumable = True
+        self._response: requests.Response | None = None
+        self._read: Reader = lambda buffer: 0
+        self._connect(restartable=True)
+
+    def readable(self) -> bool:
+        return True
+
+    def _retry(self) -> bool:
+        if self.position > self._failed_at:
+            self._attempts = 0
+        self._failed_at = self.position
+        self._attempts += 1
+        return self._attempts <= self._settings.resume_attempts
+
+    def _request(self) -> requests.Response:
+        headers = {}
+        if self.position:
+            headers["Range"] = f"bytes={self.position}-"
+            if self.etag:
+                headers["If-Range"] = self.etag
+        while True:
+            try:
+                response = self._session.get(
+                    self.url,
+                    headers=headers,
+                    stream=True,
+                    timeout=_timeout(self._session),
+                )
+                response.raise_for_status()
+                return response
+            except requests.exceptions.HTTPError as error:
+                status = error.response.status_code
+                if status == 416:
+                    return error.response
+                if not (
+                    self._refresh_url
+                    and status in SIGNATURE_STATUSES
+                    and self._retry()
+                ):
+                    raise
+                self.url = self._refresh_url()
+            except RESUMABLE_ERRORS:
+                if not self._retry():
+                    raise
+
+    def _connect(self, restartable: bool) -> None:
+        response = self._request()
+        if response.status_code == 416:
+            response.close()
+            total = _total_size(response)
+            if total == self.position:
+                self.size, self._response = total, None
+                self._read = lambda buffer: 0
+                return
+            if not restartable:
+                raise RangeNotSupported(self.url)
+            self.position = 0
+            response = self._request()
+        if self.position and response.status_code == 200:
+            # The range was ignored or the resource changed since
+            if not restartable:
+                response.close()
+                raise RangeNotSupported(self.url)
+            self.position = 0
+        if response.status_code == 206:
+            self.size = _total_size(response)
+        else:
+            self.size = content_length(response)
+        self.etag = response.headers.get("ETag", self.etag)
+        self._resumable = "Content-Encoding" not in response.headers
+        self._response = response
+        self._read = _body_reader(response)
+
+    def readinto(self, buffer) -> int:  # type: ignore[override]
+        while True:
+            try:
+                size = self._read(buffer)
+                if not size and self.size and self.position < self.size:
+                    raise requests.exceptions.ChunkedEncodingError(
+                        f"Connection closed at {self.position} of "
+                        f"{self.size} bytes"
+                    )
+            except RESUMABLE_ERRORS:
+                if not (self._resumable and self._retry()):
+                    raise
+                self._disconnect()
+                self._connect(restartable=False)
+                continue
+            self.position += size
+            if self._progress:
+                self._progress.update(size)
+            self._flow.consume(size)
+            return size
+
+    def _disconnect(self) -> None:
+        if self._response is not None:
+            self._response.close()
+            self._response = None
+
+    def close(self) -> None:
+        self._disconnect()
+        super().close()
+
+
+class RangeFile(io.RawIOBase):
+    """
+    Seekable view of a remote resource, reading each buffer with a byte
+    range request. Random access formats such as ZIP archives can be read
+    without downloading them in full. Failed requests are retried and
+    expired signed URLs renewed with `refresh_url` if provided. Reads are
+    paid for by `flow`, e.g. shared by the files reading the same archive.
+    """
+
+    def __init__(
+        self,
+        session: requests.Session,
+        url: str,
+        settings: Settings = Settings(),
+        refresh_url: UrlProvider | None = None,
+        size: int | None = None,
+        flow: bandwidth.Flow | None = None,
+    ):
+        """
+        Raises:
+            RangeNotSupported: The server does not support byte ranges.
+        """
+        super().__init__()
+        self.url = url
+        self._session = session
+        self._settings = settings
+        self._refresh_url = refresh_url
+        self._flow = flow or settings.limiter.flow(settings.priority)
+        if size is None:
+            size = probe_size(session, url)
+        if size is None:
+            raise RangeNotSupported(url)
+        self.size = size
+        self.position = 0
+
+    def readable(self) -> bool:
+        return True
+
+    def seekable(self) -> bool:
+        return True
+
+    def tell(self) -> int:
+        return self.position
+
+    def seek(self, offset: int, whence: int = io.SEEK_SET) -> int:
+        start = {
+            io.SEEK_SET: 0,
+            io.SEEK_CUR: self.position,
+            io.SEEK_END: self.size,
+        }[whence]
+        if start + offset < 0:
+            raise ValueError(f"Negative seek position {start + offset}")
+        self.position = start + offset
+        return self.position
+
+    def _get(self, start: int, end: int) -> requests.Response:
+        attempts = 0
+        while True:
+            try:
+                response = self._session.get(
+                    self.url,
+                    headers={"Range": f"bytes={start}-{end}"},
+                    timeout=_timeout(self._session),
+                )
+                response.raise_for_status()
+                return response
+            except requests.exceptions.HTTPError as error:
+                attempts += 1
+                if not (
+                    self._refresh_url
+                    and error.response.status_code in SIGNATURE_STATUSES
+                    and attempts <= self._settings.resume_attempts
+                ):
+                    raise
+                self.url = self._refresh_url()
+            except RESUMABLE_ERRORS:
+                attempts += 1
+                if attempts > self._settings.resume_attempts:
+                    raise
+
+    def readinto(self, buffer) -> int:  # type: ignore[override]
+        end = min(self.position + len(buffer), self.size)
+        if self.position >= end:
+            return 0
+        response = self._get(self.position, end - 1)
+        if response.status_code != 206:
+            raise RangeNotSupported(self.url)
+        size = len(response.content)
+        buffer[:size] = response.content
+        self.position += size
+        self._flow.consume(size)
+        return size
+
+
+def _total_size(response: requests.Response) -> int | None:
+    match = _CONTENT_RANGE.fullmatch(response.headers.get("Content-Range", ""))
+    return int(match.group(1)) if match else None
+
+
+def unsigned(url: str) -> str:
+    """Returns a url without its query, e.g. the signature of a signed url."""
+    return parse.urlsplit(url)._replace(query="").geturl()
+
+
+def _read_manifest(manifest: pathlib.Path, url: str) -> dict | None:
+    """
+    Returns the state of a partial download of a url, None if the manifest
+    is missing, unreadable or belongs to another resource.
+    """
+    try:
+        state = json.loads(manifest.read_text(encoding="utf-8"))
+        if parse.urlsplit(state["url"]).path == parse.urlsplit(url).path:
+            return {"size": state["size"], "etag": state["etag"]}
+    except (OSError, ValueError, TypeError, KeyError):
+        pass
+    return None
+
+
+def _write_manifest(manifest: pathlib.Path, state: dict) -> None:
+    # Replaced at once, an interrupted write leaves the previous manifest
+    with tempfile.NamedTemporaryFile(
+        "w",
+        dir=manifest.parent,
+        prefix=manifest.name,
+        suffix=".tmp",
+        delete=False,
+        encoding="utf-8",
+    ) as file:
+        json.dump(state, file)
+    os.replace(file.name, manifest)
+
+
+def part_path(path: pathlib.Path) -> pathlib.Path:
+    """Returns the path of the partial file of a resumable download."""
+    return path.with_name(path.name + ".part")
+
+
+def download_resumable(
+    session: requests.Session,
+    url: str,
+    path: pathlib.Path,
+    settings: Settings = Settings(),
+    refresh_url: UrlProvider | None = None,
+    progress: Progress | None = None,
+    checksum: checksums.Checksum | None = None,
+) -> pathlib.Path:
+    """
+    Downloads a resource into a `.part` file next to the destination and
+    renames it once complete. A sidecar `.part.json` manifest records the
+    resource size and ETag, so a later call resumes an interrupted download
+    instead of starting over. The checksum is computed while bytes arrive,
+    only the resumed part of a file is read back.
+
+    Args:
+        session: Session used for the requests.
+        url: The signed URL to download.
+        path: The destination file path.
+        settings: Resumption, buffer and progress settings.
+        refresh_url: Provides a newly signed URL once the current one expired.
+        progress: Shared progress bar to report to instead of a new one.
+        checksum: Expected digest of the resource.
+
+    Returns:
+        The destination file path.
+
+    Raises:
+        ChecksumMismatch: The downloaded file differs from the checksum, it
+            is removed.
+    """
+    part = part_path(path)
+    manifest = part.with_name(part.name + ".json")
+    offset, etag, size = 0, None, None
+    if part.exists() and (state := _read_manifest(manifest, url)):
+        offset, etag, size = part.stat().st_size, state["etag"], state["size"]
+    remote = RemoteStream(session, url, settings, offset, etag, refresh_url)
+    if remote.position and remote.size != size:
+        remote.close()
+        remote = RemoteStream(session, url, settings, refresh_url=refresh_url)
+    hasher = checksum.hasher() if checksum else None
+    with remote, open(part, "ab" if remote.position else "wb") as dst:
+        write: Writer = dst.write
+        if hasher:
+            _hash_file(part, remote.position, hasher, settings.buffer_size)
+            write = _hashing_writer(write, hasher)
+        _write_manifest(
+            manifest,
+            {"url": unsigned(url), "size": remote.size, "etag": remote.etag},
+        )
+        with _progress(progress, remote.size, settings) as file_progress:
+            file_progress.update(remote.position)
+            _copy(
+                remote.readinto,
+                write,
+                settings,
+                file_progress,
+                None,
+            )
+    downloaded = part.stat().st_size
+    if remote.size is not None and downloaded != remote.size:
+        raise IncompleteDownload(
+            f"Downloaded {downloaded} of {remote.size} bytes"
+        )
+    if checksum and hasher:
+        try:
+            checksum.verify(hasher, str(path))
+        except checksums.ChecksumMismatch:
+            part.unlink()
+            manifest.unlink()
+            raise
+    part.replace(path)
+    manifest.unlink()
+    return path
+
+
+def download_to(
+    session: requests.Session,
+    url: str,
+    write: Writer,
+    settings: Settings = Settings(),
+    refresh_url: UrlProvider | None = None,
+    progress: Progress | None = None,
+    checksum: checksums.Checksum | None = None,
+) -> int:
+    """
+    Streams a resource to a writer without storing it, reconnecting at the
+    current position after connection errors.
+
+    Args:
+        session: Session used for the requests.
+        url: The signed URL to download.
+        write: Callable consuming each downloaded slice of bytes.
+        settings: Resumption, buffer and progress settings.
+        refresh_url: Provides a newly signed URL once the current one expired.
+        progress: Shared progress bar to report to instead of a new one.
+        checksum: Expected digest of the resource.
+
+    Returns:
+        The number of bytes written.
+
+    Raises:
+        ChecksumMismatch: The streamed bytes differ from the checksum.
+    """
+    hasher = checksum.hasher() if checksum else None
+    if hasher:
+        write = _hashing_writer(write, hasher)
+    with RemoteStream(
+        session, url, settings, refresh_url=refresh_url
+    ) as remote:
+        with _progress(progress, remote.size, settings) as stream_progress:
+            written = _copy(
+                remote.readinto, write, settings, stream_progress, None
+            )
+    if remote.size is not None and written != remote.size:
+        raise IncompleteDownload(
+            f"Downloaded {written} of {remote.size} bytes"
+        )
+    if checksum and hasher:
+        checksum.verify(hasher, unsigned(url))
+    return written
+
+
+def _hashing_writer(write: Writer, hasher: checksums.Hasher) -> Writer:
+    def hashing_write(view: memoryview) -> None:
+        hasher.update(view)
+        write(view)
+
+    return hashing_write
+
+
+def _hash_file(
+    path: pathlib.Path, size: int, hasher: checksums.Hasher, buffer_size: int
+) -> None:
+    view = memoryview(bytearray(buffer_size))
+    with open(path, "rb") as src:
+        while size and (read := src.readinto(view[:size])):
+            hasher.update(view[:read])
+            size -= read
@@ -1,27 +1,32 @@
 import dataclasses
 import datetime
+import fnmatch
 import functools
+import hashlib
 import importlib.metadata
+import io
 import json
 import logging
 import pathlib
+import re
 import tarfile
 import tempfile
+import threading
 import warnings
 import zipfile
 from collections.abc import Callable
+from concurrent import futures
 from typing import Any, cast
 from urllib import parse
 
 import geojson  # type: ignore
 import pystac_client
 import requests
-import tqdm
 
-from up42 import constants, host
+from up42 import asset_cache, checksums, cog, constants, host, sinks, transfer
+from up42.http import download_session
 
 TIMEOUT = 120  # seconds
-CHUNK_SIZE = 1024
 
 
 def get_filename(signed_url: str, default_filename: str) -> str:
@@ -100,87 +105,502 @@ def deprecation(
     return actual_decorator
 
 
+FileCallback = Callable[[pathlib.Path], Any]
+MemberFilter = str | Callable[[str], bool]
+
+
+class UnsupportedArchive(ValueError):
+    pass
+
+
+NOT_AN_ARCHIVE = "Downloaded file is not a TGZ/TAR or ZIP archive."
+
+
+def _member_name(name: str) -> str:
+    return name.split("output/")[1] if "output/" in name else name
+
+
+def _selects(members: MemberFilter | None, name: str) -> bool:
+    # Patterns are shell-style wildcards matched against the extracted name
+    if members is None:
+        return True
+    if isinstance(members, str):
+        return fnmatch.fnmatchcase(name, members)
+    return members(name)
+
+
 def _unpack_tar_files(
-    file_path: str, output_directory: str | pathlib.Path
+    tar_file: tarfile.TarFile,
+    output_directory: str | pathlib.Path,
+    on_file: FileCallback | None = None,
+    members: MemberFilter | None = None,
 ) -> list[pathlib.Path]:
+    # Iterates instead of listing members to support stream mode archives
     out_filepaths: list[pathlib.Path] = []
-    if tarfile.is_tarfile(file_path):
-        with tarfile.open(file_path) as tar_file:
-            for tar_member in tar_file.getmembers():
-                if tar_member.isfile():
-                    if "output/" in tar_member.name:
-                        tar_member.name = tar_member.name.split("output/")[1]
-                    tar_file.extract(tar_member, output_directory)
-                    out_filepaths.append(
-                        pathlib.Path(output_directory) / tar_member.name
-                    )
+    for tar_member in tar_file:
+        if tar_member.isfile():
+            tar_member.name = _member_name(tar_member.name)
+            if not _selects(members, tar_member.name):
+                continue
+            tar_file.extract(tar_member, output_directory)
+            out_filepath = pathlib.Path(output_directory) / tar_member.name
+            out_filepaths.append(out_filepath)
+            if on_file:
+                on_file(out_filepath)
     return out_filepaths
 
 
+def _extract_zip_members(
+    open_zip: Callable[[], zipfile.ZipFile],
+    output_directory: str | pathlib.Path,
+    on_file: FileCallback | None,
+    members: MemberFilter | None,
+) -> list[pathlib.Path]:
+    with open_zip() as zip_file:
+        zip_infos = [
+            zip_info
+            for zip_info in zip_file.infolist()
+            if not zip_info.filename.endswith("/")
+        ]
+    for zip_info in zip_infos:
+        zip_info.filename = _member_name(zip_info.filename)
+    zip_infos = [
+        zip_info
+        for zip_info in zip_infos
+        if _selects(members, zip_info.filename)
+    ]
+
+    # Decompression is CPU-bound but releases the GIL, so members are
+    # extracted by a thread pool, each worker reading through its own handle
+    handles = threading.local()
+    opened: list[zipfile.ZipFile] = []
+
+    def extract(zip_info: zipfile.ZipInfo) -> None:
+        if not hasattr(handles, "zip_file"):
+            handles.zip_file = open_zip()
+            opened.append(handles.zip_file)
+        try:
+            handles.zip_file.extract(zip_info, output_directory)
+        except FileExistsError:
+            # Another worker created a shared parent directory concurrently
+            handles.zip_file.extract(zip_info, output_directory)
+        if on_file:
+            on_file(pathlib.Path(output_directory) / zip_info.filename)
+
+    try:
+        with futures.ThreadPoolExecutor() as pool:
+            list(pool.map(extract, zip_infos))
+    finally:
+        for handle in opened:
+            handle.close()
+    return [
+        pathlib.Path(output_directory) / zip_info.filename
+        for zip_info in zip_infos
+    ]
+
+
 def _unpack_zip_files(
-    file_path: str, output_directory: str | pathlib.Path
+    file_path: str,
+    output_directory: str | pathlib.Path,
+    on_file: FileCallback | None = None,
+    members: MemberFilter | None = None,
 ) -> list[pathlib.Path]:
-    out_filepaths: list[pathlib.Path] = []
-    if zipfile.is_zipfile(file_path):
-        with zipfile.ZipFile(file_path) as zip_file:
-            for zip_info in zip_file.infolist():
-                if not zip_info.filename.endswith("/"):
-                    if "output/" in zip_info.filename:
-                        zip_info.filename = zip_info.filename.split("output/")[
-                            1
-                        ]
-                    zip_file.extract(zip_info, output_directory)
-                    out_filepaths.append(
-                        pathlib.Path(output_directory) / zip_info.filename
+    if not zipfile.is_zipfile(file_path):
+        raise UnsupportedArchive(NOT_AN_ARCHIVE)
+    return _extract_zip_members(
+        functools.partial(zipfile.ZipFile, file_path),
+        output_directory,
+        on_file,
+        members,
+    )
+
+
+def _remote_zip_opener(
+    session: requests.Session,
+    download_url: str,
+    settings: transfer.Settings,
+    refresh_url: transfer.UrlProvider | None,
+) -> Callable[[], zipfile.ZipFile]:
+    """
+    Returns a function opening a remote ZIP archive, read through byte range
+    requests, so that only the central directory and the extracted members
+    are downloaded.
+
+    Raises:
+        RangeNotSupported: The server does not support byte ranges.
+    """
+    size = transfer.probe_size(session, download_url)
+    if size is None:
+        raise transfer.RangeNotSupported(download_url)
+    # The archive is a single download, shared by the extraction workers
+    flow = settings.limiter.flow(settings.priority)
+
+    def open_zip() -> zipfile.ZipFile:
+        remote = transfer.RangeFile(
+            session, download_url, settings, refresh_url, size, flow
+        )
+        try:
+            return zipfile.ZipFile(
+                io.BufferedReader(remote, settings.buffer_size)
+            )
+        except zipfile.BadZipFile as error:
+            raise UnsupportedArchive(NOT_AN_ARCHIVE) from error
+
+    return open_zip
+
+
+def list_archive_members(
+    download_url: str,
+    settings: transfer.Settings = transfer.Settings(),
+    refresh_url: transfer.UrlProvider | None = None,
+) -> list[str]:
+    """
+    Lists the files of a remote ZIP archive, e.g. of order results, reading
+    only its central directory with byte range requests.
+
+    Args:
+        download_url: The signed url of the archive.
+        settings: Buffer size and retry settings of the range requests.
+        refresh_url: Provides a newly signed url once the download url expired.
+
+    Returns:
+        The file names, as extracted by `download_archive`.
+
+    Raises:
+        RangeNotSupported: The server does not support byte ranges.
+        UnsupportedArchive: The file is not a ZIP archive.
+    """
+    open_zip = _remote_zip_opener(
+        download_session.shared(), download_url, settings, refresh_url
+    )
+    with open_zip() as zip_file:
+        return [
+            _member_name(zip_info.filename)
+            for zip_info in zip_file.infolist()
+            if not zip_info.is_dir()
+        ]
+
+
+ARCHIVE_HEADER_SIZE = 512  # bytes, a tar header block
+
+
+def _archive_path(
+    download_url: str, output_directory: str | pathlib.Path
+) -> pathlib.Path:
+    # Stable across signatures of the same url to resume interrupted downloads
+    url_path = parse.urlsplit(download_url).path
+    digest = hashlib.sha256(url_path.encode()).hexdigest()[:16]
+    return pathlib.Path(output_directory) / f".up42-{digest}.archive"
+
+
+# Magic bytes of the compressions of tar streams, see `tarfile.open`
+TAR_COMPRESSIONS = (b"\x1f\x8b", b"BZh", b"\xfd7zXZ\x00")
+
+
+def _is_tar(header: bytes) -> bool:
+    return header.startswith(TAR_COMPRESSIONS) or header[257:262] == b"ustar"
+
+
+def _is_zip(header: bytes) -> bool:
+    return header[:4] in (b"PK\x03\x04", b"PK\x05\x06")
+
+
+def _stream_tar_files(
+    session: requests.Session,
+    download_url: str,
+    archive: pathlib.Path,
+    output_directory: str | pathlib.Path,
+    settings: transfer.Settings,
+    refresh_url: transfer.UrlProvider | None,
+    on_file: FileCallback | None,
+    members: MemberFilter | None,
+) -> list[pathlib.Path] | None:
+    """
+    Extracts a TGZ/TAR archive while it is downloaded. Returns None without
+    extracting if the archive is a ZIP, which has to be stored for its
+    central directory to be read.
+    """
+    if transfer.part_path(archive).exists():
+        # Only ZIP archives are stored, resume them instead
+        return None
+    with transfer.Progress(None, settings.progress_interval) as progress:
+        with transfer.RemoteStream(
+            session,
+            download_url,
+            settings,
+            refresh_url=refresh_url,
+            progress=progress,
+        ) as remote:
+            reader = io.BufferedReader(remote, ARCHIVE_HEADER_SIZE)
+            header = reader.peek(ARCHIVE_HEADER_SIZE)
+            if _is_zip(header):
+                return None
+            if not _is_tar(header):
+                raise UnsupportedArchive(NOT_AN_ARCHIVE)
+            try:
+                with tarfile.open(
+                    fileobj=reader, mode="r|*", bufsize=settings.buffer_size
+                ) as tar_file:
+                    return _unpack_tar_files(
+                        tar_file, output_directory, on_file, members
                     )
-    return out_filepaths
+            except tarfile.ReadError as error:
+                raise UnsupportedArchive(NOT_AN_ARCHIVE) from error
 
 
 def download_archive(
     download_url: str,
     output_directory: str | pathlib.Path,
+    settings: transfer.Settings = transfer.Settings(),
+    refresh_url: transfer.UrlProvider | None = None,
+    on_file: FileCallback | None = None,
+    members: MemberFilter | None = None,
 ) -> list[str]:
     """
     General download function for results of storage assets, job & jobtask from cloud storage
-    provider.
+    provider. TGZ/TAR archives are extracted while they are downloaded, ZIP archives are stored
+    first and interrupted downloads of them are resumed from the partial archive left in the
+    output directory. When selecting members, only the selected members of ZIP archives are
+    downloaded, if the server supports byte ranges.
 
     Args:
         download_url: The signed gcs url to download.
         output_directory: The file output directory, defaults to the current working
             directory.
+        settings: Buffer size, resumption and progress reporting settings of the download.
+        refresh_url: Provides a newly signed url once the download url expired.
+        on_file: Called with each extracted file as soon as it is complete, e.g.
+            `Pipeline.submit` to process files while the download continues.
+        members: Extracts only the files whose names, as listed by `list_archive_members`,
+            match a shell-style pattern, e.g. "*.xml", or a predicate.
     """
-    # Download
-    with tempfile.NamedTemporaryFile(dir=output_directory) as dst:
-        try:
-            r = requests.get(download_url, stream=True, timeout=TIMEOUT)
-            r.raise_for_status()
-            for chunk in tqdm.tqdm(r.iter_content(chunk_size=CHUNK_SIZE)):
-                if chunk:  # filter out keep-alive new chunks
-                    dst.write(chunk)
-            dst.flush()
-        except requests.exceptions.HTTPError as err:
-            error_message = f"Connection error, please try again! {err}"
-            logger.debug(error_message)
-            raise requests.exceptions.HTTPError(error_message)
-        # Order results are zip, job results are tgz(tar.gzipped)
-        out_filepaths = _unpack_tar_files(
-            dst.name, output_directory
-        ) + _unpack_zip_files(dst.name, output_directory)
-
-        if not out_filepaths:
-            raise UnsupportedArchive(
-                "Downloaded file is not a TGZ/TAR or ZIP archive."
-            )
-        logger.info(
-            "Download successful of %s files to output_directory %s",
-            len(out_filepaths),
+    archive = _archive_path(download_url, output_directory)
+    session = download_session.shared()
+    try:
+        # Job results are tgz(tar.gzipped), order results are zip
+        out_filepaths = _stream_tar_files(
+            session,
+            download_url,
+            archive,
             output_directory,
+            settings,
+            refresh_url,
+            on_file,
+            members,
         )
+        if out_filepaths is None and members is not None:
+            out_filepaths = _extract_remote_zip(
+                session,
+                download_url,
+                archive,
+                output_directory,
+                settings,
+                refresh_url,
+                on_file,
+                members,
+            )
+        if out_filepaths is None:
+            transfer.download_resumable(
+                session, download_url, archive, settings, refresh_url
+            )
+    except requests.exceptions.HTTPError as err:
+        error_message = f"Connection error, please try again! {err}"
+        logger.debug(error_message)
+        raise requests.exceptions.HTTPError(error_message)
+    if out_filepaths is None:
+        try:
+            out_filepaths = _unpack_zip_files(
+                str(archive), output_directory, on_file, members
+            )
+        finally:
+            archive.unlink()
+
+    logger.info(
+        "Download successful of %s files to output_directory %s",
+        len(out_filepaths),
+        output_directory,
+    )
     return [str(p) for p in out_filepaths]
 
 
-class UnsupportedArchive(ValueError):
-    pass
+def _extract_remote_zip(
+    session: requests.Session,
+    download_url: str,
+    archive: pathlib.Path,
+    output_directory: str | pathlib.Path,
+    settings: transfer.Settings,
+    refresh_url: transfer.UrlProvider | None,
+    on_file: FileCallback | None,
+    members: MemberFilter,
+) -> list[pathlib.Path] | None:
+    """
+    Extracts selected members of a ZIP archive through byte range requests.
+    Returns None if the server does not support byte ranges or a partial
+    download of the archive is left to resume.
+    """
+    if transfer.part_path(archive).exists():
+        return None
+    try:
+        open_zip = _remote_zip_opener(
+            session, download_url, settings, refresh_url
+        )
+    except transfer.RangeNotSupported:
+        return None
+    return _extract_zip_members(open_zip, output_directory, on_file, members)
+
+
+def _copy_file(
+    src: io.BufferedIOBase, write: sinks.Writer, buffer_size: int
+) -> None:
+    view = memoryview(bytearray(buffer_size))
+    while size := src.readinto(view):
+        write(view[:size])
+
+
+def _transfer_tar_files(
+    tar_file: tarfile.TarFile,
+    sink: sinks.Sink,
+    buffer_size: int,
+    on_file: Callable[[str], Any] | None,
+    members: MemberFilter | None,
+) -> list[str]:
+    locations = []
+    for tar_member in tar_file:
+        if tar_member.isfile():
+            name = _member_name(tar_member.name)
+            if not _selects(members, name):
+                continue
+            with sink.open(name) as write:
+                _copy_file(
+                    cast(io.BufferedIOBase, tar_file.extractfile(tar_member)),
+                    write,
+                    buffer_size,
+                )
+            locations.append(sink.location(name))
+            if on_file:
+                on_file(locations[-1])
+    return locations
+
+
+def _transfer_zip_files(
+    zip_file: zipfile.ZipFile,
+    sink: sinks.Sink,
+    buffer_size: int,
+    on_file: Callable[[str], Any] | None,
+    members: MemberFilter | None,
+) -> list[str]:
+    locations = []
+    for zip_info in zip_file.infolist():
+        name = _member_name(zip_info.filename)
+        if not zip_info.is_dir() and _selects(members, name):
+            with zip_file.open(zip_info) as src, sink.open(name) as write:
+                _copy_file(cast(io.BufferedIOBase, src), write, buffer_size)
+            locations.append(sink.location(name))
+            if on_file:
+                on_file(locations[-1])
+    return locations
+
+
+def _transfer_zip_archive(
+    session: requests.Session,
+    reader: io.BufferedIOBase,
+    download_url: str,
+    sink: sinks.Sink,
+    settings: transfer.Settings,
+    refresh_url: transfer.UrlProvider | None,
+    on_file: Callable[[str], Any] | None,
+    members: MemberFilter | None,
+) -> list[str]:
+    # The central directory of a ZIP is at its end, so members are read with
+    # byte range requests, or from a temporary copy without range support
+    with tempfile.TemporaryFile() as spooled:
+        try:
+            open_zip = _remote_zip_opener(
+                session, download_url, settings, refresh_url
+            )
+        except transfer.RangeNotSupported:
+            _copy_file(reader, spooled.write, settings.buffer_size)
+            open_zip = functools.partial(zipfile.ZipFile, spooled)
+        with open_zip() as zip_file:
+            return _transfer_zip_files(
+                zip_file, sink, settings.buffer_size, on_file, members
+            )
+
+
+def download_archive_to(
+    download_url: str,
+    sink: sinks.Sink,
+    settings: transfer.Settings = transfer.Settings(),
+    refresh_url: transfer.UrlProvider | None = None,
+    on_file: Callable[[str], Any] | None = None,
+    members: MemberFilter | None = None,
+) -> list[str]:
+    """
+    Streams the files of a result archive to a sink, e.g. object storage.
+    TGZ/TAR members are transferred while the archive is downloaded. ZIP
+    members are read with byte range requests, or from a temporary copy of
+    the archive if the server does not support them, as the central
+    directory of a ZIP is at its end.
+
+    Args:
+        download_url: The signed url to download.
+        sink: The destination of the archive files.
+        settings: Buffer size, resumption and progress reporting settings of the download.
+        refresh_url: Provides a newly signed url once the download url expired.
+        on_file: Called with the location of each file as soon as it is
+            transferred.
+        members: Transfers only the files whose names match a shell-style
+            pattern or a predicate.
+
+    Returns:
+        The locations of the files in the sink.
+    """
+    session = download_session.shared()
+    try:
+        with transfer.Progress(None, settings.progress_interval) as progress:
+            with transfer.RemoteStream(
+                session,
+                download_url,
+                settings,
+                refresh_url=refresh_url,
+                progress=progress,
+            ) as remote:
+                reader = io.BufferedReader(remote, settings.buffer_size)
+                header = reader.peek(ARCHIVE_HEADER_SIZE)
+                if _is_tar(header):
+                    with tarfile.open(
+                        fileobj=reader,
+                        mode="r|*",
+                        bufsize=settings.buffer_size,
+                    ) as tar_file:
+                        locations = _transfer_tar_files(
+                            tar_file,
+                            sink,
+                            settings.buffer_size,
+                            on_file,
+                            members,
+                        )
+                elif not _is_zip(header):
+                    raise UnsupportedArchive(NOT_AN_ARCHIVE)
+                else:
+                    locations = _transfer_zip_archive(
+                        session,
+                        reader,
+                        download_url,
+                        sink,
+                        settings,
+                        refresh_url,
+                        on_file,
+                        members,
+                    )
+    except tarfile.ReadError as error:
+        raise UnsupportedArchive(NOT_AN_ARCHIVE) from error
+    except requests.exceptions.HTTPError as err:
+        error_message = f"Connection error, please try again! {err}"
+        logger.debug(error_message)
+        raise requests.exceptions.HTTPError(error_message)
+    logger.info("Transfer successful of %s files", len(locations))
+    return locations
 
 
 @dataclasses.dataclass
@@ -188,27 +608,203 @@ class ImageFile:
     url: str
     file_name: str = "output"
     session: requests.Session = dataclasses.field(
-        default=requests.session(), repr=False, compare=False
+        default_factory=download_session.shared, repr=False, compare=False
+    )
+    refresh_url: transfer.UrlProvider | None = dataclasses.field(
+        default=None, repr=False, compare=False
+    )
+    cache_key: str | None = dataclasses.field(
+        default=None, repr=False, compare=False
+    )
+    checksum: checksums.Checksum | None = dataclasses.field(
+        default=None, repr=False, compare=False
     )
 
-    def download(self, output_directory: str | pathlib.Path) -> pathlib.Path:
+    def path(self, output_directory: str | pathlib.Path) -> pathlib.Path:
         file_name = get_filename(self.url, default_filename=self.file_name)
-        path = pathlib.Path().joinpath(output_directory, file_name)
-        with open(path, "wb") as dst:
-            try:
-                r = self.session.get(self.url, stream=True, timeout=TIMEOUT)
-                r.raise_for_status()
-                for chunk in tqdm.tqdm(r.iter_content(chunk_size=CHUNK_SIZE)):
-                    if chunk:  # filter out keep-alive new chunks
-                        dst.write(chunk)
-            except requests.exceptions.HTTPError as err:
-                logger.debug("Connection error, please try again! %s", err)
-                raise requests.exceptions.HTTPError(
-                    f"Connection error, please try again! {err}"
+        return pathlib.Path().joinpath(output_directory, file_name)
+
+    def _cache_key(self) -> str:
+        if self.cache_key:
+            return self.cache_key
+        url_path = transfer.unsigned(self.url)
+        etag = transfer.probe_etag(self.session, self.url)
+        return f"{url_path}#{etag}" if etag else url_path
+
+    def _download(
+        self,
+        path: pathlib.Path,
+        settings: transfer.Settings,
+        progress: transfer.Progress | None,
+    ) -> pathlib.Path:
+        try:
+            # Concurrent byte ranges cannot be hashed as they arrive
+            if self.checksum or not transfer.download_segmented(
+                self.session, self.url, path, settings, progress
+            ):
+                transfer.download_resumable(
+                    self.session,
+                    self.url,
+                    path,
+                    settings,
+                    self.refresh_url,
+                    progress,
+                    self.checksum,
                 )
-
-            logger.info("Successfully downloaded the file at %s", path)
-            return path
+        except requests.exceptions.HTTPError as err:
+            logger.debug("Connection error, please try again! %s", err)
+            raise requests.exceptions.HTTPError(
+                f"Connection error, please try again! {err}"
+            )
+        return path
+
+    def download(
+        self,
+        output_directory: str | pathlib.Path,
+        settings: transfer.Settings = transfer.Settings(),
+        progress: transfer.Progress | None = None,
+        cache: asset_cache.AssetCache | None = None,
+    ) -> pathlib.Path:
+        """
+        Downloads the file into a directory. Files with a checksum are
+        verified while downloading, in a single stream.
+
+        Args:
+            output_directory: The file output directory.
+            settings: Buffer size, segmentation, resumption and progress
+                reporting settings of the download.
+            progress: Shared progress bar to report to instead of a new one.
+            cache: Asset cache to link the file from instead of downloading
+                it again.
+
+        Raises:
+            ChecksumMismatch: The downloaded file differs from its checksum.
+        """
+        path = self.path(output_directory)
+        if cache:
+            cache.fetch(
+                self._cache_key(),
+                path,
+                lambda directory: self._download(
+                    self.path(directory), settings, progress
+                ),
+            )
+        else:
+            self._download(path, settings, progress)
+        logger.info("Successfully downloaded the file at %s", path)
+        return path
+
+    def download_to(
+        self,
+        sink: sinks.Sink,
+        settings: transfer.Settings = transfer.Settings(),
+        progress: transfer.Progress | None = None,
+    ) -> str:
+        """
+        Streams the file to a sink, e.g. object storage, without storing it
+        locally. Files with a checksum are verified.
+
+        Args:
+            sink: The destination of the file.
+            settings: Buffer size, resumption and progress reporting settings
+                of the download.
+            progress: Shared progress bar to report to instead of a new one.
+
+        Returns:
+            The location of the file in the sink.
+
+        Raises:
+            ChecksumMismatch: The file content differs from its checksum.
+        """
+        name = get_filename(self.url, default_filename=self.file_name)
+        with sink.open(name) as write:
+            transfer.download_to(
+                self.session,
+                self.url,
+                write,
+                settings,
+                self.refresh_url,
+                progress,
+                self.checksum,
+            )
+        location = sink.location(name)
+        logger.info("Successfully transferred the file to %s", location)
+        return location
+
+    def open(
+        self, settings: transfer.Settings = transfer.Settings()
+    ) -> io.BufferedReader:
+        """
+        Opens the file for streaming reads without writing it to disk.
+        Dropped connections are resumed at the current position.
+
+        Args:
+            settings: Buffer size and resumption settings of the stream.
+
+        Returns:
+            A buffered binary file object, to be closed after use.
+        """
+        stream = transfer.RemoteStream(
+            self.session, self.url, settings, refresh_url=self.refresh_url
+        )
+        return io.BufferedReader(stream, buffer_size=settings.buffer_size)
+
+    def open_cog(
+        self, settings: transfer.Settings = transfer.Settings()
+    ) -> cog.Reader:
+        """
+        Opens a tiled GeoTIFF, e.g. a Cloud-Optimized GeoTIFF, for reading
+        windows of pixels without downloading the whole file. The header
+        and the tiles covering a window are fetched with byte range
+        requests, headers are cached in memory for repeated reads.
+
+        Args:
+            settings: Retry settings of the range requests.
+
+        Returns:
+            A reader of pixel or geographic windows, e.g.
+            `reader.read(reader.window((left, bottom, right, top)))`.
+
+        Raises:
+            RangeNotSupported: The server does not support byte ranges.
+            UnsupportedTiff: The file is not a tiled GeoTIFF.
+        """
+        header = cog.headers.get(
+            self.cache_key or transfer.unsigned(self.url),
+            lambda: cog.read_header(
+                io.BufferedReader(
+                    transfer.RangeFile(
+                        self.session, self.url, settings, self.refresh_url
+                    ),
+                    cog.HEADER_SIZE,
+                )
+            ),
+        )
+        remote = transfer.RangeFile(
+            self.session, self.url, settings, self.refresh_url, header.size
+        )
+        return cog.Reader(remote, header)
+
+    def read_bytes(
+        self, settings: transfer.Settings = transfer.Settings()
+    ) -> bytes:
+        """
+        Reads the whole file into memory, intended for small files such as
+        quicklooks. Files with a checksum are verified.
+
+        Args:
+            settings: Buffer size and resumption settings of the stream.
+
+        Raises:
+            ChecksumMismatch: The file content differs from its checksum.
+        """
+        with self.open(settings) as file:
+            content = file.read()
+        if self.checksum:
+            hasher = self.checksum.hasher()
+            hasher.update(content)
+            self.checksum.verify(hasher, transfer.unsigned(self.url))
+        return content
 
 
 def download_file(
@@ -227,6 +823,23 @@ def download_file(
     return [str(image.download(output_directory))]
 
 
+# Fractional seconds of any precision, e.g. the nanoseconds of some providers
+_FRACTION = re.compile(r"(?<=:\d{2})\.(\d+)")
+
+
+def parse_datetime(value: str) -> datetime.datetime:
+    """
+    Parses an ISO 8601 timestamp such as a STAC datetime, including a `Z`
+    offset and any precision of seconds, which `fromisoformat` only accepts
+    from Python 3.11 on. Digits beyond microseconds are dropped.
+    """
+    value = re.sub(r"[Zz]$", "+00:00", value.strip())
+    value = _FRACTION.sub(
+        lambda match: "." + match.group(1)[:6].ljust(6, "0"), value, count=1
+    )
+    return datetime.datetime.fromisoformat(value)
+
+
 def format_time(date: str | datetime.datetime | None, set_end_of_day=False):
     """
     Formats date isostring to datetime string format
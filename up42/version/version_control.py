@@ -10,6 +10,7 @@ ENV_VAR_UP42_DISABLE_VERSION_CHECK = "UP42_DISABLE_VERSION_CHECK"
 
 
 def _get_latest_version():
+    # Runs on import, a plain request without retries fails fast offline
     response = requests.get("https://pypi.org/pypi/up42-py/json", timeout=2)
     response.raise_for_status()
     return version.parse(response.json()["info"]["version"])